@@ -18,6 +18,14 @@ from dotenv import load_dotenv
 import logging
 from routes.records import router as records_router
 from routes.schema import router as schema_router
+from routes.changes import router as changes_router
+from routes.spatial import router as spatial_router
+from routes.metrics import router as metrics_router
+from routes.profiling import router as profiling_router
+from services.metrics import MetricsMiddleware
+from services.query_log import QueryAccountingMiddleware
+from services.profiling import ProfilingMiddleware
+from services.tracing import TracingMiddleware
 
 # Load environment variables from backend/osdudb.env
 load_dotenv("backend/osdudb.env")
@@ -38,6 +46,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# cProfile for requests sent with X-Profile: 1 and the admin token (innermost)
+app.add_middleware(ProfilingMiddleware)
+# Per-request query accounting, slow-query log and X-DB-* debug headers
+app.add_middleware(QueryAccountingMiddleware)
+# Request latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
+# Request spans (OSDU_TRACING), outermost so they cover the other middleware
+app.add_middleware(TracingMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -48,6 +65,10 @@ logger = logging.getLogger(__name__)
 # Register routers
 app.include_router(records_router)
 app.include_router(schema_router)
+app.include_router(changes_router)
+app.include_router(spatial_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router)
 
 # Log all registered routes
 for route in app.routes:
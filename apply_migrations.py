@@ -0,0 +1,51 @@
+# ------------------------------------------------------------------------------
+# apply_migrations.py
+#
+# Applies the SQL files in sql/ to the OSDU database in filename order.
+# Each file runs in its own transaction and is recorded in schema_migrations,
+# so re-running only applies new files.
+#
+# DATA_PARTITION_ID (default opendes) is passed to the migrations as the
+# osdu.legacy_partition setting: the data partition legacy rows are moved to.
+# ------------------------------------------------------------------------------
+import os
+from db import get_conn
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+LEGACY_PARTITION = os.getenv("DATA_PARTITION_ID", "opendes")
+
+def main():
+    conn = get_conn()
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                filename   TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        cur.execute("SELECT filename FROM schema_migrations")
+        applied = {row[0] for row in cur.fetchall()}
+    conn.commit()
+
+    pending = sorted(f for f in os.listdir(SQL_DIR) if f.endswith(".sql") and f not in applied)
+    if not pending:
+        print("✅ Database is up to date")
+        return
+
+    for filename in pending:
+        with open(os.path.join(SQL_DIR, filename), "r", encoding="utf-8") as f:
+            statements = f.read()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT set_config('osdu.legacy_partition', %s, true)", (LEGACY_PARTITION,))
+                cur.execute(statements)
+                cur.execute("INSERT INTO schema_migrations (filename) VALUES (%s)", (filename,))
+            conn.commit()
+            print(f"✅ Applied {filename}")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Failed to apply {filename}: {e}")
+            raise
+
+if __name__ == "__main__":
+    main()
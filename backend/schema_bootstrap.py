@@ -0,0 +1,376 @@
+#backend/schema_bootstrap.py
+"""
+Dependency-ordered, concurrent schema bootstrap.
+
+Schema files are parsed once, dependency edges are taken from `$ref` values and
+`x-osdu-inheriting-from-kind`, and the schemas are grouped into levels where
+every schema only depends on schemas from earlier levels. Each level is then
+registered with one POST /schemas:batch request, concurrently over POST /schema,
+or directly through the bulk `register_schemas` path (one transaction per level).
+"""
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+
+_thread_local = threading.local()
+
+
+# -------------------- Loading --------------------
+
+def extract_kind(schema_dict: dict) -> Optional[str]:
+    kind = schema_dict.get("kind")
+    if not kind:
+        kind = schema_dict.get("schemaInfo", {}).get("schemaIdentity", {}).get("id")
+    return kind
+
+
+def _load_entry(entry: dict) -> dict:
+    try:
+        with open(entry["path"], "r", encoding="utf-8") as f:
+            entry["schema"] = json.load(f)
+    except FileNotFoundError:
+        entry["error"] = "File not found"
+    except Exception as e:
+        entry["error"] = f"Exception: {e}"
+    return entry
+
+
+def load_entries(entries: List[dict], max_workers: int = DEFAULT_MAX_WORKERS) -> List[dict]:
+    """
+    Reads and parses every schema file exactly once, in parallel.
+    Each entry is a dict with at least 'path'; 'schema' or 'error' is filled in.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_load_entry, entries))
+
+
+def entries_from_sequence(sequence_file: str, schema_base: str) -> List[dict]:
+    """
+    Builds entries from load_sequence.1.0.0.json (a list of {kind, relativePath}).
+    """
+    with open(sequence_file, "r", encoding="utf-8") as f:
+        sequence = json.load(f)
+
+    entries = []
+    for idx, item in enumerate(sequence, start=1):
+        kind = item.get("kind")
+        rel_path = item.get("relativePath")
+        entry = {"index": idx, "kind": kind, "name": rel_path, "path": None}
+        if not kind or not rel_path:
+            entry["error"] = "Missing kind or relativePath"
+        else:
+            entry["path"] = os.path.join(schema_base, rel_path.replace("/", os.sep))
+        entries.append(entry)
+    return entries
+
+
+def entries_from_directory(schema_dir: str) -> List[dict]:
+    """
+    Builds entries from every *.json file in a directory. The kind is read
+    from the file itself once it has been loaded (see resolve_kinds).
+    """
+    files = sorted(f for f in os.listdir(schema_dir) if f.endswith(".json"))
+    return [
+        {"index": idx, "kind": None, "name": fname, "path": os.path.join(schema_dir, fname)}
+        for idx, fname in enumerate(files, start=1)
+    ]
+
+
+def resolve_kinds(entries: List[dict]) -> List[dict]:
+    for entry in entries:
+        if entry.get("error") or entry.get("kind"):
+            continue
+        entry["kind"] = extract_kind(entry.get("schema") or {})
+    return entries
+
+
+def missing_fields(entry: dict, required: Iterable[str] = ("schema",)) -> List[str]:
+    """
+    Structural check of a loaded entry: 'kind' plus the `required` fields
+    ('schema', and 'status' at the top level or in schemaInfo) it lacks.
+    """
+    schema = entry.get("schema") or {}
+    missing = [] if entry.get("kind") else ["kind"]
+    if "schema" in required and not schema.get("schema"):
+        missing.append("schema")
+    if "status" in required and not schema.get("status") and not (schema.get("schemaInfo") or {}).get("status"):
+        missing.append("status")
+    return missing
+
+
+# -------------------- Dependency levels --------------------
+
+def _ref_to_kind(ref: str) -> Optional[str]:
+    """
+    Maps the $ref flavours found in OSDU schema files onto a lookup key:
+    - 'osdu:wks:AbstractCommonResources:1.0.0#/definitions/x' → 'AbstractCommonResources:1.0.0'
+    - 'wks:AbstractCommonResources:1.0.0'                    → 'AbstractCommonResources:1.0.0'
+    - '.../abstract/AbstractCommonResources.1.0.0.json'      → 'AbstractCommonResources:1.0.0'
+    Local refs ('#/definitions/...') have no dependency and return None.
+    """
+    if not isinstance(ref, str) or ref.startswith("#"):
+        return None
+    ref = ref.split("#", 1)[0]
+    if ref.endswith(".json"):
+        name = os.path.basename(ref)[:-len(".json")]
+        entity, _, version = name.partition(".")
+        return f"{entity}:{version}" if version else None
+    parts = ref.split(":")
+    if len(parts) >= 2:
+        return f"{parts[-2]}:{parts[-1]}"
+    return None
+
+
+def _kind_key(kind: str) -> Optional[str]:
+    parts = (kind or "").split(":")
+    return f"{parts[-2]}:{parts[-1]}" if len(parts) >= 2 else None
+
+
+def iter_dependencies(node) -> Iterable[str]:
+    """
+    Yields every $ref target and inherited kind referenced anywhere in a schema.
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            for key, value in current.items():
+                if key == "$ref" and isinstance(value, str):
+                    yield value
+                elif key == "x-osdu-inheriting-from-kind" and isinstance(value, list):
+                    for parent in value:
+                        if isinstance(parent, dict):
+                            parent = parent.get("kind")
+                        if isinstance(parent, str):
+                            yield parent
+                else:
+                    stack.append(value)
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def compute_levels(entries: List[dict]) -> List[List[dict]]:
+    """
+    Groups loadable entries into dependency levels (Kahn's algorithm).
+    Dependencies on schemas outside the batch are ignored; cycles are broken by
+    emitting the remaining schemas as one final level.
+    """
+    loadable = [e for e in entries if not e.get("error")]
+    by_key = {}
+    for entry in loadable:
+        key = _kind_key(entry["kind"])
+        if key:
+            by_key[key] = entry
+
+    deps = {}
+    for entry in loadable:
+        own_key = _kind_key(entry["kind"])
+        targets = set()
+        for ref in iter_dependencies(entry["schema"]):
+            key = _ref_to_kind(ref)
+            if key and key != own_key and key in by_key:
+                targets.add(key)
+        deps[id(entry)] = targets
+        entry["dependencies"] = sorted(targets)
+
+    levels = []
+    done = set()
+    remaining = loadable
+    while remaining:
+        level = [e for e in remaining if deps[id(e)] <= done]
+        if not level:
+            logger.warning(f"⚠️ Dependency cycle among {len(remaining)} schema(s); registering them together")
+            level = remaining
+        levels.append(level)
+        done.update(_kind_key(e["kind"]) for e in level)
+        placed = {id(e) for e in level}
+        remaining = [e for e in remaining if id(e) not in placed]
+    return levels
+
+
+# -------------------- Registration --------------------
+
+def build_payload(entry: dict) -> dict:
+    schema = entry["schema"]
+    return {
+        "id": entry["kind"],
+        "kind": entry["kind"],
+        "status": "published",
+        "schema_definition": schema
+    }
+
+
+def _session() -> requests.Session:
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        _thread_local.session = session
+    return session
+
+
+def _post_schema(schema_api: str, entry: dict) -> str:
+    try:
+        resp = _session().post(schema_api, json=build_payload(entry))
+        if resp.status_code == 201:
+            return "✅ Registered"
+        elif resp.status_code == 409:
+            return "⚠️ Already exists"
+        else:
+            return f"❌ Failed ({resp.status_code}): {resp.text}"
+    except Exception as e:
+        return f"❌ Exception: {e}"
+
+
+def register_level_http(level: List[dict], schema_api: str, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for entry, result in zip(level, pool.map(lambda e: _post_schema(schema_api, e), level)):
+            entry["result"] = result
+
+
+def register_level_batch(level: List[dict], schema_batch_api: str) -> None:
+    """
+    Sends a whole level to POST /schemas:batch as one NDJSON request.
+    """
+    body = "\n".join(json.dumps(build_payload(entry)) for entry in level)
+    try:
+        resp = _session().post(schema_batch_api, data=body.encode("utf-8"),
+                               headers={"Content-Type": "application/x-ndjson"})
+        results = resp.json().get("results", [])
+    except Exception as e:
+        for entry in level:
+            entry["result"] = f"❌ Exception: {e}"
+        return
+
+    by_index = {r.get("index"): r for r in results}
+    for idx, entry in enumerate(level):
+        outcome = by_index.get(idx, {})
+        if outcome.get("status") == "registered":
+            entry["result"] = "✅ Registered"
+        else:
+            entry["result"] = f"❌ Failed ({resp.status_code}): {outcome.get('reason', resp.text)}"
+
+
+def register_level_db(level: List[dict]) -> None:
+    """
+    Upserts a whole level in one transaction via services.schema_service.register_schemas.
+    """
+    from services.schema_service import register_schemas
+
+    payloads = []
+    for entry in level:
+        payload = build_payload(entry)
+        payload["schema"] = payload.pop("schema_definition")
+        payloads.append(payload)
+    try:
+        register_schemas(payloads)
+        result = "✅ Registered"
+    except Exception as e:
+        result = f"❌ Exception: {e}"
+    for entry in level:
+        entry["result"] = result
+
+
+# -------------------- Dry-run dumps --------------------
+
+def _dump_entry(resolved_dir: str, timestamp: str, entry: dict) -> None:
+    kind = entry["kind"].replace(":", "_").replace("--", "_")
+    path = os.path.join(resolved_dir, f"{kind}_{timestamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entry["schema"], f, indent=2)
+
+
+def dump_entries(entries: List[dict], resolved_dir: str, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    os.makedirs(resolved_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(lambda e: _dump_entry(resolved_dir, timestamp, e), entries))
+    print(f"🧪 Dumped {len(entries)} schema(s) to {resolved_dir}")
+
+
+# -------------------- Engine --------------------
+
+def bootstrap(entries: List[dict],
+              schema_api: Optional[str] = None,
+              mode: str = "batch",
+              dry_run: bool = False,
+              resolved_dir: Optional[str] = None,
+              max_workers: int = DEFAULT_MAX_WORKERS,
+              required_fields: Iterable[str] = ("schema",)) -> Dict:
+    """
+    Loads, orders and registers schema entries.
+    mode: 'batch' sends each level as one NDJSON request to schema_api (POST /schemas:batch),
+          'http' posts each schema of a level concurrently to schema_api (POST /schema),
+          'db' upserts each level through register_schemas in one transaction.
+    required_fields: fields an entry must carry besides its kind (see missing_fields).
+    Returns the entries (each with 'result' and 'status') and the counters.
+    """
+    entries = resolve_kinds(load_entries(entries, max_workers))
+
+    for entry in entries:
+        missing = [] if entry.get("error") else missing_fields(entry, required_fields)
+        if missing:
+            entry["error"] = f"Missing fields: {', '.join(missing)}"
+
+    levels = compute_levels(entries)
+    print(f"🧭 {sum(len(l) for l in levels)} schema(s) in {len(levels)} dependency level(s)")
+
+    for number, level in enumerate(levels, start=1):
+        if dry_run:
+            for entry in level:
+                entry["result"] = "🧪 Dry-run: skipped POST"
+        elif mode == "db":
+            register_level_db(level)
+        elif mode == "batch":
+            register_level_batch(level, schema_api)
+        else:
+            register_level_http(level, schema_api, max_workers)
+        print(f"  ↳ level {number}: {len(level)} schema(s)")
+
+    if dry_run and resolved_dir:
+        dump_entries([e for e in entries if not e.get("error")], resolved_dir, max_workers)
+
+    success, skipped, failed = 0, 0, 0
+    for entry in entries:
+        if entry.get("error"):
+            entry["result"] = f"❌ {entry['error']}"
+        result = entry.get("result", "❌ Not registered")
+        if result.startswith("✅"):
+            success += 1
+        elif result.startswith("⚠️") or result.startswith("🧪"):
+            skipped += 1
+        else:
+            failed += 1
+        entry["status"] = "resolved" if result.startswith("🧪") else "unresolved"
+
+    return {
+        "entries": entries,
+        "levels": len(levels),
+        "total": len(entries),
+        "success": success,
+        "skipped": skipped,
+        "failed": failed
+    }
+
+
+def status_log(entries: List[dict]) -> List[dict]:
+    return [
+        {
+            "filename": e.get("name"),
+            "kind": e.get("kind"),
+            "status": e.get("status"),
+            "reason": e.get("error") or ("Schema structurally valid" if e.get("status") == "resolved"
+                                         else "Schema not batched or failed registration")
+        }
+        for e in entries
+    ]
@@ -1,50 +1,24 @@
 import os
 import json
-import requests
 from datetime import datetime
+from backend.schema_bootstrap import (
+    bootstrap,
+    entries_from_sequence,
+    status_log,
+)
 
 # === Configuration ===
 REPO_ROOT = r"E:\dataprocessing\osdu_github_repos\osdu-data-data-definitions"
 SCHEMA_BASE = os.path.join(REPO_ROOT, "SchemaRegistrationResources")
 SEQUENCE_FILE = os.path.join(SCHEMA_BASE, "shared-schemas", "osdu", "load_sequence.1.0.0.json")
-SCHEMA_API = "http://localhost:5000/api/schema-service/v1/schema"
-HEADERS = {"Content-Type": "application/json"}
+SCHEMA_API = "http://localhost:5000/api/schema-service/v1/schemas:batch"
 DRY_RUN = False  # Set to True to simulate ingestion without POSTing
+MODE = "batch"  # "batch": one POST /schemas:batch per dependency level, "http": concurrent POST /schema
+               # (set SCHEMA_API to .../schema), "db": upsert each level in one transaction
+MAX_WORKERS = 16
 RESOLVED_DIR = os.path.join(os.getcwd(), "resolved_manifest_schemas")
 
 # === Helpers ===
-def load_schema_file(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def extract_kind(schema_dict, fname):
-    kind = schema_dict.get("kind")
-    if not kind:
-        kind = schema_dict.get("schemaInfo", {}).get("schemaIdentity", {}).get("id")
-    if not kind:
-        print(f"❌ Missing 'kind' in {fname}")
-    return kind
-
-def register_schema(kind, schema_body):
-    payload = {
-        "id": kind,
-        "kind": kind,
-        "status": "published",
-        "schema": schema_body
-    }
-    if DRY_RUN:
-        return "🧪 Dry-run: skipped POST"
-    try:
-        resp = requests.post(SCHEMA_API, headers=HEADERS, json=payload)
-        if resp.status_code == 201:
-            return "✅ Registered"
-        elif resp.status_code == 409:
-            return "⚠️ Already exists"
-        else:
-            return f"❌ Failed ({resp.status_code}): {resp.text}"
-    except Exception as e:
-        return f"❌ Exception: {e}"
-
 def write_summary_log(results, total, success, skipped, failed):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     mode = "DRYRUN" if DRY_RUN else "REALRUN"
@@ -65,17 +39,6 @@ def write_summary_log(results, total, success, skipped, failed):
 
     print(f"\n📄 Summary log written to {log_file}")
 
-def dump_resolved_batch(batch, batch_index):
-    os.makedirs(RESOLVED_DIR, exist_ok=True)
-    for item in batch:
-        kind = item["kind"].replace(":", "_").replace("--", "_")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{kind}_{timestamp}.json"
-        path = os.path.join(RESOLVED_DIR, filename)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(item["schema"], f, indent=2)
-        print(f"🧪 Dumped: {filename}")
-
 def write_resolution_status_log(status_log):
     os.makedirs(RESOLVED_DIR, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -85,131 +48,46 @@ def write_resolution_status_log(status_log):
         json.dump(status_log, f, indent=2)
     print(f"📄 Resolution status log written to {filename}")
 
-def load_sequence():
-    try:
-        with open(SEQUENCE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)  # list of {kind, relativePath}
-    except Exception as e:
-        print(f"❌ Failed to load sequence file: {e}")
-        return []
-
 # === Main ===
 def main():
-    sequence = load_sequence()
-    total = len(sequence)
-    success, skipped, failed = 0, 0, 0
-    results = []
-    dryrun_batch = []
-    batch_index = 1
-    resolution_status = []
-
-    print(f"\n📦 Ingesting {total} schemas based on load_sequence.1.0.0.json...\n")
-
-    for idx, entry in enumerate(sequence, start=1):
-        kind = entry.get("kind")
-        rel_path = entry.get("relativePath")
-        if not kind or not rel_path:
-            results.append(f"[{idx}/{total}] {kind or 'UNKNOWN'} → ❌ Missing kind or relativePath")
-            resolution_status.append({
-                "filename": rel_path,
-                "kind": kind,
-                "status": "unresolved",
-                "reason": "Missing kind or relativePath"
-            })
-            failed += 1
-            continue
-
-        abs_path = os.path.join(SCHEMA_BASE, rel_path.replace("/", os.sep))
-        if not os.path.isfile(abs_path):
-            results.append(f"[{idx}/{total}] {kind} → ❌ File not found: {rel_path}")
-            resolution_status.append({
-                "filename": rel_path,
-                "kind": kind,
-                "status": "unresolved",
-                "reason": "File not found"
-            })
-            failed += 1
-            continue
-
-        try:
-            schema = load_schema_file(abs_path)
-
-            # Structural validation
-            missing_fields = []
-            if not schema.get("schema"):
-                missing_fields.append("schema")
-
-            if missing_fields:
-                results.append(f"[{idx}/{total}] {rel_path} → ❌ Missing fields: {', '.join(missing_fields)}")
-                resolution_status.append({
-                    "filename": rel_path,
-                    "kind": kind,
-                    "status": "unresolved",
-                    "reason": f"Missing fields: {', '.join(missing_fields)}"
-                })
-                failed += 1
-                continue
-
-            result = register_schema(kind, schema)
-            results.append(f"[{idx}/{total}] {rel_path} → {result}")
-
-            if DRY_RUN and result.startswith("🧪"):
-                dryrun_batch.append({ "filename": rel_path, "kind": kind, "schema": schema })
-                resolution_status.append({
-                    "filename": rel_path,
-                    "kind": kind,
-                    "status": "resolved",
-                    "reason": "Schema structurally valid"
-                })
-                if len(dryrun_batch) == 10:
-                    dump_resolved_batch(dryrun_batch, batch_index)
-                    batch_index += 1
-                    dryrun_batch = []
-
-            else:
-                resolution_status.append({
-                    "filename": rel_path,
-                    "kind": kind,
-                    "status": "unresolved",
-                    "reason": "Schema not batched or failed registration"
-                })
-
-            if result.startswith("✅"):
-                success += 1
-            elif result.startswith("⚠️") or result.startswith("🧪"):
-                skipped += 1
-            else:
-                failed += 1
-
-        except Exception as e:
-            results.append(f"[{idx}/{total}] {rel_path} → ❌ Error: {e}")
-            resolution_status.append({
-                "filename": rel_path,
-                "kind": kind,
-                "status": "unresolved",
-                "reason": f"Exception: {e}"
-            })
-            failed += 1
-
-    # Dump remaining batch
-    if DRY_RUN and dryrun_batch:
-        dump_resolved_batch(dryrun_batch, batch_index)
+    try:
+        entries = entries_from_sequence(SEQUENCE_FILE, SCHEMA_BASE)
+    except Exception as e:
+        print(f"❌ Failed to enumerate schemas: {e}")
+        return
+
+    print(f"\n📦 Ingesting {len(entries)} schemas based on load_sequence.1.0.0.json...\n")
+
+    summary = bootstrap(
+        entries,
+        schema_api=SCHEMA_API,
+        mode=MODE,
+        dry_run=DRY_RUN,
+        resolved_dir=RESOLVED_DIR,
+        max_workers=MAX_WORKERS
+    )
+    total = summary["total"]
+    results = [
+        f"[{e['index']}/{total}] {e['name'] or e['kind'] or 'UNKNOWN'} → {e['result']}"
+        for e in summary["entries"]
+    ]
 
     # Write resolution status log
     if DRY_RUN:
-        write_resolution_status_log(resolution_status)
+        write_resolution_status_log(status_log(summary["entries"]))
 
     for line in results:
         print(line)
 
     print("\n================ INGESTION SUMMARY ================")
     print(f"Total schemas processed: {total}")
-    print(f"✅ Registered: {success}")
-    print(f"⚠️ Already existed / Dry-run: {skipped}")
-    print(f"❌ Failed: {failed}")
+    print(f"Dependency levels: {summary['levels']}")
+    print(f"✅ Registered: {summary['success']}")
+    print(f"⚠️ Already existed / Dry-run: {summary['skipped']}")
+    print(f"❌ Failed: {summary['failed']}")
     print("===================================================")
 
-    write_summary_log(results, total, success, skipped, failed)
+    write_summary_log(results, total, summary["success"], summary["skipped"], summary["failed"])
 
 if __name__ == "__main__":
     main()
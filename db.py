@@ -2,6 +2,7 @@
 import psycopg2
 import os
 from dotenv import load_dotenv
+from services.metrics import InstrumentedCursor
 
 # Load environment variables from osdudb.env
 load_dotenv("backend/osdudb.env")
@@ -20,7 +21,8 @@ def get_conn():
             user=os.getenv("OSDU_DB_USER"),
             password=os.getenv("OSDU_DB_PASSWORD"),
             host=os.getenv("OSDU_DB_HOST"),
-            port=os.getenv("OSDU_DB_PORT")
+            port=os.getenv("OSDU_DB_PORT"),
+            cursor_factory=InstrumentedCursor
         )
     return _conn
 print("Connecting to DB:", os.getenv("OSDU_DB_NAME"), os.getenv("OSDU_DB_USER"))
@@ -1,48 +1,22 @@
 import os
 import json
-import requests
 from datetime import datetime
+from backend.schema_bootstrap import (
+    bootstrap,
+    entries_from_directory,
+    status_log,
+)
 
 # === Configuration ===
 SCHEMA_DIR = r"E:\dataprocessing\osdu_github_repos\osdu-data-data-definitions\SchemaRegistrationResources\shared-schemas\osdu\reference-data"
-SCHEMA_API = "http://localhost:5000/api/schema-service/v1/schema"
-HEADERS = {"Content-Type": "application/json"}
+SCHEMA_API = "http://localhost:5000/api/schema-service/v1/schemas:batch"
 DRY_RUN = False  # Set to True to simulate ingestion without POSTing
+MODE = "batch"  # "batch": one POST /schemas:batch per dependency level, "http": concurrent POST /schema
+               # (set SCHEMA_API to .../schema), "db": upsert each level in one transaction
+MAX_WORKERS = 16
 RESOLVED_DIR = os.path.join(os.getcwd(), "resolved_schemas")
 
 # === Helpers ===
-def load_schema_file(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def extract_kind(schema_dict, fname):
-    kind = schema_dict.get("kind")
-    if not kind:
-        kind = schema_dict.get("schemaInfo", {}).get("schemaIdentity", {}).get("id")
-    if not kind:
-        print(f"❌ Missing 'kind' in {fname}")
-    return kind
-
-def register_schema(kind, schema_body):
-    payload = {
-        "id": kind,
-        "kind": kind,
-        "status": "published",
-        "schema": schema_body
-    }
-    if DRY_RUN:
-        return "🧪 Dry-run: skipped POST"
-    try:
-        resp = requests.post(SCHEMA_API, headers=HEADERS, json=payload)
-        if resp.status_code == 201:
-            return "✅ Registered"
-        elif resp.status_code == 409:
-            return "⚠️ Already exists"
-        else:
-            return f"❌ Failed ({resp.status_code}): {resp.text}"
-    except Exception as e:
-        return f"❌ Exception: {e}"
-
 def write_summary_log(results, total, success, skipped, failed):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     mode = "DRYRUN" if DRY_RUN else "REALRUN"
@@ -63,17 +37,6 @@ def write_summary_log(results, total, success, skipped, failed):
 
     print(f"\n📄 Summary log written to {log_file}")
 
-def dump_resolved_batch(batch, batch_index):
-    os.makedirs(RESOLVED_DIR, exist_ok=True)
-    for item in batch:
-        kind = item["kind"].replace(":", "_").replace("--", "_")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{kind}_{timestamp}.json"
-        path = os.path.join(RESOLVED_DIR, filename)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(item["schema"], f, indent=2)
-        print(f"🧪 Dumped: {filename}")
-
 def write_resolution_status_log(status_log):
     os.makedirs(RESOLVED_DIR, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -85,105 +48,45 @@ def write_resolution_status_log(status_log):
 
 # === Main ===
 def main():
-    files = sorted(os.listdir(SCHEMA_DIR))
-    total = len(files)
-    success, skipped, failed = 0, 0, 0
-    results = []
-    dryrun_batch = []
-    batch_index = 1
-    resolution_status = []
-
-    print(f"\n📦 Ingesting {total} reference data schemas...\n")
-
-    for idx, fname in enumerate(files, start=1):
-        if not fname.endswith(".json"):
-            continue
-
-        path = os.path.join(SCHEMA_DIR, fname)
-        try:
-            schema = load_schema_file(path)
-            kind = extract_kind(schema, fname)
-
-            # Structural validation
-            missing_fields = []
-            if not kind:
-                missing_fields.append("kind")
-            if not schema.get("schema"):
-                missing_fields.append("schema")
-            if not schema.get("status") and not schema.get("schemaInfo", {}).get("status"):
-                missing_fields.append("status")
-
-            if missing_fields:
-                results.append(f"[{idx}/{total}] {fname} → ❌ Missing fields: {', '.join(missing_fields)}")
-                resolution_status.append({
-                    "filename": fname,
-                    "kind": kind,
-                    "status": "unresolved",
-                    "reason": f"Missing fields: {', '.join(missing_fields)}"
-                })
-                failed += 1
-                continue
-
-            result = register_schema(kind, schema)
-            results.append(f"[{idx}/{total}] {fname} → {result}")
-
-            if DRY_RUN and result.startswith("🧪"):
-                dryrun_batch.append({ "filename": fname, "kind": kind, "schema": schema })
-                resolution_status.append({
-                    "filename": fname,
-                    "kind": kind,
-                    "status": "resolved",
-                    "reason": "Schema structurally valid"
-                })
-                if len(dryrun_batch) == 10:
-                    dump_resolved_batch(dryrun_batch, batch_index)
-                    batch_index += 1
-                    dryrun_batch = []
-
-            else:
-                resolution_status.append({
-                    "filename": fname,
-                    "kind": kind,
-                    "status": "unresolved",
-                    "reason": "Schema not batched or failed registration"
-                })
-
-            if result.startswith("✅"):
-                success += 1
-            elif result.startswith("⚠️") or result.startswith("🧪"):
-                skipped += 1
-            else:
-                failed += 1
-
-        except Exception as e:
-            results.append(f"[{idx}/{total}] {fname} → ❌ Error: {e}")
-            resolution_status.append({
-                "filename": fname,
-                "kind": kind if kind else None,
-                "status": "unresolved",
-                "reason": f"Exception: {e}"
-            })
-            failed += 1
-
-    # Dump remaining batch
-    if DRY_RUN and dryrun_batch:
-        dump_resolved_batch(dryrun_batch, batch_index)
+    try:
+        entries = entries_from_directory(SCHEMA_DIR)
+    except Exception as e:
+        print(f"❌ Failed to enumerate schemas: {e}")
+        return
+
+    print(f"\n📦 Ingesting {len(entries)} reference data schemas...\n")
+
+    summary = bootstrap(
+        entries,
+        schema_api=SCHEMA_API,
+        mode=MODE,
+        dry_run=DRY_RUN,
+        resolved_dir=RESOLVED_DIR,
+        max_workers=MAX_WORKERS,
+        required_fields=("schema", "status")
+    )
+    total = summary["total"]
+    results = [
+        f"[{e['index']}/{total}] {e['name'] or e['kind'] or 'UNKNOWN'} → {e['result']}"
+        for e in summary["entries"]
+    ]
 
     # Write resolution status log
     if DRY_RUN:
-        write_resolution_status_log(resolution_status)
+        write_resolution_status_log(status_log(summary["entries"]))
 
     for line in results:
         print(line)
 
     print("\n================ INGESTION SUMMARY ================")
     print(f"Total schemas processed: {total}")
-    print(f"✅ Registered: {success}")
-    print(f"⚠️ Already existed / Dry-run: {skipped}")
-    print(f"❌ Failed: {failed}")
+    print(f"Dependency levels: {summary['levels']}")
+    print(f"✅ Registered: {summary['success']}")
+    print(f"⚠️ Already existed / Dry-run: {summary['skipped']}")
+    print(f"❌ Failed: {summary['failed']}")
     print("===================================================")
 
-    write_summary_log(results, total, success, skipped, failed)
+    write_summary_log(results, total, summary["success"], summary["skipped"], summary["failed"])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,25 @@
+# ------------------------------------------------------------------------------
+# rebuild_record_locations.py
+#
+# Rebuilds the record_locations spatial index (sql/007) from the records
+# table. Run once after applying the migration, or after bulk loads that
+# bypassed the storage API. Writes through the API keep the index current.
+#
+#   python rebuild_record_locations.py [--tenant opendes] [--batch-size 1000]
+# ------------------------------------------------------------------------------
+import argparse
+import logging
+from services.spatial_service import rebuild_locations
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the record_locations spatial index")
+    parser.add_argument("--tenant", help="only this data partition (default: all)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
+    processed = rebuild_locations(args.tenant, args.batch_size)
+    print(f"✅ Indexed locations for {processed} records")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from fastapi import APIRouter, Request, HTTPException
+from services.change_feed import latest_sequence, read_changes
+from services.serialization import FastJSONResponse
+
+router = APIRouter(prefix="/api/storage/v2", tags=["changes"])
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 10000
+MAX_WAIT_SECONDS = 30.0
+POLL_INTERVAL_SECONDS = 0.25
+
+# -------------------- Routes --------------------
+
+@router.get("/changes")
+async def get_changes(request: Request, since: int = 0, limit: Optional[int] = 1000, wait: Optional[float] = 0):
+    """
+    Cursor-paged record change feed for one data partition.
+    Returns changes with sequence > since, oldest first; pass nextSince back as
+    `since`. With wait > 0 (seconds, max 30) an empty page is held open until a
+    change commits or the wait expires (long polling).
+    """
+    tenant_id = request.headers.get("data-partition-id")
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
+    if since < 0:
+        raise HTTPException(status_code=400, detail="since must be >= 0")
+
+    limit = max(1, min(limit or 1000, MAX_PAGE_SIZE))
+    deadline = time.monotonic() + max(0.0, min(wait or 0, MAX_WAIT_SECONDS))
+
+    try:
+        while True:
+            page = read_changes(tenant_id, since, limit)
+            if page["changes"] or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+        page["latestSequence"] = latest_sequence(tenant_id)
+        return FastJSONResponse(page)
+    except Exception as e:
+        logger.exception("Error reading change feed")
+        raise HTTPException(status_code=500, detail=f"INTERNAL_ERROR: {str(e)}")
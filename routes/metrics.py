@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from services.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+# -------------------- Routes --------------------
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Request, database, service and ingestion metrics in the Prometheus text format.
+    """
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,84 @@
+import logging
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from services.serialization import FastJSONResponse
+from services.profiling import (
+    ADMIN_TOKEN_HEADER, DEFAULT_INTERVAL, check_admin_token, format_stats, profiler, profiling_enabled,
+    request_profile,
+)
+
+router = APIRouter(prefix="/api/storage/v2/admin/profiler", tags=["admin"])
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = {"cumulative", "tottime", "ncalls", "filename", "name"}
+
+# -------------------- Models --------------------
+
+class ProfileStart(BaseModel):
+    seconds: float = 30
+    intervalMs: float = DEFAULT_INTERVAL * 1000
+
+# -------------------- Guard --------------------
+
+def _require_admin(request: Request):
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not check_admin_token(request.headers.get(ADMIN_TOKEN_HEADER)):
+        raise HTTPException(status_code=403, detail="Missing or invalid X-Admin-Token")
+
+# -------------------- Routes --------------------
+
+@router.post("/start", status_code=202)
+async def start_profiler(request: Request, payload: ProfileStart):
+    """
+    Starts sampling every thread's stack for `seconds` (max 300) every
+    `intervalMs`. Fetch the result from GET /admin/profiler/collapsed.
+    """
+    _require_admin(request)
+    try:
+        return FastJSONResponse(profiler.start(payload.seconds, payload.intervalMs / 1000), status_code=202)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"INVALID_PROFILE_REQUEST: {str(ve)}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/stop")
+async def stop_profiler(request: Request):
+    """
+    Stops the running sampling session early; its samples are kept.
+    """
+    _require_admin(request)
+    return FastJSONResponse(profiler.stop())
+
+@router.get("")
+async def profiler_status(request: Request):
+    _require_admin(request)
+    return FastJSONResponse(profiler.status())
+
+@router.get("/collapsed")
+async def profiler_collapsed(request: Request):
+    """
+    The current or last sampling session as collapsed stacks, ready for
+    flamegraph.pl, speedscope or inferno-flamegraph.
+    """
+    _require_admin(request)
+    if not profiler.samples:
+        raise HTTPException(status_code=404, detail="No profile has been recorded")
+    return PlainTextResponse(profiler.collapsed(),
+                             headers={"Content-Disposition": 'attachment; filename="profile.folded"'})
+
+@router.get("/requests/{profile_id}")
+async def request_profile_stats(request: Request, profile_id: str, sort: str = "cumulative", limit: int = 60):
+    """
+    cProfile stats of a request sent with `X-Profile: 1` (id from its
+    X-Profile-Id response header), as pstats text.
+    """
+    _require_admin(request)
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(SORT_KEYS)}")
+    entry = request_profile(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    header = f"{entry['method']} {entry['path']} {entry['elapsedMs']} ms\n\n"
+    return PlainTextResponse(header + format_stats(entry["profile"], sort, max(1, limit)))
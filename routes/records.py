@@ -19,7 +19,12 @@ from services.record_service import (
     copy_record_references,
     fetch_normalized_records,
     soft_delete_single_record,
+    get_record_stamp,
+    get_kind_stats,
+    list_record_kinds,
 )
+from services.http_cache import RECORD_CACHE_CONTROL, etag_matches, not_modified, record_etag
+from services.serialization import FastJSONResponse
 import logging
 
 router = APIRouter(prefix="/api/storage/v2", tags=["records"])
@@ -50,10 +55,13 @@ class PatchPayload(BaseModel):
 # -------------------- Routes --------------------
 
 @router.put("/records")
-async def put_records(records: List[Record]):
+async def put_records(request: Request, records: List[Record]):
     logger.info("PUT /records route hit")
+    tenant_id = request.headers.get("data-partition-id")
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
     try:
-        return ingest_records([r.dict() for r in records])
+        return ingest_records([r.dict() for r in records], tenant_id)
     except ValueError as ve:
         logger.error(f"Validation error: {ve}")
         raise HTTPException(status_code=400, detail="VALIDATION_ERROR: " + str(ve))
@@ -72,14 +80,14 @@ async def get_records(request: Request, ids: str, includeDeleted: Optional[str]
     if not record_ids:
         raise HTTPException(status_code=400, detail="No valid record IDs provided")
 
-    return get_records_by_ids(record_ids, includeDeleted.lower() == "true")
+    return FastJSONResponse(get_records_by_ids(record_ids, tenant_id, includeDeleted.lower() == "true"))
 
 @router.delete("/records/{record_id}")
 async def delete_record_route(record_id: str, request: Request):
     tenant_id = request.headers.get("data-partition-id")
     if not tenant_id:
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
-    return delete_record(record_id)
+    return delete_record(record_id, tenant_id)
 
 @router.patch("/records/{record_id}")
 async def patch_record_route(record_id: str, request: Request, payload: dict):
@@ -88,55 +96,71 @@ async def patch_record_route(record_id: str, request: Request, payload: dict):
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
     if not payload:
         raise HTTPException(status_code=400, detail="Missing JSON body")
-    return patch_record(record_id, payload)
+    return patch_record(record_id, tenant_id, payload)
 
 @router.post("/records:batch", status_code=status.HTTP_201_CREATED)
 async def batch_ingest_records_route(request: Request, payload: BatchPayload):
     tenant_id = request.headers.get("data-partition-id")
     if not tenant_id:
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
-    return ingest_records_batch([r.dict() for r in payload.records])
+    return ingest_records_batch([r.dict() for r in payload.records], tenant_id)
 
 @router.post("/records:delete")
 async def delete_records_route(request: Request, payload: DeletePayload):
     tenant_id = request.headers.get("data-partition-id")
     if not tenant_id:
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
-    return delete_records_bulk(payload.ids)
+    return delete_records_bulk(payload.ids, tenant_id)
 
 @router.post("/records:retrieve")
 async def retrieve_records_route(request: Request, payload: RetrievePayload, includeDeleted: Optional[str] = "false", latest: Optional[str] = "true"):
     tenant_id = request.headers.get("data-partition-id")
     if not tenant_id:
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
-    return retrieve_records(payload.records, includeDeleted.lower() == "true", latest.lower() == "true")
+    body, status_code = retrieve_records(payload.records, tenant_id, includeDeleted.lower() == "true", latest.lower() == "true")
+    return FastJSONResponse(body, status_code=status_code)
 
 @router.post("/records:patch")
 async def patch_records_route(request: Request, payload: PatchPayload):
     tenant_id = request.headers.get("data-partition-id")
     if not tenant_id:
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
-    return patch_records_bulk(payload.records)
+    return patch_records_bulk(payload.records, tenant_id)
 
 @router.get("/records/flat")
 async def get_flat_records(request: Request, limit: Optional[int] = 100, offset: Optional[int] = 0):
     tenant_id = request.headers.get("data-partition-id")
     if not tenant_id:
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
-    return get_flattened_records(limit, offset)
+    return get_flattened_records(tenant_id, limit, offset)
 
 @router.get("/records/flat/view")
 async def view_flat_records(request: Request):
     return templates.TemplateResponse("flat_records.html", {"request": request})
 
 @router.get("/records/kinds")
-async def get_all_kinds():
+async def get_all_kinds(request: Request):
+    """
+    Kinds with live records, for the kind pickers. Scoped to the data-partition-id
+    header when present, otherwise across all partitions.
+    """
     try:
-        return get_flattened_records_by_kind("ALL_KINDS")
+        return list_record_kinds(request.headers.get("data-partition-id"))
     except Exception as e:
         logger.error(f"Error in get_all_kinds: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/records/kinds/stats")
+async def get_kind_stats_route(request: Request, group: Optional[str] = None):
+    tenant_id = request.headers.get("data-partition-id")
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
+    try:
+        return FastJSONResponse(get_kind_stats(tenant_id, group))
+    except Exception as e:
+        logger.exception("Error fetching kind stats")
+        raise HTTPException(status_code=500, detail=f"INTERNAL_ERROR: {str(e)}")
+
 @router.get("/records/flat/filter")
 async def get_flat_records_by_kind(request: Request, kind: str):
     tenant_id = request.headers.get("data-partition-id")
@@ -144,7 +168,7 @@ async def get_flat_records_by_kind(request: Request, kind: str):
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
     if not kind:
         raise HTTPException(status_code=400, detail="Missing required query parameter: kind")
-    return get_flattened_records_by_kind(kind)
+    return get_flattened_records_by_kind(kind, tenant_id)
 
 @router.get("/records/joined/wellbores")
 async def view_joined_wellbores(request: Request):
@@ -162,7 +186,19 @@ async def get_latest_record_route(record_id: str, request: Request, attribute: O
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
 
     try:
-        return get_latest_record(record_id, tenant_id, attribute)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            stamp = get_record_stamp(record_id, tenant_id)
+            if stamp:
+                etag = record_etag(record_id, *stamp, attribute)
+                if etag_matches(if_none_match, etag):
+                    return not_modified(etag, RECORD_CACHE_CONTROL)
+
+        record = get_latest_record(record_id, tenant_id, attribute)
+        etag = record_etag(record_id, record["version"], record["modifyTime"], attribute)
+        return FastJSONResponse(record, headers={"ETag": etag, "Cache-Control": RECORD_CACHE_CONTROL})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching latest version of record {record_id}")
         raise HTTPException(status_code=500, detail=f"INTERNAL_ERROR: {str(e)}")
@@ -195,7 +231,7 @@ async def soft_delete_single_record_route(record_id: str, request: Request):
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
 
     try:
-        return soft_delete_single_record(record_id)
+        return soft_delete_single_record(record_id, tenant_id)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -216,7 +252,7 @@ async def copy_record_references_route(request: Request, payload: CopyPayload):
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
 
     try:
-        return copy_record_references(payload.sourceNamespace, payload.targetNamespace, payload.recordIds)
+        return copy_record_references(payload.sourceNamespace, payload.targetNamespace, payload.recordIds, tenant_id)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -236,7 +272,7 @@ async def fetch_multiple_records_route(request: Request, payload: MultiRecordPay
         raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
 
     try:
-        return get_records_by_ids(payload.recordIds)
+        return FastJSONResponse(get_records_by_ids(payload.recordIds, tenant_id))
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -262,7 +298,7 @@ async def fetch_normalized_records_route(
         raise HTTPException(status_code=400, detail="Missing required header: frame-of-reference")
 
     try:
-        return fetch_normalized_records(payload.recordIds, frame_of_reference)
+        return FastJSONResponse(fetch_normalized_records(payload.recordIds, tenant_id, frame_of_reference))
     except HTTPException as he:
         raise he
     except Exception as e:
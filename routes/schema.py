@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Request, HTTPException, status, Query
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional
+import json
 from db import get_conn
 from services.schema_service import (
     register_schema,
+    register_schemas,
     get_registered_field_types,
     get_flattened_data_fields,
-    get_schema_by_id,
-    get_schema_by_kind
+    get_schema_stamp,
+    get_schema_with_stamp
 )
+from services.http_cache import SCHEMA_CACHE_CONTROL, etag_matches, not_modified, schema_etag
+from services.serialization import FastJSONResponse
 import logging
 
 router = APIRouter(prefix="/api/schema-service/v1", tags=["schema"])
@@ -25,6 +29,34 @@ class SchemaRegistrationPayload(BaseModel):
     status: str
     schema_definition: dict
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+def parse_schema_batch(body: bytes, content_type: str) -> List[dict]:
+    """
+    Accepts a JSON array, a {"schemas": [...]} wrapper, or NDJSON (one schema per line).
+    """
+    text = body.decode("utf-8")
+    if not any(media in content_type for media in NDJSON_MEDIA_TYPES):
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, dict) and isinstance(parsed.get("schemas"), list):
+            return parsed["schemas"]
+        if isinstance(parsed, list):
+            return parsed
+        if parsed is not None:
+            raise ValueError("Expected a JSON array of schemas or an NDJSON stream")
+
+    items = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"Invalid NDJSON on line {line_no}: {e}")
+    return items
+
 # -------------------- Routes --------------------
 
 @router.post("/schema", status_code=status.HTTP_201_CREATED)
@@ -50,50 +82,116 @@ async def post_schema(payload: SchemaRegistrationPayload):
         logger.exception(f"Failed to register schema: {e}")
         raise HTTPException(status_code=500, detail="Failed to register schema")
 
-@router.get("/schema/{schema_id}")
-async def get_schema(schema_id: str):
+@router.post("/schemas:batch", status_code=status.HTTP_201_CREATED)
+async def post_schemas_batch(request: Request):
     """
-    Retrieves a schema by its full ID from the schema_registry table.
-    Used for direct lookup by schema ID.
+    Registers many schemas in one request. The body is a JSON array of
+    SchemaRegistrationPayload objects or an NDJSON stream of them.
+    Valid schemas are upserted with a single multi-row statement; the response
+    carries a per-schema result in request order.
     """
     try:
-        schema = get_schema_by_id(schema_id)
-        if not schema:
-            raise HTTPException(status_code=404, detail=f"Schema not found: {schema_id}")
-        logger.info(f"📦 Retrieved schema by ID: {schema_id}")
-        return schema
-    except Exception as e:
-        logger.exception(f"Failed to retrieve schema {schema_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve schema")
+        items = parse_schema_batch(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if not items:
+        raise HTTPException(status_code=400, detail="No schemas provided")
+
+    results, accepted = [], []
+    for idx, item in enumerate(items):
+        result = {"index": idx, "id": item.get("id") if isinstance(item, dict) else None}
+        results.append(result)
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Schema must be a JSON object")
+            payload = SchemaRegistrationPayload(**item)
+        except (ValidationError, ValueError) as e:
+            result.update({"status": "rejected", "reason": str(e)})
+            continue
+        if len(payload.kind.split(":")) != 4:
+            result.update({"status": "rejected", "reason": "Invalid kind format. Expected osdu:<domain>:<entity>:<version>"})
+            continue
+        accepted.append((result, {
+            "id": payload.id,
+            "kind": payload.kind,
+            "status": payload.status,
+            "schema": payload.schema_definition
+        }))
+
+    if accepted:
+        try:
+            register_schemas([schema for _, schema in accepted])
+            for result, _ in accepted:
+                result["status"] = "registered"
+            logger.info(f"✅ Registered {len(accepted)} schema(s) in batch")
+        except Exception as e:
+            logger.exception(f"Failed to register schema batch: {e}")
+            for result, _ in accepted:
+                result.update({"status": "failed", "reason": "Failed to register schema"})
+
+    registered = sum(1 for r in results if r["status"] == "registered")
+    response = {
+        "schemaCount": len(results),
+        "registeredCount": registered,
+        "results": results
+    }
+    if not registered:
+        failed = any(r["status"] == "failed" for r in results)
+        return JSONResponse(status_code=500 if failed else 400, content=response)
+    return response
+
+def _conditional_schema_response(request: Request, key: str, schema_id: str = None, kind: str = None):
+    """
+    Serves a schema with a strong ETag derived from its modify_time, answering
+    If-None-Match with 304 from a modify_time-only lookup.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        modify_time = get_schema_stamp(schema_id=schema_id, kind=kind)
+        if modify_time is not None:
+            etag = schema_etag(key, modify_time)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag, SCHEMA_CACHE_CONTROL)
+
+    found = get_schema_with_stamp(schema_id=schema_id, kind=kind)
+    if not found:
+        return None
+    schema, modify_time = found
+    etag = schema_etag(key, modify_time)
+    return FastJSONResponse(schema, headers={"ETag": etag, "Cache-Control": SCHEMA_CACHE_CONTROL})
 
 @router.get("/schema/kind/{kind}")
-async def get_schema_by_kind_route(kind: str):
+async def get_schema_by_kind_route(kind: str, request: Request):
     """
     Retrieves a schema by its kind value from the schema_registry table.
-    Used by the frontend to fetch full schema definitions.
+    Used by the frontend to fetch full schema definitions. Supports If-None-Match.
     """
     try:
-        schema = get_schema_by_kind(kind)
-        if not schema:
+        response = _conditional_schema_response(request, f"kind:{kind}", kind=kind)
+        if response is None:
             raise HTTPException(status_code=404, detail=f"Schema not found for kind: {kind}")
-        logger.info(f"📦 Retrieved schema by kind: {kind}")
-        return schema
+        logger.info(f"📦 Retrieved schema by kind: {kind} ({response.status_code})")
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Failed to retrieve schema for kind {kind}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve schema")
 
 @router.get("/schema/id/{schema_id}")
-async def get_schema_by_id_route(schema_id: str):
+async def get_schema_by_id_route(schema_id: str, request: Request):
     """
     Retrieves a schema by its ID using an alternate route.
     Mirrors the /schema/{id} route for compatibility.
     """
     try:
-        schema = get_schema_by_id(schema_id)
-        if not schema:
+        response = _conditional_schema_response(request, f"id:{schema_id}", schema_id=schema_id)
+        if response is None:
             raise HTTPException(status_code=404, detail=f"Schema not found for id: {schema_id}")
-        logger.info(f"📦 Retrieved schema by id: {schema_id}")
-        return schema
+        logger.info(f"📦 Retrieved schema by id: {schema_id} ({response.status_code})")
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Failed to retrieve schema for id {schema_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve schema")
@@ -174,6 +272,25 @@ async def view_schema_tree_browser(request: Request):
     """
     return templates.TemplateResponse("schema_tree_browser.html", {"request": request})
 
+# Declared after the static /schema/... routes, which it would otherwise shadow.
+@router.get("/schema/{schema_id}")
+async def get_schema(schema_id: str, request: Request):
+    """
+    Retrieves a schema by its full ID from the schema_registry table.
+    Used for direct lookup by schema ID. Supports If-None-Match.
+    """
+    try:
+        response = _conditional_schema_response(request, f"id:{schema_id}", schema_id=schema_id)
+        if response is None:
+            raise HTTPException(status_code=404, detail=f"Schema not found: {schema_id}")
+        logger.info(f"📦 Retrieved schema by ID: {schema_id} ({response.status_code})")
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Failed to retrieve schema {schema_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve schema")
+
 @router.get("/ping")
 async def ping():
     return {"status": "ok"}
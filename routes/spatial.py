@@ -0,0 +1,68 @@
+import logging
+from typing import List, Optional, Union
+from fastapi import APIRouter, Request, HTTPException
+from pydantic import BaseModel
+from services.serialization import FastJSONResponse
+from services.spatial_service import DEFAULT_LIMIT, nearest_locations, query_locations
+
+router = APIRouter(prefix="/api/storage/v2", tags=["spatial"])
+logger = logging.getLogger(__name__)
+
+# -------------------- Models --------------------
+
+class SpatialQuery(BaseModel):
+    spatialFilter: dict
+    kind: Optional[Union[str, List[str]]] = None
+    returnedFields: Optional[List[str]] = None
+    limit: Optional[int] = DEFAULT_LIMIT
+    offset: Optional[int] = 0
+
+class NearestQuery(BaseModel):
+    point: dict
+    k: Optional[int] = 10
+    kind: Optional[Union[str, List[str]]] = None
+    maxDistance: Optional[float] = None
+    returnedFields: Optional[List[str]] = None
+
+# -------------------- Routes --------------------
+
+@router.post("/query/spatial")
+async def spatial_query_route(request: Request, payload: SpatialQuery):
+    """
+    Records with a geometry inside a bounding box or polygon, or within a
+    distance of a point (spatialFilter byBoundingBox / byGeoPolygon / byDistance).
+    Returns recordIds ordered by id, plus projected `results` when
+    returnedFields is given (e.g. ["data.FacilityName"], or ["*"] for whole records).
+    """
+    tenant_id = request.headers.get("data-partition-id")
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
+
+    try:
+        return FastJSONResponse(query_locations(tenant_id, payload.spatialFilter, payload.kind,
+                                                payload.returnedFields, payload.limit, payload.offset))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"INVALID_SPATIAL_QUERY: {str(ve)}")
+    except Exception as e:
+        logger.exception("Error running spatial query")
+        raise HTTPException(status_code=500, detail=f"INTERNAL_ERROR: {str(e)}")
+
+@router.post("/query/nearest")
+async def nearest_query_route(request: Request, payload: NearestQuery):
+    """
+    The k records with a geometry nearest to `point` ({"latitude", "longitude"}),
+    nearest first, each with its WGS84 ellipsoidal `distance` in metres.
+    maxDistance (metres) caps the search; returnedFields projects as in /query/spatial.
+    """
+    tenant_id = request.headers.get("data-partition-id")
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="Missing required header: data-partition-id")
+
+    try:
+        return FastJSONResponse(nearest_locations(tenant_id, payload.point, payload.k, payload.kind,
+                                                  payload.maxDistance, payload.returnedFields))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"INVALID_SPATIAL_QUERY: {str(ve)}")
+    except Exception as e:
+        logger.exception("Error running nearest query")
+        raise HTTPException(status_code=500, detail=f"INTERNAL_ERROR: {str(e)}")
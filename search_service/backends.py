@@ -0,0 +1,78 @@
+# ------------------------------------------------------------------------------
+# backends.py
+#
+# Search backend selection for the search service and the indexer.
+#
+# A backend is any object with the opensearch-py client calls we use
+# (info, index, get, delete, bulk, search). OpenSearch's own client is used
+# as-is; local_search.LocalSearchClient is the embedded single-node engine.
+#
+#   SEARCH_BACKEND=opensearch   require a reachable cluster (previous behaviour)
+#   SEARCH_BACKEND=local        always use the embedded index in LOCAL_INDEX_DIR
+#   SEARCH_BACKEND=auto         OpenSearch when reachable, otherwise local (default)
+# ------------------------------------------------------------------------------
+import logging
+from typing import Optional
+
+logger = logging.getLogger("search_backends")
+
+BACKENDS = ("auto", "opensearch", "local")
+
+
+class SearchBackend:
+    """
+    Client surface shared by the backends; signatures follow opensearch-py.
+    """
+    name = "base"
+
+    def info(self) -> dict:
+        raise NotImplementedError
+
+    def index(self, index: str, body: dict, id: Optional[str] = None, refresh=False, **kwargs) -> dict:
+        raise NotImplementedError
+
+    def get(self, index: str, id: str, **kwargs) -> dict:
+        raise NotImplementedError
+
+    def delete(self, index: str, id: str, refresh=False, **kwargs) -> dict:
+        raise NotImplementedError
+
+    def bulk(self, body, index: Optional[str] = None, refresh=False, **kwargs) -> dict:
+        raise NotImplementedError
+
+    def search(self, index: Optional[str] = None, body: Optional[dict] = None, **kwargs) -> dict:
+        raise NotImplementedError
+
+
+def opensearch_client(host: str, port: int, **options):
+    from opensearchpy import OpenSearch
+    return OpenSearch([{"host": host, "port": port}], **options)
+
+
+def connect_backend(backend: str = "auto", host: str = "localhost", port: int = 9200,
+                    local_dir: str = "local_index", **opensearch_options):
+    """
+    Returns a connected client for `backend`. Raises RuntimeError when
+    OpenSearch is required but unreachable.
+    """
+    backend = (backend or "auto").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"SEARCH_BACKEND must be one of {', '.join(BACKENDS)}")
+
+    if backend != "local":
+        try:
+            client = opensearch_client(host, port, **opensearch_options)
+            info = client.info()
+            logger.info("✅ Connected to OpenSearch")
+            logger.debug(info)
+            return client
+        except Exception as e:
+            if backend == "opensearch":
+                logger.error(f"❌ Failed to connect to OpenSearch: {e}")
+                raise RuntimeError("OpenSearch connection failed")
+            logger.warning(f"⚠️ OpenSearch unavailable ({e}); falling back to the embedded index")
+
+    from local_search import LocalSearchClient
+    client = LocalSearchClient(local_dir)
+    logger.info(f"✅ Using embedded search index in {local_dir}")
+    return client
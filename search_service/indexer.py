@@ -0,0 +1,400 @@
+# ------------------------------------------------------------------------------
+# indexer.py
+#
+# Bulk indexing pipeline from the storage service into OpenSearch.
+#
+# Follows GET /api/storage/v2/changes, fetches changed records in batches via
+# POST /records:retrieve and writes them with _bulk requests capped by document
+# count and payload bytes. Index refresh is left to the index's refresh_interval
+# (no per-write refresh). Items rejected with a retryable status (429 / 5xx) are
+# retried with exponential backoff; the checkpoint only advances once a page of
+# changes is fully flushed, so a restart resumes without gaps.
+#
+# Usage (from search_service/):
+#   python indexer.py --follow            # tail the feed
+#   python indexer.py --since 0           # full reindex by replaying the feed
+#   python indexer.py --dry-run           # run against the in-process stand-in
+#   python indexer.py --per-kind          # schema-mapped per-kind indices (mappings.py)
+#   SEARCH_BACKEND=local python indexer.py  # embedded index (local_search.py)
+#
+# With SEARCH_SERVICE_URL set, every flushed page bumps the search service's
+# query cache generation (query_cache.py) so cached results are dropped.
+# ------------------------------------------------------------------------------
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+ENV_PATH = os.path.join(os.path.dirname(__file__), "opensearch.env")
+load_dotenv(dotenv_path=ENV_PATH)
+
+SEARCH_HOST = os.getenv("SEARCH_HOST", "localhost")
+SEARCH_PORT = int(os.getenv("SEARCH_PORT", "9200"))
+DATA_PARTITION_ID = os.getenv("DATA_PARTITION_ID", "osdu-local")
+STORAGE_SERVICE_URL = os.getenv("STORAGE_SERVICE_URL", "http://127.0.0.1:5000/api/storage/v2")
+INDEX_NAME = os.getenv("INDEX_NAME", "osdu-records")
+SEARCH_SERVICE_URL = os.getenv("SEARCH_SERVICE_URL")
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_index"))
+CHECKPOINT_FILE = os.getenv("INDEXER_CHECKPOINT", "indexer_checkpoint.json")
+
+BULK_MAX_DOCS = int(os.getenv("BULK_MAX_DOCS", "1000"))
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", str(5 * 1024 * 1024)))
+CHANGES_PAGE_SIZE = int(os.getenv("CHANGES_PAGE_SIZE", "5000"))
+RETRIEVE_CHUNK = int(os.getenv("RETRIEVE_CHUNK", "500"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+MAX_RETRIES = int(os.getenv("BULK_MAX_RETRIES", "5"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("BULK_RETRY_BACKOFF", "0.5"))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger("search_indexer")
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+# -------------------------
+# Bulk batching
+# -------------------------
+class BulkBatch:
+    """
+    NDJSON _bulk body under construction. Each entry is the encoded action line
+    (plus source line for index actions) so a failed item can be resent as-is.
+    """
+
+    def __init__(self):
+        self.items: List[bytes] = []
+        self.nbytes = 0
+
+    def add(self, encoded: bytes):
+        self.items.append(encoded)
+        self.nbytes += len(encoded)
+
+    def __len__(self):
+        return len(self.items)
+
+    def body(self, items: Optional[List[bytes]] = None) -> bytes:
+        return b"".join(self.items if items is None else items)
+
+
+def index_action(index: str, doc_id: str, document: dict) -> bytes:
+    return _dumps({"index": {"_index": index, "_id": doc_id}}) + b"\n" + _dumps(document) + b"\n"
+
+
+def delete_action(index: str, doc_id: str) -> bytes:
+    return _dumps({"delete": {"_index": index, "_id": doc_id}}) + b"\n"
+
+# -------------------------
+# Sources
+# -------------------------
+class StorageChangeSource:
+    """
+    Reads the storage service's change feed and records over HTTP.
+    """
+
+    def __init__(self, base_url: str = STORAGE_SERVICE_URL, partition: str = DATA_PARTITION_ID,
+                 session: Optional[requests.Session] = None):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self.session.headers.update({"data-partition-id": partition})
+
+    def changes(self, since: int, limit: int, wait: float = 0) -> Dict:
+        resp = self.session.get(f"{self.base_url}/changes",
+                                params={"since": since, "limit": limit, "wait": wait},
+                                timeout=wait + 30)
+        resp.raise_for_status()
+        return resp.json()
+
+    def records(self, ids: List[str]) -> List[dict]:
+        resp = self.session.post(f"{self.base_url}/records:retrieve", json={"records": ids}, timeout=120)
+        resp.raise_for_status()
+        return resp.json().get("records", [])
+
+# -------------------------
+# In-process stand-in for OpenSearch
+# -------------------------
+class InMemorySearchClient:
+    """
+    Minimal stand-in implementing the bulk() call the pipeline uses. `fail_once`
+    maps document ids to a status returned on their first attempt, to exercise
+    partial-failure retries.
+    """
+
+    def __init__(self, fail_once: Optional[Dict[str, int]] = None):
+        self.indices_data: Dict[str, Dict[str, dict]] = {}
+        self.fail_once = dict(fail_once or {})
+        self.bulk_calls = 0
+
+    def bulk(self, body: bytes, refresh=False, **kwargs) -> dict:
+        self.bulk_calls += 1
+        lines = [line for line in body.split(b"\n") if line]
+        items, errors, i = [], False, 0
+        while i < len(lines):
+            action = json.loads(lines[i])
+            op, meta = next(iter(action.items()))
+            doc_id, index = meta["_id"], meta["_index"]
+            i += 1
+            source = None
+            if op == "index":
+                source = json.loads(lines[i])
+                i += 1
+
+            status = self.fail_once.pop(doc_id, None)
+            if status:
+                errors = True
+                items.append({op: {"_id": doc_id, "status": status, "error": {"type": "stand_in_failure"}}})
+                continue
+
+            docs = self.indices_data.setdefault(index, {})
+            if op == "index":
+                docs[doc_id] = source
+                items.append({op: {"_id": doc_id, "status": 201}})
+            else:
+                found = docs.pop(doc_id, None) is not None
+                items.append({op: {"_id": doc_id, "status": 200 if found else 404}})
+        return {"took": 0, "errors": errors, "items": items}
+
+# -------------------------
+# Pipeline
+# -------------------------
+class IndexingPipeline:
+    """
+    Consumes the change feed and keeps an index in sync with storage.
+    `transform(record) -> (index, document)` may route and reshape documents and
+    `index_for(kind)` names the index deletes go to (see mappings.KindIndexManager);
+    `on_flush(stats)` is called after every successful page.
+    """
+
+    def __init__(self, client, source, index: str = INDEX_NAME,
+                 max_docs: int = BULK_MAX_DOCS, max_bytes: int = BULK_MAX_BYTES,
+                 page_size: int = CHANGES_PAGE_SIZE, max_retries: int = MAX_RETRIES,
+                 checkpoint_file: Optional[str] = CHECKPOINT_FILE,
+                 transform: Optional[Callable[[dict], tuple]] = None,
+                 index_for: Optional[Callable[[Optional[str]], str]] = None,
+                 on_flush: Optional[Callable[[dict], None]] = None):
+        self.client = client
+        self.source = source
+        self.index = index
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.checkpoint_file = checkpoint_file
+        self.transform = transform or (lambda record: (self.index, record))
+        self.index_for = index_for or (lambda kind: self.index)
+        self.on_flush = on_flush
+        self.since = self._load_checkpoint()
+        self.stats = {
+            "since": self.since,
+            "latestSequence": self.since,
+            "lag": 0,
+            "indexed": 0,
+            "deleted": 0,
+            "failed": 0,
+            "retried": 0,
+            "bulkRequests": 0,
+            "docsPerSecond": 0.0,
+            "lastFlushSeconds": 0.0
+        }
+        self.failures: List[dict] = []
+
+    # ---- checkpoint ----
+    def _load_checkpoint(self) -> int:
+        if self.checkpoint_file and os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("since", 0))
+        return 0
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_file:
+            return
+        tmp = f"{self.checkpoint_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"since": self.since, "updated": time.time()}, f)
+        os.replace(tmp, self.checkpoint_file)
+
+    # ---- bulk ----
+    def _send(self, batch: BulkBatch):
+        """
+        Sends one _bulk request; resends retryable item failures with backoff.
+        """
+        if not len(batch):
+            return
+        pending = batch.items
+        for attempt in range(self.max_retries + 1):
+            response = self.client.bulk(body=batch.body(pending), refresh=False)
+            self.stats["bulkRequests"] += 1
+            if not response.get("errors"):
+                self._count(response["items"])
+                return
+
+            retry = []
+            for encoded, item in zip(pending, response["items"]):
+                op, result = next(iter(item.items()))
+                status = result.get("status", 500)
+                if status < 300 or (op == "delete" and status == 404):
+                    self._count([item])
+                elif status in RETRYABLE_STATUSES and attempt < self.max_retries:
+                    retry.append(encoded)
+                else:
+                    self.stats["failed"] += 1
+                    self.failures.append({"id": result.get("_id"), "status": status, "error": result.get("error")})
+                    logger.error(f"❌ Bulk {op} failed for {result.get('_id')}: {status} {result.get('error')}")
+            if not retry:
+                return
+            self.stats["retried"] += len(retry)
+            pending = retry
+            time.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+    def _count(self, items: Iterable[dict]):
+        for item in items:
+            if "delete" in item:
+                self.stats["deleted"] += 1
+            else:
+                self.stats["indexed"] += 1
+
+    def _actions(self, latest_ops: Dict[str, tuple]) -> Iterable[bytes]:
+        upserts = [rid for rid, (op, _) in latest_ops.items() if op != "delete"]
+        chunks = [upserts[i:i + RETRIEVE_CHUNK] for i in range(0, len(upserts), RETRIEVE_CHUNK)]
+        found = set()
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            for records in pool.map(self.source.records, chunks):
+                for record in records:
+                    found.add(record["id"])
+                    index, document = self.transform(record)
+                    yield index_action(index, record["id"], document)
+
+        # Deleted, or gone between the change and the fetch
+        for rid, (op, kind) in latest_ops.items():
+            if op == "delete" or rid not in found:
+                yield delete_action(self.index_for(kind), rid)
+
+    # ---- main loop ----
+    def run_once(self, wait: float = 0) -> int:
+        """
+        Processes one page of changes. Returns the number of changes consumed.
+        """
+        page = self.source.changes(self.since, self.page_size, wait)
+        changes = page.get("changes", [])
+        self.stats["latestSequence"] = page.get("latestSequence", self.since)
+        if not changes:
+            self.stats["lag"] = max(0, self.stats["latestSequence"] - self.since)
+            return 0
+
+        started = time.perf_counter()
+        # Only the last change per record matters within a page
+        latest_ops = {}
+        for change in changes:
+            latest_ops.pop(change["id"], None)
+            latest_ops[change["id"]] = (change["operation"], change.get("kind"))
+
+        batch = BulkBatch()
+        for encoded in self._actions(latest_ops):
+            if len(batch) and (len(batch) >= self.max_docs or batch.nbytes + len(encoded) > self.max_bytes):
+                self._send(batch)
+                batch = BulkBatch()
+            batch.add(encoded)
+        self._send(batch)
+
+        elapsed = time.perf_counter() - started
+        self.since = page["nextSince"]
+        self._save_checkpoint()
+        self.stats.update({
+            "since": self.since,
+            "lag": max(0, self.stats["latestSequence"] - self.since),
+            "lastFlushSeconds": round(elapsed, 3),
+            "docsPerSecond": round(len(latest_ops) / elapsed, 1) if elapsed else 0.0
+        })
+        logger.info(f"📤 Indexed page up to seq {self.since}: {len(latest_ops)} record(s) in {elapsed:.2f}s, "
+                    f"lag {self.stats['lag']}")
+        if self.on_flush:
+            self.on_flush(dict(self.stats))
+        return len(changes)
+
+    def run_until_caught_up(self) -> dict:
+        while self.run_once():
+            pass
+        return self.stats
+
+    def run_forever(self, wait: float = 20):
+        while True:
+            try:
+                self.run_once(wait=wait)
+            except requests.RequestException as e:
+                logger.warning(f"⚠️ Storage unavailable ({e}); retrying")
+                time.sleep(5)
+
+# -------------------------
+# Entry point
+# -------------------------
+def search_cache_notifier(base_url: str, session: Optional[requests.Session] = None) -> Callable[[dict], None]:
+    """
+    on_flush hook advancing the search service's cache generation to the
+    pipeline checkpoint. Failures are logged, never raised: the cache TTL still
+    bounds staleness and indexing must not stall on the search service.
+    """
+    url = f"{base_url.rstrip('/')}/api/search/v2/cache/generation"
+    session = session or requests.Session()
+
+    def notify(stats: dict) -> None:
+        try:
+            session.post(url, json={"generation": stats["since"]}, timeout=5).raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Could not bump search cache generation: {e}")
+
+    return notify
+
+
+def build_client(dry_run: bool = False):
+    if dry_run:
+        return InMemorySearchClient()
+    from backends import connect_backend
+    return connect_backend(SEARCH_BACKEND, host=SEARCH_HOST, port=SEARCH_PORT, local_dir=LOCAL_INDEX_DIR,
+                           http_compress=True, timeout=120)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index storage record changes into OpenSearch")
+    parser.add_argument("--since", type=int, help="Start sequence (overrides the checkpoint; 0 = full reindex)")
+    parser.add_argument("--follow", action="store_true", help="Keep tailing the change feed")
+    parser.add_argument("--dry-run", action="store_true", help="Use the in-process stand-in instead of OpenSearch")
+    parser.add_argument("--per-kind", action="store_true", help="Write to schema-mapped per-kind indices (mappings.py)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+    client = build_client(args.dry_run)
+    routing = {}
+    if args.per_kind:
+        if getattr(client, "name", None) == "local":
+            parser.error("--per-kind needs OpenSearch; the embedded index has no per-kind aliases")
+        from mappings import KindIndexManager
+        manager = KindIndexManager(client)
+        routing = {"transform": manager.transform, "index_for": manager.index_for}
+    if SEARCH_SERVICE_URL:
+        routing["on_flush"] = search_cache_notifier(SEARCH_SERVICE_URL)
+    pipeline = IndexingPipeline(client, StorageChangeSource(), **routing)
+    if args.since is not None:
+        pipeline.since = args.since
+
+    if args.follow:
+        pipeline.run_forever()
+    else:
+        stats = pipeline.run_until_caught_up()
+        print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1162 @@
+# ------------------------------------------------------------------------------
+# local_search.py
+#
+# Embedded single-node search engine, used when OpenSearch is not available
+# (see backends.py).
+#
+# LocalSearchClient implements the opensearch-py calls the service and the
+# indexer make (info, index, get, delete, bulk, search, indices.*). It
+# understands the query DSL query_builder.py emits (bool, term(s), wildcard,
+# range, exists, simple_query_string, geo_bounding_box, geo_distance, sort,
+# search_after, _source includes, terms aggregations) plus match, multi_match,
+# prefix and match_all.
+#
+# Each index is a directory of immutable segments:
+#   manifest.json        live segments and their deleted ordinals
+#   seg-NNNNNN.docs      concatenated JSON sources
+#   seg-NNNNNN.offsets   uint64 start offsets into .docs (one per doc, plus end)
+#   seg-NNNNNN.post      uint32 postings (doc ordinals), one run per term
+#   seg-NNNNNN.terms     JSON: doc ids, field names and [term, start, count]
+# Segment files are read through mmap; only the term dictionary is held in
+# memory. Files use native byte order and are not portable across platforms.
+#
+# Writes go to an in-memory buffer that is searchable straight away. The buffer
+# becomes a new segment on refresh, after every bulk request, every
+# LOCAL_INDEX_BUFFER_DOCS documents, LOCAL_INDEX_COMMIT_SECONDS after the
+# first buffered write, and at exit. Deletes are tombstones in the manifest.
+# Past LOCAL_INDEX_MAX_SEGMENTS, all segments are merged into one.
+#
+# The manifest is replaced atomically. Other processes (e.g. the indexer and
+# the service sharing LOCAL_INDEX_DIR) reload it when it changes. Commits are
+# serialized with flock where the platform has fcntl.
+#
+# Terms: every leaf value is indexed as an exact keyword under its dotted path.
+# Every string is also tokenized (lowercase \w+) for full text. In text
+# queries, `data_text` means every string under `data` (the copy_to field of
+# mapped indices). Range, exists, geo and sort read the stored source, except
+# sorting on `id`/`_id`, which uses the document id.
+#
+# Per-kind aliases do not exist locally, so structured queries resolve to the
+# shared osdu-records index and rely on their kind filter. With
+# ignore_unavailable, a missing index in a search falls back to it as well.
+# ------------------------------------------------------------------------------
+import atexit
+import bisect
+import fnmatch
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from array import array
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from backends import SearchBackend
+from mappings import RECORDS_ALIAS, TEXT_FIELD, wgs84_point
+
+logger = logging.getLogger("local_search")
+
+BUFFER_DOCS = int(os.getenv("LOCAL_INDEX_BUFFER_DOCS", "1000"))
+COMMIT_SECONDS = float(os.getenv("LOCAL_INDEX_COMMIT_SECONDS", "1"))
+MAX_SEGMENTS = int(os.getenv("LOCAL_INDEX_MAX_SEGMENTS", "8"))
+
+KEYWORD = "k"
+TEXT = "t"
+TOKEN_RE = re.compile(r"\w+")
+QUERY_TOKEN_RE = re.compile(r"\w+\*?")
+INDEX_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._+-]*")
+DISTANCE_RE = re.compile(r"^\s*([0-9.eE+-]+)\s*(m|km|mi|ft|yd|nmi)?\s*$")
+DISTANCE_UNITS = {"m": 1.0, "km": 1000.0, "mi": 1609.344, "ft": 0.3048, "yd": 0.9144, "nmi": 1852.0}
+EARTH_RADIUS_M = 6371008.8
+MANIFEST = "manifest.json"
+
+
+class LocalSearchError(Exception):
+    status_code = 400
+
+
+class LocalNotFoundError(LocalSearchError):
+    status_code = 404
+
+# -------------------------
+# Terms
+# -------------------------
+def _term(kind: str, field: str, value: str) -> str:
+    return f"{kind}\x00{field}\x00{value}"
+
+
+def _keyword(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _leaves(node, path: str = ""):
+    """
+    Yields (dotted path, scalar) for every leaf; list items share the list's path.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _leaves(value, f"{path}.{key}" if path else key)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _leaves(value, path)
+    elif node is not None and path:
+        yield path, node
+
+
+def _analyze(doc: dict) -> Tuple[Set[str], Set[str]]:
+    terms, fields = set(), set()
+    for path, value in _leaves(doc):
+        fields.add(path)
+        terms.add(_term(KEYWORD, path, _keyword(value)))
+        if isinstance(value, str):
+            for token in TOKEN_RE.findall(value.lower()):
+                terms.add(_term(TEXT, path, token))
+    return terms, fields
+
+
+def _field(name: str) -> str:
+    return name[:-len(".keyword")] if name.endswith(".keyword") else name
+
+
+def _values(doc: dict, field: str) -> list:
+    """
+    Values at a dotted path, with lists flattened.
+    """
+    nodes = [doc]
+    for part in _field(field).split("."):
+        found = []
+        for node in nodes:
+            for item in (node if isinstance(node, list) else [node]):
+                if isinstance(item, dict) and part in item:
+                    found.append(item[part])
+        nodes = found
+    values = []
+    for node in nodes:
+        if isinstance(node, list):
+            values.extend(v for v in node if v is not None)
+        elif node is not None:
+            values.append(node)
+    return values
+
+
+def _sorted_prefix(terms: List[str], prefix: str):
+    i = bisect.bisect_left(terms, prefix)
+    while i < len(terms) and terms[i].startswith(prefix):
+        yield terms[i]
+        i += 1
+
+# -------------------------
+# Segments
+# -------------------------
+class _BufferSegment:
+    """
+    Uncommitted documents, searchable like a segment.
+    """
+    name = None
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.docs: List[bytes] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.fields: Set[str] = set()
+        self._terms: Optional[List[str]] = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, doc_id: str, encoded: bytes, terms: Set[str], fields: Set[str]) -> int:
+        ordinal = len(self.ids)
+        self.ids.append(doc_id)
+        self.docs.append(encoded)
+        for term in terms:
+            self.postings.setdefault(term, []).append(ordinal)
+        self.fields |= fields
+        self._terms = None
+        return ordinal
+
+    def posting(self, term: str) -> List[int]:
+        return self.postings.get(term, [])
+
+    def terms_with_prefix(self, prefix: str):
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        return _sorted_prefix(self._terms, prefix)
+
+    def source_bytes(self, ordinal: int) -> bytes:
+        return self.docs[ordinal]
+
+    def close(self):
+        pass
+
+
+class _Segment:
+    """
+    Committed, immutable segment read through mmap.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.name = name
+        base = os.path.join(directory, name)
+        with open(base + ".terms", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids: List[str] = meta["ids"]
+        self.fields: Set[str] = set(meta["fields"])
+        self._terms = [t for t, _, _ in meta["terms"]]
+        self._ranges = {t: (start, count) for t, start, count in meta["terms"]}
+        self._files, self._maps, self._views = [], [], []
+        self._docs = self._map(base + ".docs", "B")
+        self._offsets = self._map(base + ".offsets", "Q")
+        self._postings = self._map(base + ".post", "I")
+
+    def _map(self, path: str, fmt: str):
+        f = open(path, "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b"").cast(fmt)
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(m)
+        view = memoryview(m).cast(fmt)
+        self._views.append(view)
+        return view
+
+    def __len__(self):
+        return len(self.ids)
+
+    def posting(self, term: str) -> List[int]:
+        found = self._ranges.get(term)
+        if found is None:
+            return []
+        start, count = found
+        return self._postings[start:start + count].tolist()
+
+    def terms_with_prefix(self, prefix: str):
+        return _sorted_prefix(self._terms, prefix)
+
+    def source_bytes(self, ordinal: int) -> bytes:
+        return bytes(self._docs[self._offsets[ordinal]:self._offsets[ordinal + 1]])
+
+    def close(self):
+        try:
+            for view in self._views:
+                view.release()
+            for m in self._maps:
+                m.close()
+        except BufferError:
+            logger.debug(f"Segment {self.name} still in use; leaving it to the garbage collector")
+        for f in self._files:
+            f.close()
+
+
+def _write_segment(directory: str, name: str, ids: List[str], docs: List[bytes],
+                   postings: Dict[str, List[int]], fields: Set[str]) -> None:
+    base = os.path.join(directory, name)
+    offsets = array("Q", [0])
+    with open(base + ".docs", "wb") as f:
+        for encoded in docs:
+            f.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+    with open(base + ".offsets", "wb") as f:
+        offsets.tofile(f)
+    terms, flat = [], array("I")
+    for term in sorted(postings):
+        ordinals = postings[term]
+        terms.append([term, len(flat), len(ordinals)])
+        flat.extend(ordinals)
+    with open(base + ".post", "wb") as f:
+        flat.tofile(f)
+    with open(base + ".terms", "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "fields": sorted(fields), "terms": terms}, f, separators=(",", ":"))
+
+
+def _segment_files(directory: str, name: str) -> List[str]:
+    return [os.path.join(directory, name + ext) for ext in (".docs", ".offsets", ".post", ".terms")]
+
+# -------------------------
+# Index
+# -------------------------
+class LocalIndex:
+    """
+    One index directory: committed segments plus the write buffer.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self.segments: List[_Segment] = []
+        self.deleted: Dict[str, Set[int]] = {}
+        self.next_segment = 1
+        self._committed: Dict[str, Tuple[_Segment, int]] = {}
+        self._stamp = None
+        self._reset_buffer()
+        self._reload()
+
+    def _reset_buffer(self):
+        self.buffer = _BufferSegment()
+        self.buffer_deleted: Set[int] = set()
+        self.buffer_ids: Dict[str, int] = {}
+        self.dirty: Set[str] = set()
+        self.buffered_since: Optional[float] = None
+
+    # ---- manifest ----
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    def _manifest_stamp(self):
+        try:
+            st = os.stat(self._manifest_path())
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _reload(self, retries: int = 3):
+        """
+        Picks up segments committed by this or another process.
+        """
+        stamp = self._manifest_stamp()
+        if stamp == self._stamp:
+            return
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {"nextSegment": 1, "segments": []}
+
+        open_segments = {s.name: s for s in self.segments}
+        try:
+            segments = [open_segments.get(entry["name"]) or _Segment(self.directory, entry["name"])
+                        for entry in manifest["segments"]]
+        except FileNotFoundError:
+            # merged away between reading the manifest and opening its files
+            if retries:
+                return self._reload(retries - 1)
+            raise
+
+        keep = {s.name for s in segments}
+        for segment in self.segments:
+            if segment.name not in keep:
+                segment.close()
+        self.segments = segments
+        self.deleted = {entry["name"]: set(entry.get("deleted", [])) for entry in manifest["segments"]}
+        self.next_segment = manifest.get("nextSegment", 1)
+        self._committed = {}
+        for segment in self.segments:
+            dead = self.deleted.get(segment.name, set())
+            for ordinal, doc_id in enumerate(segment.ids):
+                if ordinal not in dead:
+                    self._committed[doc_id] = (segment, ordinal)
+        self._stamp = stamp
+
+    def _write_manifest(self):
+        manifest = {
+            "nextSegment": self.next_segment,
+            "segments": [{"name": s.name, "deleted": sorted(self.deleted.get(s.name, ()))} for s in self.segments]
+        }
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp, self._manifest_path())
+        self._stamp = self._manifest_stamp()
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, ".lock"), "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ---- writes ----
+    def upsert(self, doc_id: str, doc: dict) -> str:
+        encoded = json.dumps(doc, separators=(",", ":"), default=str).encode("utf-8")
+        terms, fields = _analyze(doc)
+        with self._lock:
+            existed = self._exists(doc_id)
+            previous = self.buffer_ids.get(doc_id)
+            if previous is not None:
+                self.buffer_deleted.add(previous)
+            self.buffer_ids[doc_id] = self.buffer.add(doc_id, encoded, terms, fields)
+            self.dirty.add(doc_id)
+            self._buffered()
+        return "updated" if existed else "created"
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            found = self._exists(doc_id)
+            previous = self.buffer_ids.pop(doc_id, None)
+            if previous is not None:
+                self.buffer_deleted.add(previous)
+            self.dirty.add(doc_id)
+            self._buffered()
+        return found
+
+    def _exists(self, doc_id: str) -> bool:
+        if doc_id in self.buffer_ids:
+            return True
+        return doc_id not in self.dirty and doc_id in self._committed
+
+    def _buffered(self):
+        now = time.monotonic()
+        if self.buffered_since is None:
+            self.buffered_since = now
+        if len(self.buffer) >= BUFFER_DOCS or now - self.buffered_since >= COMMIT_SECONDS:
+            self.commit()
+
+    def commit(self):
+        """
+        Writes the buffer as a new segment and records tombstones.
+        """
+        with self._write_lock():
+            if not self.dirty:
+                return
+            self._reload()
+            for doc_id in self.dirty:
+                location = self._committed.pop(doc_id, None)
+                if location:
+                    segment, ordinal = location
+                    self.deleted.setdefault(segment.name, set()).add(ordinal)
+
+            live = [o for o in range(len(self.buffer)) if o not in self.buffer_deleted]
+            if live:
+                renumber = {old: new for new, old in enumerate(live)}
+                postings = {}
+                for term, ordinals in self.buffer.postings.items():
+                    kept = [renumber[o] for o in ordinals if o in renumber]
+                    if kept:
+                        postings[term] = kept
+                name = f"seg-{self.next_segment:06d}"
+                self.next_segment += 1
+                _write_segment(self.directory, name, [self.buffer.ids[o] for o in live],
+                               [self.buffer.docs[o] for o in live], postings, self.buffer.fields)
+                segment = _Segment(self.directory, name)
+                self.segments.append(segment)
+                for ordinal, doc_id in enumerate(segment.ids):
+                    self._committed[doc_id] = (segment, ordinal)
+
+            retired = self._merge() if len(self.segments) > MAX_SEGMENTS else []
+            self._write_manifest()
+            self._reset_buffer()
+            for segment in retired:
+                segment.close()
+                for path in _segment_files(self.directory, segment.name):
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logger.debug(f"Could not remove {path}: {e}")
+
+    def _merge(self) -> List[_Segment]:
+        """
+        Rewrites every live document into one segment; returns the segments it replaces.
+        """
+        ids, docs, postings, fields = [], [], {}, set()
+        for segment in self.segments:
+            dead = self.deleted.get(segment.name, set())
+            for ordinal in range(len(segment)):
+                if ordinal in dead:
+                    continue
+                encoded = segment.source_bytes(ordinal)
+                terms, doc_fields = _analyze(json.loads(encoded))
+                new = len(ids)
+                ids.append(segment.ids[ordinal])
+                docs.append(encoded)
+                for term in terms:
+                    postings.setdefault(term, []).append(new)
+                fields |= doc_fields
+
+        retired = self.segments
+        self.segments, self.deleted, self._committed = [], {}, {}
+        if ids:
+            name = f"seg-{self.next_segment:06d}"
+            self.next_segment += 1
+            _write_segment(self.directory, name, ids, docs, postings, fields)
+            merged = _Segment(self.directory, name)
+            self.segments = [merged]
+            self._committed = {doc_id: (merged, ordinal) for ordinal, doc_id in enumerate(ids)}
+        logger.info(f"🧹 Merged {len(retired)} segments of {os.path.basename(self.directory)} ({len(ids)} docs)")
+        return retired
+
+    def close(self):
+        with self._lock:
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
+            self._stamp = None
+
+    # ---- reads ----
+    def get(self, doc_id: str) -> Optional[dict]:
+        with self._lock:
+            self._reload()
+            if doc_id in self.buffer_ids:
+                return json.loads(self.buffer.source_bytes(self.buffer_ids[doc_id]))
+            if doc_id in self.dirty or doc_id not in self._committed:
+                return None
+            segment, ordinal = self._committed[doc_id]
+            return json.loads(segment.source_bytes(ordinal))
+
+    def views(self) -> List[Tuple[object, Set[int], Set[str]]]:
+        """
+        (segment, deleted ordinals, ids shadowed by the buffer) for every segment.
+        """
+        with self._lock:
+            self._reload()
+            views = [(s, self.deleted.get(s.name, set()), self.dirty) for s in self.segments]
+            if len(self.buffer):
+                views.append((self.buffer, self.buffer_deleted, set()))
+            return views
+
+    def count(self) -> int:
+        with self._lock:
+            self._reload()
+            shadowed = sum(1 for doc_id in self.dirty if doc_id in self._committed)
+            return len(self._committed) - shadowed + len(self.buffer_ids)
+
+# -------------------------
+# Query evaluation
+# -------------------------
+def _point(value) -> Optional[Tuple[float, float]]:
+    """
+    (lat, lon) from a geo_point-style value or an OSDU spatial location.
+    """
+    try:
+        if isinstance(value, dict):
+            if "lat" in value and "lon" in value:
+                return float(value["lat"]), float(value["lon"])
+            if "Wgs84Coordinates" in value:
+                point = wgs84_point(value)
+                return (point["lat"], point["lon"]) if point else None
+        if isinstance(value, (list, tuple)) and len(value) >= 2:
+            return float(value[1]), float(value[0])
+        if isinstance(value, str) and "," in value:
+            lat, lon = value.split(",", 1)
+            return float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _distance_metres(distance) -> float:
+    if isinstance(distance, (int, float)):
+        return float(distance)
+    match = DISTANCE_RE.match(str(distance))
+    if not match:
+        raise LocalSearchError(f"Invalid distance: {distance}")
+    return float(match.group(1)) * DISTANCE_UNITS[match.group(2) or "m"]
+
+
+def _comparable(value):
+    if isinstance(value, bool):
+        return 0, int(value)
+    if isinstance(value, (int, float)):
+        return 0, value
+    return 1, str(value)
+
+
+def _in_range(value, bounds: dict) -> bool:
+    if isinstance(value, (dict, list)):
+        return False
+    for op, bound in bounds.items():
+        a, b = _comparable(value), _comparable(bound)
+        if a[0] != b[0]:
+            try:
+                a, b = (0, float(value)), (0, float(bound))
+            except (TypeError, ValueError):
+                return False
+        if (op == "gt" and not a > b) or (op == "gte" and not a >= b) \
+                or (op == "lt" and not a < b) or (op == "lte" and not a <= b):
+            return False
+    return True
+
+
+def _field_and_spec(clause: dict, reserved=("boost", "_name")) -> Tuple[str, object]:
+    for key, value in clause.items():
+        if key not in reserved:
+            return key, value
+    raise LocalSearchError(f"Query clause without a field: {clause}")
+
+
+POSTING_CLAUSES = ("term", "terms", "wildcard", "prefix", "match", "multi_match",
+                   "simple_query_string", "query_string")
+
+
+class _Evaluator:
+    """
+    Evaluates a query against one segment, returning matching ordinals.
+    `None` as a candidate set means every ordinal.
+    """
+
+    def __init__(self, search: "_Search", segment):
+        self.search = search
+        self.segment = segment
+        self.scores: Dict[int, float] = {}
+        self._sources: Dict[int, dict] = {}
+
+    def source(self, ordinal: int) -> dict:
+        doc = self._sources.get(ordinal)
+        if doc is None:
+            doc = self._sources[ordinal] = json.loads(self.segment.source_bytes(ordinal))
+        return doc
+
+    def _all(self, candidates: Optional[Set[int]]) -> Iterable[int]:
+        return range(len(self.segment)) if candidates is None else candidates
+
+    def _restrict(self, matched: Set[int], candidates: Optional[Set[int]]) -> Set[int]:
+        return matched if candidates is None else matched & candidates
+
+    def match(self, query: dict, candidates: Optional[Set[int]] = None) -> Optional[Set[int]]:
+        if not query:
+            return candidates
+        if len(query) != 1:
+            raise LocalSearchError(f"Expected one query clause, got {list(query)}")
+        kind, spec = next(iter(query.items()))
+        handler = getattr(self, f"_q_{kind}", None)
+        if handler is None:
+            raise LocalSearchError(f"Query type not supported by the local backend: {kind}")
+        return handler(spec, candidates)
+
+    # ---- compound ----
+    def _q_match_all(self, spec, candidates):
+        return candidates
+
+    def _q_match_none(self, spec, candidates):
+        return set()
+
+    def _q_bool(self, spec: dict, candidates):
+        def clauses(key):
+            value = spec.get(key) or []
+            return value if isinstance(value, list) else [value]
+
+        required = clauses("must") + clauses("filter")
+        # postings first, so source-reading clauses only see narrowed candidates
+        required.sort(key=lambda c: next(iter(c)) not in POSTING_CLAUSES)
+        result = candidates
+        for clause in required:
+            result = self.match(clause, result)
+
+        should = clauses("should")
+        minimum = int(spec.get("minimum_should_match", 0 if required else 1) or 0) if should else 0
+        if minimum:
+            counts: Dict[int, int] = {}
+            for clause in should:
+                matched = self.match(clause, result)
+                for ordinal in self._all(matched):
+                    counts[ordinal] = counts.get(ordinal, 0) + 1
+            result = {o for o, n in counts.items() if n >= minimum}
+
+        for clause in clauses("must_not"):
+            universe = set(self._all(result))
+            result = universe - self.match(clause, universe)
+        return result
+
+    # ---- keyword ----
+    def _q_term(self, spec: dict, candidates):
+        field, value = _field_and_spec(spec)
+        if isinstance(value, dict):
+            value = value.get("value")
+        matched = set(self.segment.posting(_term(KEYWORD, _field(field), _keyword(value))))
+        return self._restrict(matched, candidates)
+
+    def _q_terms(self, spec: dict, candidates):
+        field, values = _field_and_spec(spec)
+        matched = set()
+        for value in values if isinstance(values, list) else [values]:
+            matched.update(self.segment.posting(_term(KEYWORD, _field(field), _keyword(value))))
+        return self._restrict(matched, candidates)
+
+    def _q_wildcard(self, spec: dict, candidates):
+        field, pattern = _field_and_spec(spec)
+        if isinstance(pattern, dict):
+            pattern = pattern.get("value", pattern.get("wildcard"))
+        pattern = str(pattern)
+        literal = re.split(r"[*?]", pattern, 1)[0]
+        base = _term(KEYWORD, _field(field), "")
+        matched = set()
+        for term in self.segment.terms_with_prefix(base + literal):
+            if fnmatch.fnmatchcase(term[len(base):], pattern):
+                matched.update(self.segment.posting(term))
+        return self._restrict(matched, candidates)
+
+    def _q_prefix(self, spec: dict, candidates):
+        field, value = _field_and_spec(spec)
+        if isinstance(value, dict):
+            value = value.get("value")
+        base = _term(KEYWORD, _field(field), str(value))
+        matched = set()
+        for term in self.segment.terms_with_prefix(base):
+            matched.update(self.segment.posting(term))
+        return self._restrict(matched, candidates)
+
+    # ---- full text ----
+    def _text(self, text: str, fields: List[str], operator: str, candidates):
+        tokens = QUERY_TOKEN_RE.findall(str(text or "").lower())
+        if not tokens:
+            return set()
+        paths = self.search.text_fields(fields)
+        combined = None
+        for token in tokens:
+            matched = set()
+            for path in paths:
+                if token.endswith("*"):
+                    for term in self.segment.terms_with_prefix(_term(TEXT, path, token[:-1])):
+                        matched.update(self.segment.posting(term))
+                else:
+                    matched.update(self.segment.posting(_term(TEXT, path, token)))
+            matched = self._restrict(matched, candidates)
+            idf = self.search.idf(token, paths)
+            for ordinal in matched:
+                self.scores[ordinal] = self.scores.get(ordinal, 0.0) + idf
+            if combined is None:
+                combined = matched
+            elif operator == "and":
+                combined &= matched
+            else:
+                combined |= matched
+        return combined
+
+    def _q_match(self, spec: dict, candidates):
+        field, value = _field_and_spec(spec)
+        operator = "or"
+        if isinstance(value, dict):
+            operator = str(value.get("operator", "or")).lower()
+            value = value.get("query")
+        return self._text(value, [field], operator, candidates)
+
+    def _q_multi_match(self, spec: dict, candidates):
+        return self._text(spec.get("query"), spec.get("fields") or ["*"],
+                          str(spec.get("operator", "or")).lower(), candidates)
+
+    def _q_simple_query_string(self, spec: dict, candidates):
+        return self._text(spec.get("query"), spec.get("fields") or ["*"],
+                          str(spec.get("default_operator", "or")).lower(), candidates)
+
+    _q_query_string = _q_simple_query_string
+
+    # ---- source-based ----
+    def _q_exists(self, spec: dict, candidates):
+        field = _field(spec["field"])
+        if field not in self.segment.fields and not any(f.startswith(field + ".") for f in self.segment.fields):
+            return set()
+        return {o for o in self._all(candidates) if _values(self.source(o), field)}
+
+    def _q_range(self, spec: dict, candidates):
+        field, bounds = _field_and_spec(spec)
+        bounds = {op: bounds[op] for op in ("gt", "gte", "lt", "lte") if op in bounds}
+        return {o for o in self._all(candidates)
+                if any(_in_range(v, bounds) for v in _values(self.source(o), field))}
+
+    def _points(self, ordinal: int, field: str):
+        for value in _values(self.source(ordinal), field):
+            point = _point(value)
+            if point:
+                yield point
+
+    def _q_geo_bounding_box(self, spec: dict, candidates):
+        field, box = _field_and_spec(spec, reserved=("boost", "_name", "validation_method", "type",
+                                                     "ignore_unmapped"))
+        top, left = _point(box["top_left"])
+        bottom, right = _point(box["bottom_right"])
+
+        def inside(lat, lon):
+            in_lon = left <= lon <= right if left <= right else (lon >= left or lon <= right)
+            return bottom <= lat <= top and in_lon
+
+        return {o for o in self._all(candidates) if any(inside(*p) for p in self._points(o, field))}
+
+    def _q_geo_distance(self, spec: dict, candidates):
+        field, origin = _field_and_spec(spec, reserved=("boost", "_name", "distance", "distance_type",
+                                                        "validation_method", "ignore_unmapped"))
+        lat0, lon0 = _point(origin)
+        limit = _distance_metres(spec["distance"])
+        return {o for o in self._all(candidates)
+                if any(_haversine(lat0, lon0, lat, lon) <= limit for lat, lon in self._points(o, field))}
+
+
+class _Search:
+    """
+    One search request across the segments of the resolved indices.
+    """
+
+    def __init__(self, stores: List[Tuple[str, LocalIndex]]):
+        self.views = [(name, segment, deleted, shadowed)
+                      for name, store in stores for segment, deleted, shadowed in store.views()]
+        self.fields: Set[str] = set()
+        for _, segment, _, _ in self.views:
+            self.fields |= segment.fields
+        self.total_docs = sum(store.count() for _, store in stores)
+        self._df: Dict[Tuple[str, tuple], int] = {}
+
+    def text_fields(self, patterns: List[str]) -> List[str]:
+        expanded = []
+        for pattern in patterns:
+            pattern = pattern.split("^", 1)[0]
+            if pattern in ("_all", "*"):
+                candidates = ["*"]
+            elif pattern == TEXT_FIELD:
+                candidates = [TEXT_FIELD, "data.*"]
+            else:
+                candidates = [_field(pattern)]
+            for candidate in candidates:
+                expanded += [f for f in self.fields if fnmatch.fnmatchcase(f, candidate)]
+        return sorted(set(expanded))
+
+    def idf(self, token: str, paths: List[str]) -> float:
+        key = (token, tuple(paths))
+        if key not in self._df:
+            self._df[key] = sum(len(segment.posting(_term(TEXT, path, token)))
+                                for _, segment, _, _ in self.views for path in paths)
+        return math.log(1 + (self.total_docs + 1) / (self._df[key] + 1))
+
+
+def _sort_spec(sort) -> List[Tuple[str, str]]:
+    if not sort:
+        return [("_score", "desc")]
+    specs = []
+    for entry in sort if isinstance(sort, list) else [sort]:
+        if isinstance(entry, str):
+            specs.append((entry, "desc" if entry == "_score" else "asc"))
+            continue
+        for field, options in entry.items():
+            order = options.get("order", "asc") if isinstance(options, dict) else options
+            specs.append((field, str(order).lower()))
+    return specs
+
+
+def _sort_value(hit: dict, field: str, order: str):
+    if field == "_score":
+        return hit["_score"]
+    if field in ("_id", "id"):
+        return hit["_id"]
+    values = [v for v in _values(hit["_source"](), field) if not isinstance(v, (dict, list))]
+    if not values:
+        return None
+    keyed = sorted(values, key=_comparable)
+    return keyed[-1] if order == "desc" else keyed[0]
+
+
+def _after(values: list, cursor: list, orders: List[str]) -> bool:
+    for value, bound, order in zip(values, cursor, orders):
+        if value == bound:
+            continue
+        if value is None:
+            return True
+        if bound is None:
+            return False
+        a, b = _comparable(value), _comparable(bound)
+        if a == b:
+            continue
+        return a > b if order == "asc" else a < b
+    return False
+
+
+def _project(source: dict, includes) -> dict:
+    if includes is None or includes is True:
+        return source
+    if includes is False:
+        return {}
+    if isinstance(includes, dict):
+        includes = includes.get("includes") or ["*"]
+    if isinstance(includes, str):
+        includes = [includes]
+    if "*" in includes:
+        return source
+    projected: dict = {}
+    for path in includes:
+        parts = path[:-2].split(".") if path.endswith(".*") else path.split(".")
+        node = source
+        for part in parts:
+            node = node.get(part) if isinstance(node, dict) else None
+            if node is None:
+                break
+        if node is None:
+            continue
+        target = projected
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = node
+    return projected
+
+# -------------------------
+# Client
+# -------------------------
+class _Indices:
+    """
+    The `client.indices` namespace.
+    """
+
+    def __init__(self, client: "LocalSearchClient"):
+        self._client = client
+
+    def exists(self, index: str, **kwargs) -> bool:
+        return all(os.path.isdir(self._client._path(name)) for name in index.split(","))
+
+    def create(self, index: str, body: Optional[dict] = None, **kwargs) -> dict:
+        if self.exists(index):
+            raise LocalSearchError(f"resource_already_exists_exception: {index}")
+        self._client._store(index)
+        return {"acknowledged": True, "index": index}
+
+    def delete(self, index: str, **kwargs) -> dict:
+        for name in index.split(","):
+            store = self._client._stores.pop(name, None)
+            if store:
+                store.close()
+            if not os.path.isdir(self._client._path(name)):
+                raise LocalNotFoundError(f"index_not_found_exception: {name}")
+            shutil.rmtree(self._client._path(name))
+        return {"acknowledged": True}
+
+    def refresh(self, index: Optional[str] = None, **kwargs) -> dict:
+        for _, store in self._client._resolve(index, ignore_unavailable=True):
+            store.commit()
+        return {"_shards": {"failed": 0}}
+
+
+class LocalSearchClient(SearchBackend):
+    """
+    Embedded stand-in for the OpenSearch client, backed by LocalIndex directories.
+    """
+    name = "local"
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._stores: Dict[str, LocalIndex] = {}
+        self._lock = threading.Lock()
+        self.indices = _Indices(self)
+        atexit.register(self.flush)
+
+    def _path(self, name: str) -> str:
+        if not INDEX_NAME_RE.fullmatch(name or ""):
+            raise LocalSearchError(f"Invalid index name: {name!r}")
+        return os.path.join(self.directory, name)
+
+    def _store(self, name: str) -> LocalIndex:
+        path = self._path(name)
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = self._stores[name] = LocalIndex(path)
+            return store
+
+    def _existing(self) -> List[str]:
+        return sorted(n for n in os.listdir(self.directory)
+                      if INDEX_NAME_RE.fullmatch(n) and os.path.isdir(os.path.join(self.directory, n)))
+
+    def _resolve(self, index: Optional[str], ignore_unavailable: bool = False) -> List[Tuple[str, LocalIndex]]:
+        existing = self._existing()
+        names: List[str] = []
+        for name in (index or "_all").split(","):
+            name = name.strip()
+            if name in ("_all", "*") or (name == RECORDS_ALIAS and name not in existing):
+                names += existing
+            elif "*" in name:
+                names += [n for n in existing if fnmatch.fnmatchcase(n, name)]
+            elif name in existing:
+                names.append(name)
+            elif not ignore_unavailable:
+                raise LocalNotFoundError(f"index_not_found_exception: {name}")
+            elif RECORDS_ALIAS in existing:
+                names.append(RECORDS_ALIAS)
+        return [(name, self._store(name)) for name in dict.fromkeys(names)]
+
+    @staticmethod
+    def _wants_refresh(refresh) -> bool:
+        return refresh is True or str(refresh).lower() in ("true", "wait_for")
+
+    def info(self, **kwargs) -> dict:
+        return {
+            "name": "local",
+            "cluster_name": "embedded",
+            "version": {"number": "local", "distribution": "osdu-local-search"},
+            "tagline": "Embedded single-node index"
+        }
+
+    def index(self, index: str, body: dict, id: Optional[str] = None, refresh=False, **kwargs) -> dict:
+        doc_id = id or uuid.uuid4().hex
+        store = self._store(index)
+        result = store.upsert(doc_id, body)
+        if self._wants_refresh(refresh):
+            store.commit()
+        return {"_index": index, "_id": doc_id, "result": result, "_shards": {"total": 1, "successful": 1, "failed": 0}}
+
+    def get(self, index: str, id: str, **kwargs) -> dict:
+        source = self._store(index).get(id) if index in self._existing() else None
+        if source is None:
+            raise LocalNotFoundError(f"{index}/{id} not found")
+        return {"_index": index, "_id": id, "found": True, "_source": source}
+
+    def delete(self, index: str, id: str, refresh=False, **kwargs) -> dict:
+        store = self._store(index)
+        if not store.delete(id):
+            raise LocalNotFoundError(f"{index}/{id} not found")
+        if self._wants_refresh(refresh):
+            store.commit()
+        return {"_index": index, "_id": id, "result": "deleted"}
+
+    def bulk(self, body, index: Optional[str] = None, refresh=False, **kwargs) -> dict:
+        """
+        Applies an NDJSON (bytes / str) or list-of-dicts _bulk body and commits
+        every index it touched.
+        """
+        started = time.perf_counter()
+        if isinstance(body, (bytes, bytearray)):
+            body = body.decode("utf-8")
+        if isinstance(body, str):
+            lines = [json.loads(line) for line in body.split("\n") if line.strip()]
+        else:
+            lines = list(body)
+
+        items, errors, touched, i = [], False, {}, 0
+        while i < len(lines):
+            op, meta = next(iter(lines[i].items()))
+            i += 1
+            target = meta.get("_index") or index
+            doc_id = meta.get("_id") or uuid.uuid4().hex
+            source = None
+            if op in ("index", "create", "update"):
+                source = lines[i]
+                i += 1
+            store = touched[target] = touched.get(target) or self._store(target)
+
+            if op == "index":
+                result = store.upsert(doc_id, source)
+                items.append({op: {"_index": target, "_id": doc_id, "result": result,
+                                   "status": 201 if result == "created" else 200}})
+            elif op == "create" and store.get(doc_id) is not None:
+                errors = True
+                items.append({op: {"_index": target, "_id": doc_id, "status": 409,
+                                   "error": {"type": "version_conflict_engine_exception"}}})
+            elif op == "create":
+                store.upsert(doc_id, source)
+                items.append({op: {"_index": target, "_id": doc_id, "result": "created", "status": 201}})
+            elif op == "delete":
+                found = store.delete(doc_id)
+                items.append({op: {"_index": target, "_id": doc_id, "result": "deleted" if found else "not_found",
+                                   "status": 200 if found else 404}})
+            else:
+                errors = True
+                items.append({op: {"_index": target, "_id": doc_id, "status": 400,
+                                   "error": {"type": "illegal_argument_exception",
+                                             "reason": f"{op} is not supported by the local backend"}}})
+
+        for store in touched.values():
+            store.commit()
+        return {"took": int((time.perf_counter() - started) * 1000), "errors": errors, "items": items}
+
+    def search(self, index: Optional[str] = None, body: Optional[dict] = None,
+               ignore_unavailable: bool = False, **kwargs) -> dict:
+        started = time.perf_counter()
+        body = body or {}
+        stores = self._resolve(index, ignore_unavailable)
+        search = _Search(stores)
+
+        hits, max_score = [], None
+        for name, segment, deleted, shadowed in search.views:
+            evaluator = _Evaluator(search, segment)
+            matched = evaluator.match(body.get("query") or {"match_all": {}})
+            for ordinal in (range(len(segment)) if matched is None else sorted(matched)):
+                doc_id = segment.ids[ordinal]
+                if ordinal in deleted or doc_id in shadowed:
+                    continue
+                score = evaluator.scores.get(ordinal, 1.0)
+                max_score = score if max_score is None else max(max_score, score)
+                hits.append({
+                    "_index": name,
+                    "_id": doc_id,
+                    "_score": score,
+                    "_source": (lambda e=evaluator, o=ordinal: e.source(o))
+                })
+
+        specs = _sort_spec(body.get("sort"))
+        orders = [order for _, order in specs]
+        for hit in hits:
+            hit["sort"] = [_sort_value(hit, field, order) for field, order in specs]
+        for position in reversed(range(len(specs))):
+            descending = orders[position] == "desc"
+            missing = (-1,) if descending else (2,)
+            hits.sort(key=lambda h: missing if h["sort"][position] is None else _comparable(h["sort"][position]),
+                      reverse=descending)
+
+        aggregations = self._aggregate(body.get("aggs") or body.get("aggregations") or {}, hits)
+        total = len(hits)
+        if body.get("search_after") is not None:
+            hits = [h for h in hits if _after(h["sort"], body["search_after"], orders)]
+        offset = int(body.get("from") or 0)
+        size = int(body.get("size", 10))
+        page = hits[offset:offset + size]
+
+        includes = body.get("_source", True)
+        out_hits = []
+        for hit in page:
+            out = {"_index": hit["_index"], "_id": hit["_id"], "_score": hit["_score"],
+                   "_source": _project(hit["_source"](), includes)}
+            if body.get("sort"):
+                out["sort"] = hit["sort"]
+            out_hits.append(out)
+
+        response = {
+            "took": int((time.perf_counter() - started) * 1000),
+            "timed_out": False,
+            "_shards": {"total": len(stores), "successful": len(stores), "skipped": 0, "failed": 0},
+            "hits": {"total": {"value": total, "relation": "eq"}, "max_score": max_score, "hits": out_hits}
+        }
+        if aggregations:
+            response["aggregations"] = aggregations
+        return response
+
+    @staticmethod
+    def _aggregate(aggs: dict, hits: List[dict]) -> dict:
+        results = {}
+        for name, spec in aggs.items():
+            terms = spec.get("terms")
+            if not terms:
+                raise LocalSearchError(f"Aggregation not supported by the local backend: {list(spec)}")
+            counts: Dict[str, list] = {}
+            for hit in hits:
+                seen = set()
+                for value in _values(hit["_source"](), terms["field"]):
+                    key = _keyword(value)
+                    if isinstance(value, (dict, list)) or key in seen:
+                        continue
+                    seen.add(key)
+                    counts.setdefault(key, [value, 0])[1] += 1
+            buckets = sorted(counts.values(), key=lambda kv: (-kv[1], _comparable(kv[0])))
+            results[name] = {
+                "doc_count_error_upper_bound": 0,
+                "sum_other_doc_count": sum(n for _, n in buckets[terms.get("size", 10):]),
+                "buckets": [{"key": k, "doc_count": n} for k, n in buckets[:terms.get("size", 10)]]
+            }
+        return results
+
+    def flush(self):
+        for store in list(self._stores.values()):
+            try:
+                store.commit()
+            except Exception as e:
+                logger.error(f"❌ Failed to commit local index {store.directory}: {e}")
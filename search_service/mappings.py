@@ -0,0 +1,354 @@
+# ------------------------------------------------------------------------------
+# mappings.py
+#
+# Schema-driven OpenSearch mappings, one index per kind.
+#
+# The mapping for a kind is derived from its schema in schema_registry (fetched
+# from the schema service): strings become keyword (copied into one analysed
+# data_text field for free-text search), date/date-time strings become date,
+# numbers double/long, and spatial locations (AbstractSpatialLocation refs or
+# *Location objects with Wgs84Coordinates) get a geo_point. Everything else is
+# kept in _source but not indexed ("dynamic": false).
+#
+# Each kind is written through an alias (osdu-wks-master-data--well-1.0.0)
+# pointing at a physical index named after a hash of its mapping. When a schema
+# change alters the mapping, a new physical index is created, filled with
+# _reindex from the previous one, and the alias is swapped atomically. Every
+# kind index also carries the osdu-kinds read alias (INDEX_KINDS_ALIAS) for
+# cross-kind search. The schemaless osdu-records index is left alone, so both
+# layouts can live on one cluster.
+# ------------------------------------------------------------------------------
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import requests
+
+SCHEMA_SERVICE_URL = os.getenv("SCHEMA_SERVICE_URL", "http://127.0.0.1:5000/api/schema-service/v1")
+RECORDS_ALIAS = os.getenv("INDEX_NAME", "osdu-records")
+KINDS_ALIAS = os.getenv("INDEX_KINDS_ALIAS", "osdu-kinds")
+NUMBER_OF_REPLICAS = int(os.getenv("INDEX_REPLICAS", "0"))
+REFRESH_INTERVAL = os.getenv("INDEX_REFRESH_INTERVAL", "1s")
+
+TEXT_FIELD = "data_text"
+LOCATION_FIELD = "location"
+GEO_POINT_FIELD = "Wgs84Point"
+SPATIAL_REF_MARKERS = ("AbstractSpatialLocation",)
+MAX_DEPTH = 10
+
+logger = logging.getLogger("search_mappings")
+
+KEYWORD = {"type": "keyword", "ignore_above": 256}
+TEXT_KEYWORD = {"type": "keyword", "ignore_above": 256, "copy_to": TEXT_FIELD}
+DATE = {"type": "date", "ignore_malformed": True}
+
+# Record envelope fields outside `data`
+BASE_PROPERTIES = {
+    "id": KEYWORD,
+    "kind": KEYWORD,
+    "version": {"type": "long"},
+    "createUser": KEYWORD,
+    "createTime": DATE,
+    "modifyUser": KEYWORD,
+    "modifyTime": DATE,
+    "acl": {"properties": {"viewers": KEYWORD, "owners": KEYWORD}},
+    "legal": {"properties": {
+        "legaltags": KEYWORD,
+        "otherRelevantDataCountries": KEYWORD,
+        "status": KEYWORD
+    }},
+    LOCATION_FIELD: {"type": "geo_point"},
+    TEXT_FIELD: {"type": "text"}
+}
+
+# -------------------------
+# Schema access
+# -------------------------
+def unwrap_schema(document: dict) -> dict:
+    """
+    schema_registry stores {"id", "kind", "schema": <definition>} and some
+    definitions wrap once more; descend until the node with "properties".
+    """
+    node = document or {}
+    while isinstance(node, dict) and "properties" not in node and isinstance(node.get("schema"), dict):
+        node = node["schema"]
+    return node if isinstance(node, dict) else {}
+
+
+class SchemaResolver:
+    """
+    Fetches schemas by kind from the schema service, caching them per process.
+    """
+
+    def __init__(self, base_url: str = SCHEMA_SERVICE_URL, session: Optional[requests.Session] = None):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self._cache: Dict[str, dict] = {}
+
+    def fetch(self, kind: str) -> dict:
+        if kind not in self._cache:
+            resp = self.session.get(f"{self.base_url}/schema/kind/{quote(kind, safe=':')}", timeout=30)
+            self._cache[kind] = unwrap_schema(resp.json()) if resp.status_code == 200 else {}
+        return self._cache[kind]
+
+    def resolve_ref(self, ref: str, root: dict) -> Tuple[dict, dict]:
+        """
+        Returns (schema, root) for a $ref, either local (#/definitions/...) or a
+        registered kind (osdu:wks:...).
+        """
+        if ref.startswith("#/"):
+            node = root
+            for part in ref[2:].split("/"):
+                node = node.get(part, {}) if isinstance(node, dict) else {}
+            return node, root
+        name = ref.split("/")[-1]
+        if name.count(":") >= 3:
+            target = self.fetch(name)
+            return target, target
+        return {}, root
+
+
+class StaticSchemaResolver(SchemaResolver):
+    """
+    Resolver over an in-memory {kind: schema} dict (tests and offline use).
+    """
+
+    def __init__(self, schemas: Dict[str, dict]):
+        self._cache = {kind: unwrap_schema(schema) for kind, schema in schemas.items()}
+
+    def fetch(self, kind: str) -> dict:
+        return self._cache.get(kind, {})
+
+# -------------------------
+# Mapping generation
+# -------------------------
+def _json_type(prop: dict) -> Optional[str]:
+    t = prop.get("type")
+    if isinstance(t, list):
+        t = next((x for x in t if x != "null"), None)
+    return t
+
+
+def _merged_properties(prop: dict, resolver: SchemaResolver, root: dict, refs: tuple) -> Tuple[Dict[str, tuple], bool]:
+    """
+    Collects the properties of an object schema across $ref / allOf / oneOf /
+    anyOf as {name: (schema, root, refs followed)}. Also reports whether a
+    spatial-location ref was seen on the way.
+    """
+    merged, spatial = {}, False
+    stack = [(prop, root, refs)]
+    while stack:
+        node, node_root, node_refs = stack.pop()
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            if any(marker in ref for marker in SPATIAL_REF_MARKERS):
+                spatial = True
+            if ref not in node_refs and len(node_refs) < MAX_DEPTH:
+                target, target_root = resolver.resolve_ref(ref, node_root)
+                stack.append((target, target_root, node_refs + (ref,)))
+        for key in ("allOf", "oneOf", "anyOf"):
+            for block in node.get(key, []) or []:
+                if isinstance(block, dict):
+                    stack.append((block, node_root, node_refs))
+        for name, sub in (node.get("properties") or {}).items():
+            if isinstance(sub, dict):
+                merged.setdefault(name, (sub, node_root, node_refs))
+    return merged, spatial
+
+
+def _field_mapping(name: str, prop: dict, resolver: SchemaResolver, root: dict,
+                   path: str, spatial_paths: List[str], refs: tuple = ()) -> Optional[dict]:
+    t = _json_type(prop)
+    ref = prop.get("$ref")
+    if t is None and isinstance(ref, str) and ref not in refs and len(refs) < MAX_DEPTH:
+        target, target_root = resolver.resolve_ref(ref, root)
+        if _json_type(target) not in (None, "object"):
+            return _field_mapping(name, target, resolver, target_root, path, spatial_paths, refs + (ref,))
+
+    if t == "array":
+        items = prop.get("items")
+        if not isinstance(items, dict):
+            return None
+        return _field_mapping(name, items, resolver, root, path, spatial_paths, refs)
+
+    if t == "string":
+        return DATE if prop.get("format") in ("date", "date-time") else TEXT_KEYWORD
+    if t == "number":
+        return {"type": "double", "ignore_malformed": True}
+    if t == "integer":
+        return {"type": "long", "ignore_malformed": True}
+    if t == "boolean":
+        return {"type": "boolean"}
+
+    if len(refs) >= MAX_DEPTH:
+        return None
+    properties, spatial = _merged_properties(prop, resolver, root, refs)
+    if not properties:
+        return None
+    if spatial or (name.endswith("Location") and "Wgs84Coordinates" in properties):
+        spatial_paths.append(path)
+        return {"properties": {GEO_POINT_FIELD: {"type": "geo_point"}}}
+
+    mapped = {}
+    for sub_name, (sub_prop, sub_root, sub_refs) in properties.items():
+        field = _field_mapping(sub_name, sub_prop, resolver, sub_root, f"{path}.{sub_name}", spatial_paths, sub_refs)
+        if field:
+            mapped[sub_name] = field
+    return {"properties": mapped} if mapped else None
+
+
+def build_mapping(kind: str, resolver: SchemaResolver) -> Tuple[dict, List[str]]:
+    """
+    Returns (mappings body, spatial field paths under data) for a kind.
+    """
+    schema = resolver.fetch(kind)
+    data_schema = (schema.get("properties") or {}).get("data", {})
+    spatial_paths: List[str] = []
+    data_mapping = _field_mapping("data", data_schema, resolver, schema, "data", spatial_paths) or {"properties": {}}
+
+    properties = copy.deepcopy(BASE_PROPERTIES)
+    properties["data"] = {"dynamic": False, **data_mapping}
+    return {"dynamic": False, "properties": properties}, spatial_paths
+
+
+def count_fields(mapping: dict) -> int:
+    """
+    Number of leaf fields in a mapping (what index.mapping.total_fields.limit counts).
+    """
+    total = 0
+    for field in (mapping.get("properties") or {}).values():
+        total += count_fields(field) if "properties" in field else 1
+    return total
+
+# -------------------------
+# Index naming
+# -------------------------
+def kind_alias(kind: str) -> str:
+    """
+    osdu:wks:master-data--Well:1.0.0 -> osdu-wks-master-data--well-1.0.0
+    """
+    name = re.sub(r'[\\/*?"<>|,# :]+', "-", kind.lower()).strip("-_+")
+    return name or "unknown-kind"
+
+
+def physical_index(alias: str, mapping: dict) -> str:
+    digest = hashlib.sha1(json.dumps(mapping, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+    return f"{alias}-{digest}"
+
+# -------------------------
+# Documents
+# -------------------------
+def _positions(coordinates):
+    if isinstance(coordinates, (list, tuple)) and coordinates and isinstance(coordinates[0], (int, float)):
+        yield coordinates
+    elif isinstance(coordinates, (list, tuple)):
+        for item in coordinates:
+            yield from _positions(item)
+
+
+def wgs84_point(location: dict) -> Optional[dict]:
+    """
+    Representative point of a spatial location's Wgs84Coordinates
+    FeatureCollection: the point itself, or the mean of all positions.
+    """
+    collection = (location or {}).get("Wgs84Coordinates") or {}
+    lons, lats = [], []
+    for feature in collection.get("features", []) or []:
+        geometry = (feature or {}).get("geometry") or {}
+        geometries = geometry.get("geometries") or [geometry]
+        for geom in geometries:
+            for position in _positions((geom or {}).get("coordinates")):
+                if len(position) >= 2:
+                    lons.append(float(position[0]))
+                    lats.append(float(position[1]))
+    if not lons:
+        return None
+    return {"lat": sum(lats) / len(lats), "lon": sum(lons) / len(lons)}
+
+
+def _locations_at(node, parts: List[str]):
+    if not parts:
+        if isinstance(node, dict):
+            yield node
+        return
+    if isinstance(node, list):
+        for item in node:
+            yield from _locations_at(item, parts)
+    elif isinstance(node, dict) and parts[0] in node:
+        yield from _locations_at(node[parts[0]], parts[1:])
+
+
+def to_document(record: dict, spatial_paths: List[str]) -> dict:
+    """
+    Copies a storage record and adds geo points for the kind's spatial fields
+    (plus the first one as the top-level `location`).
+    """
+    document = dict(record)
+    if not spatial_paths:
+        return document
+    document["data"] = copy.deepcopy(record.get("data") or {})
+    for path in spatial_paths:
+        for location in _locations_at(document, path.split(".")):
+            point = wgs84_point(location)
+            if point:
+                location[GEO_POINT_FIELD] = point
+                document.setdefault(LOCATION_FIELD, point)
+    return document
+
+# -------------------------
+# Index management
+# -------------------------
+class KindIndexManager:
+    """
+    Creates and versions per-kind indices on first use, and routes documents
+    for the indexing pipeline (see indexer.IndexingPipeline transform/index_for).
+    """
+
+    def __init__(self, client, resolver: Optional[SchemaResolver] = None):
+        self.client = client
+        self.resolver = resolver or SchemaResolver()
+        self._spatial: Dict[str, List[str]] = {}
+
+    def ensure(self, kind: str, refresh_schema: bool = False) -> str:
+        alias = kind_alias(kind)
+        if kind in self._spatial and not refresh_schema:
+            return alias
+
+        mapping, spatial_paths = build_mapping(kind, self.resolver)
+        target = physical_index(alias, mapping)
+        if not self.client.indices.exists(index=target):
+            self.client.indices.create(index=target, body={
+                "settings": {"number_of_replicas": NUMBER_OF_REPLICAS, "refresh_interval": REFRESH_INTERVAL},
+                "mappings": mapping
+            })
+            logger.info(f"🗂️ Created index {target} for {kind} ({count_fields(mapping)} fields)")
+
+        current = []
+        if self.client.indices.exists_alias(name=alias):
+            current = [name for name in self.client.indices.get_alias(name=alias) if name != target]
+        if current or not self.client.indices.exists_alias(name=alias, index=target):
+            for old in current:
+                self.client.reindex(body={"source": {"index": old}, "dest": {"index": target}},
+                                    wait_for_completion=True, refresh=True)
+            actions = [{"remove": {"index": old, "alias": name}} for old in current for name in (alias, KINDS_ALIAS)]
+            actions += [
+                {"add": {"index": target, "alias": alias, "is_write_index": True}},
+                {"add": {"index": target, "alias": KINDS_ALIAS}}
+            ]
+            self.client.indices.update_aliases(body={"actions": actions})
+            logger.info(f"🔀 Alias {alias} -> {target} (previous: {current or 'none'})")
+
+        self._spatial[kind] = spatial_paths
+        return alias
+
+    def index_for(self, kind: Optional[str]) -> str:
+        return self.ensure(kind) if kind else RECORDS_ALIAS
+
+    def transform(self, record: dict) -> Tuple[str, dict]:
+        alias = self.ensure(record["kind"])
+        return alias, to_document(record, self._spatial[record["kind"]])
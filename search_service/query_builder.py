@@ -0,0 +1,225 @@
+# ------------------------------------------------------------------------------
+# query_builder.py
+#
+# Compiles OSDU-style structured search requests into OpenSearch bodies.
+#
+# Request fields (all optional except kind):
+#   kind            "osdu:wks:master-data--Well:1.0.0", a wildcard pattern
+#                   ("osdu:wks:master-data--Well:*") or a list of either
+#   query           free text (simple_query_string over QUERY_TEXT_FIELDS, or
+#                   QUERY_MAPPED_TEXT_FIELDS on schema-mapped per-kind indices)
+#   filters         [{"field": f, "values": [...]}            -> terms
+#                    {"field": f, "gte"/"gt"/"lte"/"lt": v}   -> range
+#                    {"field": f, "exists": true|false}]      -> exists / must_not
+#   spatialFilter   {"field": "location", "byBoundingBox": {"topLeft": {...}, "bottomRight": {...}}}
+#                   {"field": "location", "byDistance": {"point": {...}, "distance": metres}}
+#   sort            {"field": [...], "order": ["ASC" | "DESC", ...]}
+#   returnedFields  ["id", "data.FacilityName", ...]
+#   aggregateBy     field to bucket on (terms aggregation)
+#   limit / offset  page size / offset (offset paging, /query)
+#   cursor          opaque search_after cursor (/query_with_cursor)
+#
+# Filters go into bool.filter (no scoring, cached by OpenSearch); only the free
+# text is scored. Sorts always end with `id` so search_after is deterministic.
+# ------------------------------------------------------------------------------
+import base64
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mappings import KINDS_ALIAS, RECORDS_ALIAS, kind_alias
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 1000
+MAX_OFFSET_WINDOW = 10000
+AGGREGATION_SIZE = 1000
+TIEBREAK_FIELD = "id"
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+def _kinds(kind) -> List[str]:
+    kinds = kind if isinstance(kind, list) else [kind]
+    kinds = [k for k in kinds if isinstance(k, str) and k.strip()]
+    if not kinds:
+        raise ValueError("Provide 'kind'")
+    return kinds
+
+
+def index_for_kinds(kinds: List[str], index_exists: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Exact kinds whose per-kind alias exists address it. Wildcards and kinds
+    indexed without --per-kind read the shared records index, plus the
+    cross-kind alias when per-kind indices exist; the kind filter narrows both.
+    `index_exists(name)` tells which aliases exist (none when omitted).
+    """
+    exists = index_exists or (lambda name: False)
+    names, shared = [], False
+    for kind in kinds:
+        if "*" not in kind and exists(kind_alias(kind)):
+            names.append(kind_alias(kind))
+        else:
+            shared = True
+    if shared:
+        kinds_alias = exists(KINDS_ALIAS)
+        if kinds_alias:
+            names.append(KINDS_ALIAS)
+        if not kinds_alias or exists(RECORDS_ALIAS):
+            names.append(RECORDS_ALIAS)
+    return ",".join(dict.fromkeys(names))
+
+
+def _kind_filter(kinds: List[str]) -> dict:
+    exact = [k for k in kinds if "*" not in k]
+    patterns = [k for k in kinds if "*" in k]
+    clauses = []
+    if exact:
+        clauses.append({"terms": {"kind": exact}})
+    clauses += [{"wildcard": {"kind": {"value": p}}} for p in patterns]
+    return clauses[0] if len(clauses) == 1 else {"bool": {"should": clauses, "minimum_should_match": 1}}
+
+
+def _filter_clause(spec: dict) -> Tuple[str, dict]:
+    """
+    Returns ("filter" | "must_not", clause) for one filter spec.
+    """
+    field = spec.get("field")
+    if not isinstance(field, str) or not field:
+        raise ValueError(f"Filter without 'field': {spec}")
+    if "values" in spec:
+        values = spec["values"] if isinstance(spec["values"], list) else [spec["values"]]
+        return "filter", {"terms": {field: values}}
+    if "value" in spec:
+        return "filter", {"term": {field: spec["value"]}}
+    bounds = {op: spec[op] for op in RANGE_OPERATORS if op in spec}
+    if bounds:
+        return "filter", {"range": {field: bounds}}
+    if "exists" in spec:
+        return ("filter" if spec["exists"] else "must_not"), {"exists": {"field": field}}
+    raise ValueError(f"Unsupported filter for {field}: use values, value, gt/gte/lt/lte or exists")
+
+
+def _spatial_clause(spec: dict) -> dict:
+    field = spec.get("field", "location")
+    if "byBoundingBox" in spec:
+        box = spec["byBoundingBox"]
+        return {"geo_bounding_box": {field: {"top_left": box["topLeft"], "bottom_right": box["bottomRight"]}}}
+    if "byDistance" in spec:
+        by = spec["byDistance"]
+        return {"geo_distance": {"distance": f"{float(by['distance'])}m", field: by["point"]}}
+    raise ValueError("spatialFilter needs byBoundingBox or byDistance")
+
+
+def _sort(spec: Optional[dict]) -> List[dict]:
+    sort = []
+    if spec:
+        fields = spec.get("field") or []
+        orders = spec.get("order") or []
+        if isinstance(fields, str):
+            fields = [fields]
+        if isinstance(orders, str):
+            orders = [orders]
+        if orders and len(orders) != len(fields):
+            raise ValueError("sort.field and sort.order must have the same length")
+        for i, field in enumerate(fields):
+            order = (orders[i] if orders else "ASC").lower()
+            if order not in ("asc", "desc"):
+                raise ValueError(f"Invalid sort order: {orders[i]}")
+            sort.append({field: {"order": order, "missing": "_last"}})
+    if not any(TIEBREAK_FIELD in s for s in sort):
+        sort.append({TIEBREAK_FIELD: {"order": "asc"}})
+    return sort
+
+# -------------------------
+# Cursor
+# -------------------------
+def encode_cursor(sort_values: list) -> str:
+    raw = json.dumps(sort_values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+# -------------------------
+# Body / response
+# -------------------------
+def build_search(request: Dict, text_fields: List[str], use_cursor: bool = False,
+                 index_exists: Optional[Callable[[str], bool]] = None,
+                 mapped_text_fields: Optional[List[str]] = None) -> Tuple[str, dict]:
+    """
+    Returns (index expression, search body) for a structured request.
+    Free text searches `text_fields` on the schemaless records index and
+    `mapped_text_fields` (when given) on per-kind indices, both when the
+    query spans the two. Raises ValueError for invalid requests.
+    """
+    kinds = _kinds(request.get("kind"))
+    index = index_for_kinds(kinds, index_exists)
+    if mapped_text_fields:
+        targets = index.split(",")
+        if RECORDS_ALIAS not in targets:
+            text_fields = mapped_text_fields
+        elif len(targets) > 1:
+            text_fields = list(dict.fromkeys(text_fields + mapped_text_fields))
+    limit = int(request.get("limit") or DEFAULT_LIMIT)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+    bool_query = {"filter": [_kind_filter(kinds)]}
+    text = (request.get("query") or "").strip()
+    if text:
+        bool_query["must"] = [{"simple_query_string": {"query": text, "fields": text_fields,
+                                                       "default_operator": "and", "lenient": True}}]
+    for spec in request.get("filters") or []:
+        occur, clause = _filter_clause(spec)
+        bool_query.setdefault(occur, []).append(clause)
+    if request.get("spatialFilter"):
+        bool_query["filter"].append(_spatial_clause(request["spatialFilter"]))
+
+    body = {
+        "query": {"bool": bool_query},
+        "size": limit,
+        "sort": _sort(request.get("sort")),
+        "track_total_hits": True
+    }
+
+    fields = request.get("returnedFields")
+    if fields and fields != ["*"]:
+        body["_source"] = {"includes": list(fields)}
+
+    if request.get("aggregateBy"):
+        body["aggs"] = {"agg": {"terms": {"field": request["aggregateBy"], "size": AGGREGATION_SIZE}}}
+
+    if use_cursor:
+        if request.get("cursor"):
+            body["search_after"] = decode_cursor(request["cursor"])
+            body["track_total_hits"] = False
+    else:
+        offset = int(request.get("offset") or 0)
+        if offset < 0 or offset + limit > MAX_OFFSET_WINDOW:
+            raise ValueError(f"offset + limit must be within {MAX_OFFSET_WINDOW}; use query_with_cursor")
+        body["from"] = offset
+
+    return index, body
+
+
+def parse_response(response: dict, limit: int, use_cursor: bool = False) -> dict:
+    hits = response.get("hits", {})
+    results = [hit.get("_source", {}) for hit in hits.get("hits", [])]
+    total = hits.get("total")
+    out = {
+        "results": results,
+        "totalCount": total.get("value") if isinstance(total, dict) else total
+    }
+    buckets = response.get("aggregations", {}).get("agg", {}).get("buckets")
+    if buckets is not None:
+        out["aggregations"] = [{"key": b["key"], "count": b["doc_count"]} for b in buckets]
+    if use_cursor:
+        last = hits.get("hits", [])[-1:] if len(results) >= limit else []
+        out["cursor"] = encode_cursor(last[0]["sort"]) if last else None
+    return out
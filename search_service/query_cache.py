@@ -0,0 +1,116 @@
+# ------------------------------------------------------------------------------
+# query_cache.py
+#
+# In-process cache of encoded search responses.
+#
+# Keys are a hash of (endpoint, normalized request, index generation). The
+# indexing pipeline bumps the generation after every flushed page
+# (POST /api/search/v2/cache/generation), which makes all earlier entries
+# unreachable and drops them. Entries also expire after a TTL and are evicted
+# least-recently-used once either the entry or the byte budget is exceeded.
+#
+# The cache is per process: with several workers, each keeps its own entries
+# and the TTL bounds how long a worker that missed a bump can serve stale data.
+# ------------------------------------------------------------------------------
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def normalize_request(request: Any) -> Any:
+    """
+    Canonical form of a request: None values dropped, strings stripped; dict
+    key order is handled by sort_keys when hashing.
+    """
+    if isinstance(request, dict):
+        return {k: normalize_request(v) for k, v in request.items() if v is not None}
+    if isinstance(request, list):
+        return [normalize_request(v) for v in request]
+    if isinstance(request, str):
+        return request.strip()
+    return request
+
+
+class QueryResultCache:
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def key(self, endpoint: str, request: Any) -> str:
+        canonical = json.dumps([endpoint, normalize_request(request), self.generation],
+                               sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                body, expires = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return body
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, body: bytes) -> None:
+        if not self.enabled or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (body, time.monotonic() + self.ttl)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        body, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def bump_generation(self, generation: Optional[int] = None) -> int:
+        """
+        Advances the index generation (to `generation` if it is newer) and drops
+        every cached entry.
+        """
+        with self._lock:
+            self.generation = max(self.generation + 1, generation or 0)
+            self._entries.clear()
+            self._bytes = 0
+            return self.generation
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "generation": self.generation,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -1,10 +1,17 @@
 import os
+import json
+import time
+import asyncio
 import logging
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from opensearchpy import OpenSearch, ConnectionError
+from typing import Any, Dict, List, Optional, Tuple, Union
+from query_builder import build_search, parse_response
+from query_cache import QueryResultCache
+from backends import connect_backend
+from mappings import RECORDS_ALIAS, KindIndexManager
 
 # -------------------------
 # Load environment
@@ -18,6 +25,45 @@ DATA_PARTITION_ID = os.getenv("DATA_PARTITION_ID", "osdu-local")
 STORAGE_SERVICE_URL = os.getenv("STORAGE_SERVICE_URL")
 SCHEMA_SERVICE_URL = os.getenv("SCHEMA_SERVICE_URL")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# opensearch | local | auto (OpenSearch when reachable, else the embedded index; see backends.py)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_index"))
+# Refresh policy for single-document indexing: "false" (default, rely on the index
+# refresh_interval), "wait_for" (block until visible) or "true" (force a refresh).
+INDEX_REFRESH = os.getenv("INDEX_REFRESH", "false").lower()
+# Index refresh_interval (mappings.py); with INDEX_REFRESH=false a write becomes searchable within it
+INDEX_REFRESH_INTERVAL = os.getenv("INDEX_REFRESH_INTERVAL", "1s")
+# Write documents that carry a kind to schema-mapped per-kind indices (mappings.py),
+# like `indexer.py --per-kind`; needs OpenSearch
+INDEX_PER_KIND = os.getenv("INDEX_PER_KIND", "false").lower() == "true"
+# Free-text fields of the schemaless osdu-records index
+QUERY_TEXT_FIELDS = [f.strip() for f in os.getenv("QUERY_TEXT_FIELDS", "data.*,kind,id").split(",") if f.strip()]
+# ... and of schema-mapped per-kind indices, which copy every string into data_text
+QUERY_MAPPED_TEXT_FIELDS = [f.strip() for f in os.getenv("QUERY_MAPPED_TEXT_FIELDS", "data_text,kind,id").split(",")
+                            if f.strip()]
+# How long structured queries trust a per-kind alias lookup (see index_exists)
+INDEX_EXISTS_TTL = float(os.getenv("INDEX_EXISTS_TTL", "30"))
+# Query result cache (query_cache.py); QUERY_CACHE_TTL=0 disables it
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "30"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "2048"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+def interval_seconds(value: str, default: float = 1.0) -> float:
+    """
+    OpenSearch time value ("500ms", "1s", "2m") in seconds; `default` for -1 or garbage.
+    """
+    value = value.strip().lower()
+    for suffix, scale in (("ms", 0.001), ("s", 1.0), ("m", 60.0)):
+        if value.endswith(suffix):
+            value, factor = value[:-len(suffix)], scale
+            break
+    else:
+        factor = 1.0
+    try:
+        seconds = float(value) * factor
+    except ValueError:
+        return default
+    return seconds if seconds > 0 else default
 
 # -------------------------
 # Logging setup
@@ -26,21 +72,23 @@ logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger("search_service")
 
 # -------------------------
-# Connect to OpenSearch
+# Connect to the search backend
 # -------------------------
-try:
-    client = OpenSearch([{"host": SEARCH_HOST, "port": SEARCH_PORT}])
-    info = client.info()
-    logger.info("✅ Connected to OpenSearch")
-    logger.debug(info)
-except ConnectionError as e:
-    logger.error(f"❌ Failed to connect to OpenSearch: {e}")
-    raise RuntimeError("OpenSearch connection failed")
+client = connect_backend(SEARCH_BACKEND, host=SEARCH_HOST, port=SEARCH_PORT, local_dir=LOCAL_INDEX_DIR)
+BACKEND_NAME = getattr(client, "name", "opensearch")
+kind_indices = None
+if INDEX_PER_KIND:
+    if BACKEND_NAME == "local":
+        logger.warning("INDEX_PER_KIND needs OpenSearch; the embedded index has no per-kind aliases")
+    else:
+        kind_indices = KindIndexManager(client)
 
 # -------------------------
 # FastAPI setup
 # -------------------------
 app = FastAPI(title="OSDU Search Service", version="v2")
+result_cache = QueryResultCache(max_entries=QUERY_CACHE_MAX_ENTRIES, max_bytes=QUERY_CACHE_MAX_BYTES,
+                                ttl=QUERY_CACHE_TTL)
 
 # -------------------------
 # Models
@@ -52,14 +100,30 @@ class IndexRecordRequest(BaseModel):
 
 class QueryRequest(BaseModel):
     index: str = "osdu-records"
-    text: str
+    text: Optional[str] = None
+    # OSDU-style structured query (see query_builder.py); used when `kind` is set
+    kind: Optional[Union[str, List[str]]] = None
+    query: Optional[str] = None
+    filters: Optional[List[Dict[str, Any]]] = None
+    spatialFilter: Optional[Dict[str, Any]] = None
+    sort: Optional[Dict[str, Any]] = None
+    returnedFields: Optional[List[str]] = None
+    aggregateBy: Optional[str] = None
+    limit: Optional[int] = None
+    offset: Optional[int] = None
+
+class CursorQueryRequest(QueryRequest):
+    cursor: Optional[str] = None
+
+class CacheGenerationRequest(BaseModel):
+    generation: Optional[int] = None
 
 # -------------------------
 # Health check
 # -------------------------
 @app.get("/ping")
 async def ping():
-    return {"status": "ok"}
+    return {"status": "ok", "backend": BACKEND_NAME}
 
 # -------------------------
 # Index a record
@@ -70,8 +134,17 @@ async def index_record(payload: IndexRecordRequest):
         raise HTTPException(status_code=400, detail="Provide 'id' and 'document'")
 
     try:
-        resp = client.index(index=payload.index, id=payload.id, body=payload.document, refresh=True)
-        logger.info(f"Indexed record {payload.id} into {payload.index}")
+        index, document = payload.index, payload.document
+        if kind_indices and index == RECORDS_ALIAS and document.get("kind"):
+            index, document = kind_indices.transform(document)
+        resp = client.index(index=index, id=payload.id, body=document, refresh=INDEX_REFRESH)
+        logger.info(f"Indexed record {payload.id} into {index}")
+        # Cached results may predate this write. Without a forced refresh the document only
+        # becomes searchable at the next index refresh, so drop results cached until then too.
+        result_cache.bump_generation()
+        _index_exists.clear()
+        if INDEX_REFRESH == "false":
+            asyncio.get_running_loop().call_later(interval_seconds(INDEX_REFRESH_INTERVAL), result_cache.bump_generation)
         return JSONResponse(content=resp, status_code=201)
     except Exception as e:
         logger.error(f"Indexing failed: {e}")
@@ -80,11 +153,50 @@ async def index_record(payload: IndexRecordRequest):
 # -------------------------
 # Search records
 # -------------------------
-@app.post("/api/search/v2/query")
-async def query_records(payload: QueryRequest):
-    if not payload.text.strip():
-        raise HTTPException(status_code=400, detail="Provide 'text' to search")
+_index_exists: Dict[str, Tuple[bool, float]] = {}
+
+def index_exists(name: str) -> bool:
+    """
+    Whether an index or alias exists, cached for INDEX_EXISTS_TTL seconds and
+    until the next write or cache generation bump (which may create aliases).
+    """
+    cached = _index_exists.get(name)
+    if cached is None or time.monotonic() - cached[1] > INDEX_EXISTS_TTL:
+        cached = _index_exists[name] = (bool(client.indices.exists(index=name)), time.monotonic())
+    return cached[0]
+
+def cached_search(endpoint: str, payload: QueryRequest, search) -> Response:
+    """
+    Serves `search()` through the result cache. Responses are cached encoded,
+    so a hit skips OpenSearch and serialization; errors are never cached.
+    """
+    key = result_cache.key(endpoint, payload.dict(exclude_none=True))
+    body = result_cache.get(key)
+    status = "HIT"
+    if body is None:
+        status = "MISS"
+        body = json.dumps(search(), separators=(",", ":"), default=str).encode("utf-8")
+        result_cache.put(key, body)
+    return Response(content=body, media_type="application/json",
+                    headers={"X-Cache": status, "X-Index-Generation": str(result_cache.generation)})
+
+def structured_search(payload: QueryRequest, use_cursor: bool = False):
+    request = payload.dict(exclude_none=True)
+    try:
+        index, body = build_search(request, QUERY_TEXT_FIELDS, use_cursor=use_cursor,
+                                   index_exists=index_exists, mapped_text_fields=QUERY_MAPPED_TEXT_FIELDS)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    try:
+        result = client.search(index=index, body=body)
+        logger.info(f"Structured query on {index}: {result.get('took')} ms")
+        return parse_response(result, body["size"], use_cursor=use_cursor)
+    except Exception as e:
+        logger.error(f"Search failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
+def text_search(payload: QueryRequest):
     try:
         result = client.search(
             index=payload.index,
@@ -92,7 +204,7 @@ async def query_records(payload: QueryRequest):
                 "query": {
                     "multi_match": {
                         "query": payload.text,
-                        "fields": ["data.*", "kind", "id"]
+                        "fields": QUERY_TEXT_FIELDS
                     }
                 }
             }
@@ -102,3 +214,38 @@ async def query_records(payload: QueryRequest):
     except Exception as e:
         logger.error(f"Search failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/search/v2/query")
+async def query_records(payload: QueryRequest):
+    if payload.kind is not None:
+        return cached_search("query", payload, lambda: structured_search(payload))
+    if not (payload.text or "").strip():
+        raise HTTPException(status_code=400, detail="Provide 'text' to search")
+    return cached_search("text", payload, lambda: text_search(payload))
+
+# -------------------------
+# Search records with a search_after cursor
+# -------------------------
+@app.post("/api/search/v2/query_with_cursor")
+async def query_records_with_cursor(payload: CursorQueryRequest):
+    if payload.kind is None:
+        raise HTTPException(status_code=400, detail="Provide 'kind'")
+    return cached_search("query_with_cursor", payload, lambda: structured_search(payload, use_cursor=True))
+
+# -------------------------
+# Result cache
+# -------------------------
+@app.post("/api/search/v2/cache/generation")
+async def bump_cache_generation(payload: CacheGenerationRequest = None):
+    """
+    Called by the indexing pipeline after each flushed page; `generation` is its
+    change-feed checkpoint. Drops every cached result.
+    """
+    generation = result_cache.bump_generation(payload.generation if payload else None)
+    _index_exists.clear()
+    logger.debug(f"Query cache generation -> {generation}")
+    return {"generation": generation}
+
+@app.get("/api/search/v2/cache/stats")
+async def cache_stats():
+    return result_cache.stats()
@@ -0,0 +1,39 @@
+# test_indexer.py
+# Runs the indexing pipeline against the in-process stand-in client with a fake
+# change feed, including a partial bulk failure that has to be retried.
+from indexer import IndexingPipeline, InMemorySearchClient
+
+
+class FakeSource:
+    def __init__(self, records, changes):
+        self.records_by_id = {r["id"]: r for r in records}
+        self.feed = changes
+
+    def changes(self, since, limit, wait=0):
+        page = [c for c in self.feed if c["sequence"] > since][:limit]
+        return {
+            "changes": page,
+            "nextSince": page[-1]["sequence"] if page else since,
+            "latestSequence": self.feed[-1]["sequence"] if self.feed else 0
+        }
+
+    def records(self, ids):
+        return [self.records_by_id[i] for i in ids if i in self.records_by_id]
+
+
+records = [{"id": f"opendes:master-data--Well:{n}", "kind": "osdu:wks:master-data--Well:1.0.0",
+            "data": {"FacilityName": f"Well {n}"}} for n in range(2500)]
+changes = [{"sequence": n + 1, "id": r["id"], "operation": "create"} for n, r in enumerate(records)]
+changes.append({"sequence": 2501, "id": records[0]["id"], "operation": "delete"})
+
+client = InMemorySearchClient(fail_once={records[5]["id"]: 429, records[7]["id"]: 503})
+pipeline = IndexingPipeline(client, FakeSource(records, changes), max_docs=400, page_size=1000,
+                            checkpoint_file=None)
+stats = pipeline.run_until_caught_up()
+
+docs = client.indices_data["osdu-records"]
+print("✅ Indexed" if len(docs) == 2499 else "❌ Wrong document count", len(docs))
+print("✅ Delete applied" if records[0]["id"] not in docs else "❌ Delete missing")
+print("✅ Retried partial failures" if stats["retried"] == 2 and stats["failed"] == 0 else "❌ Retry accounting", stats)
+print("✅ Caught up" if stats["lag"] == 0 and stats["since"] == 2501 else "❌ Lag", stats)
+print(f"Bulk requests: {stats['bulkRequests']}")
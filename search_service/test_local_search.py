@@ -0,0 +1,119 @@
+# test_local_search.py
+# Runs structured queries against the embedded local backend in a temporary
+# directory: buffered writes, committed segments, deletes, merges, cursors and
+# a second client reading the same directory.
+import json
+import tempfile
+import time
+
+import local_search
+from local_search import LocalSearchClient
+from query_builder import build_search, parse_response
+
+WELL = "osdu:wks:master-data--Well:1.0.0"
+WELLBORE = "osdu:wks:master-data--Wellbore:1.0.0"
+
+
+def well(n):
+    return {
+        "id": f"opendes:master-data--Well:{n}",
+        "kind": WELL,
+        "data": {
+            "FacilityName": f"Troll A-{n}" if n % 2 else f"Oseberg B-{n}",
+            "Status": "Active" if n % 3 else "Planned",
+            "TotalDepth": {"value": 1000.0 + n * 10, "uom": "m"},
+            "SpatialLocation": {"Wgs84Coordinates": {"type": "FeatureCollection", "features": [
+                {"type": "Feature", "geometry": {"type": "Point", "coordinates": [5.0 + n * 0.01, 60.0]}}]}}
+        }
+    }
+
+
+def query(client, request, use_cursor=False):
+    index, body = build_search(request, ["data_text", "kind", "id"], use_cursor=use_cursor)
+    return parse_response(client.search(index=index, body=body, ignore_unavailable=True),
+                          body["size"], use_cursor=use_cursor)
+
+
+def check(label, ok, detail=""):
+    print(f"✅ {label}" if ok else f"❌ {label} {detail}")
+
+
+local_search.MAX_SEGMENTS = 3
+directory = tempfile.mkdtemp(prefix="local-search-")
+client = LocalSearchClient(directory)
+
+# Buffered single-document writes are searchable before any commit
+client.index(index="osdu-records", id="opendes:master-data--Well:0", body=well(0))
+out = query(client, {"kind": WELL, "query": "oseberg"})
+check("Buffered write searchable", out["totalCount"] == 1, out)
+
+# Bulk writes commit segments; enough of them trigger a merge
+for start in range(0, 100, 20):
+    lines = []
+    for n in range(start, start + 20):
+        lines.append(json.dumps({"index": {"_index": "osdu-records", "_id": f"opendes:master-data--Well:{n}"}}))
+        lines.append(json.dumps(well(n)))
+    response = client.bulk(body="\n".join(lines) + "\n")
+    check(f"Bulk {start}", not response["errors"])
+client.index(index="osdu-records", id="wb-1", refresh=True,
+             body={"id": "wb-1", "kind": WELLBORE, "data": {"FacilityName": "Troll wellbore"}})
+store = client._store("osdu-records")
+check("Segments merged", len(store.segments) <= local_search.MAX_SEGMENTS, len(store.segments))
+check("Upserts counted once", store.count() == 101, store.count())
+
+out = query(client, {"kind": WELL, "query": "troll"})
+check("Kind filter + text", out["totalCount"] == 50, out["totalCount"])
+out = query(client, {"kind": "osdu:wks:master-data--*:1.0.0", "query": "troll"})
+check("Wildcard kind", out["totalCount"] == 51, out["totalCount"])
+
+out = query(client, {"kind": WELL, "filters": [{"field": "data.Status", "values": ["Planned"]},
+                                              {"field": "data.TotalDepth.value", "gte": 1500}]})
+check("Terms + range filters", out["totalCount"] == len([n for n in range(50, 100) if n % 3 == 0]), out["totalCount"])
+
+out = query(client, {"kind": WELL, "filters": [{"field": "data.SpudDate", "exists": False}], "limit": 1})
+check("must_not exists", out["totalCount"] == 100, out["totalCount"])
+
+out = query(client, {"kind": WELL, "spatialFilter": {"field": "data.SpatialLocation",
+                                                     "byDistance": {"point": {"lat": 60.0, "lon": 5.0},
+                                                                    "distance": 2000}}})
+check("Geo distance", out["totalCount"] == 4, out["totalCount"])
+
+out = query(client, {"kind": WELL, "sort": {"field": ["data.TotalDepth.value"], "order": ["DESC"]},
+                     "returnedFields": ["id", "data.TotalDepth"], "aggregateBy": "data.Status", "limit": 3})
+depths = [r["data"]["TotalDepth"]["value"] for r in out["results"]]
+check("Sort desc", depths == [1990.0, 1980.0, 1970.0], depths)
+check("Returned fields", set(out["results"][0]) == {"id", "data"}, out["results"][0])
+check("Aggregation", {a["key"]: a["count"] for a in out["aggregations"]} == {"Active": 66, "Planned": 34},
+      out["aggregations"])
+
+# Cursor paging visits every document exactly once
+seen, cursor = [], None
+while True:
+    page = query(client, {"kind": WELL, "limit": 30, "cursor": cursor}, use_cursor=True)
+    seen += [r["id"] for r in page["results"]]
+    cursor = page["cursor"]
+    if not cursor:
+        break
+check("Cursor paging", len(seen) == 100 and len(set(seen)) == 100, len(seen))
+
+# Deletes and overwrites, then a second process-style client on the same directory
+client.delete(index="osdu-records", id="opendes:master-data--Well:1", refresh=True)
+client.index(index="osdu-records", id="opendes:master-data--Well:2", refresh=True,
+             body=dict(well(2), data=dict(well(2)["data"], FacilityName="Renamed")))
+reader = LocalSearchClient(directory)
+out = query(reader, {"kind": WELL, "query": "renamed"})
+check("Reader sees overwrite", out["totalCount"] == 1, out)
+out = query(reader, {"kind": WELL})
+check("Reader sees delete", out["totalCount"] == 99, out["totalCount"])
+
+legacy = reader.search(index="osdu-records", body={"query": {"multi_match": {"query": "troll wellbore",
+                                                                             "fields": ["data.*"]}}})
+check("Legacy multi_match ranks best match first", legacy["hits"]["hits"][0]["_id"] == "wb-1",
+      legacy["hits"]["hits"][0]["_id"])
+
+# Rough timing over the committed segments
+started = time.perf_counter()
+for _ in range(100):
+    query(reader, {"kind": WELL, "query": "troll", "filters": [{"field": "data.Status", "values": ["Active"]}],
+                   "limit": 10})
+print(f"100 structured queries: {(time.perf_counter() - started) * 1000:.1f} ms")
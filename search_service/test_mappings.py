@@ -0,0 +1,49 @@
+# test_mappings.py
+# Builds the mapping for a sample Well schema offline and checks the field types
+# and the geo point added to documents.
+import json
+from mappings import StaticSchemaResolver, build_mapping, count_fields, kind_alias, to_document
+
+WELL = "osdu:wks:master-data--Well:1.0.0"
+schemas = {
+    WELL: {"id": WELL, "kind": WELL, "schema": {"properties": {"data": {"allOf": [
+        {"$ref": "osdu:wks:AbstractFacility:1.0.0"},
+        {"properties": {
+            "SurfaceLocation": {"$ref": "osdu:wks:AbstractSpatialLocation:1.0.0"},
+            "TotalDepth": {"type": "object", "properties": {
+                "value": {"type": "number"}, "uom": {"type": "string"}}},
+            "SpudDate": {"type": "string", "format": "date-time"},
+            "WellboreIDs": {"type": "array", "items": {"type": "string"}},
+            "ExtensionProperties": {"type": "object"}
+        }}
+    ]}}}},
+    "osdu:wks:AbstractFacility:1.0.0": {"properties": {
+        "FacilityName": {"type": "string"},
+        "FacilityEvents": {"type": "array", "items": {"$ref": "#/definitions/Event"}}
+    }, "definitions": {"Event": {"type": "object", "properties": {
+        "EffectiveDateTime": {"type": "string", "format": "date-time"}}}}},
+    "osdu:wks:AbstractSpatialLocation:1.0.0": {"properties": {
+        "Wgs84Coordinates": {"type": "object"}}}
+}
+
+mapping, spatial = build_mapping(WELL, StaticSchemaResolver(schemas))
+data = mapping["properties"]["data"]["properties"]
+print(kind_alias(WELL), f"{count_fields(mapping)} fields")
+print(json.dumps(data, indent=1))
+checks = [
+    data["FacilityName"]["type"] == "keyword",
+    data["FacilityEvents"]["properties"]["EffectiveDateTime"]["type"] == "date",
+    data["TotalDepth"]["properties"]["value"]["type"] == "double",
+    data["SpudDate"]["type"] == "date",
+    data["SurfaceLocation"]["properties"]["Wgs84Point"]["type"] == "geo_point",
+    "ExtensionProperties" not in data,
+    spatial == ["data.SurfaceLocation"],
+]
+print("✅ Mapping types" if all(checks) else f"❌ Mapping types {checks}")
+
+record = {"id": "opendes:master-data--Well:1", "kind": WELL, "data": {"SurfaceLocation": {"Wgs84Coordinates": {
+    "type": "FeatureCollection",
+    "features": [{"type": "Feature", "geometry": {"type": "Point", "coordinates": [5.25, 60.5]}}]}}}}
+doc = to_document(record, spatial)
+ok = doc["location"] == {"lat": 60.5, "lon": 5.25} and "Wgs84Point" not in record["data"]["SurfaceLocation"]
+print("✅ Geo point" if ok else "❌ Geo point", doc["location"])
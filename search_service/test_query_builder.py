@@ -0,0 +1,68 @@
+# test_query_builder.py
+# Compiles structured requests offline and checks the generated OpenSearch bodies.
+import json
+from query_builder import build_search, decode_cursor, encode_cursor, parse_response
+
+request = {
+    "kind": "osdu:wks:master-data--Well:1.0.0",
+    "query": "Troll",
+    "filters": [
+        {"field": "data.Status", "values": ["Active", "Planned"]},
+        {"field": "data.TotalDepth.value", "gte": 1000, "lt": 3000},
+        {"field": "data.SpudDate", "exists": False}
+    ],
+    "spatialFilter": {"field": "location", "byDistance": {"point": {"lat": 60.5, "lon": 5.2}, "distance": 5000}},
+    "sort": {"field": ["data.TotalDepth.value"], "order": ["DESC"]},
+    "returnedFields": ["id", "data.FacilityName"],
+    "aggregateBy": "data.Status",
+    "limit": 2
+}
+index, body = build_search(request, ["data.*", "kind", "id"], index_exists={"osdu-wks-master-data--well-1.0.0"}.__contains__,
+                           mapped_text_fields=["data_text", "kind", "id"])
+print(index)
+print(json.dumps(body, indent=1))
+bool_query = body["query"]["bool"]
+checks = [
+    index == "osdu-wks-master-data--well-1.0.0",
+    len(bool_query["filter"]) == 4,
+    bool_query["must_not"] == [{"exists": {"field": "data.SpudDate"}}],
+    body["sort"][-1] == {"id": {"order": "asc"}},
+    body["_source"] == {"includes": ["id", "data.FacilityName"]},
+    body["from"] == 0,
+    bool_query["must"][0]["simple_query_string"]["fields"] == ["data_text", "kind", "id"],
+]
+print("✅ Query body" if all(checks) else f"❌ Query body {checks}")
+
+# Kinds without a per-kind alias read the shared index with the kind filter
+index, body = build_search({**request, "query": "troll"}, ["data.*", "kind", "id"], mapped_text_fields=["data_text"])
+fields = body["query"]["bool"]["must"][0]["simple_query_string"]["fields"]
+print("✅ Unmapped kind" if index == "osdu-records" and fields == ["data.*", "kind", "id"] else f"❌ Unmapped kind {index} {fields}")
+
+# Wildcard kinds go to the shared index with a wildcard kind filter, plus the per-kind indices when they exist
+index, body = build_search({"kind": "osdu:wks:master-data--*:*", "limit": 5}, ["data_text"], use_cursor=True)
+print("✅ Wildcard kind" if index == "osdu-records" and "wildcard" in body["query"]["bool"]["filter"][0] else "❌ Wildcard kind")
+index, body = build_search({"kind": "osdu:wks:master-data--*:*", "query": "troll"}, ["data.*"],
+                           index_exists={"osdu-kinds", "osdu-records"}.__contains__, mapped_text_fields=["data_text"])
+fields = body["query"]["bool"]["must"][0]["simple_query_string"]["fields"]
+print("✅ Both layouts" if index == "osdu-kinds,osdu-records" and fields == ["data.*", "data_text"] else f"❌ Both layouts {index} {fields}")
+
+# Cursor round trip
+response = {"hits": {"total": {"value": 7}, "hits": [
+    {"_source": {"id": "a"}, "sort": [2500.0, "a"]}, {"_source": {"id": "b"}, "sort": [2400.0, "b"]}]},
+    "aggregations": {"agg": {"buckets": [{"key": "Active", "doc_count": 7}]}}}
+page = parse_response(response, 2, use_cursor=True)
+ok = decode_cursor(page["cursor"]) == [2400.0, "b"] and page["aggregations"] == [{"key": "Active", "count": 7}]
+_, body = build_search({**request, "cursor": page["cursor"]}, ["data_text"], use_cursor=True)
+print("✅ Cursor" if ok and body["search_after"] == [2400.0, "b"] else "❌ Cursor", page)
+
+values = [1.5e3, "opendes:master-data--Well:ø/1", None, -1, True]
+cursor = encode_cursor(values)
+print("✅ Cursor round-trip" if decode_cursor(cursor) == values and "=" not in cursor else "❌ Cursor round-trip", cursor)
+
+for bad in ({"kind": ""}, {"kind": "k", "limit": 5000}, {"kind": "k", "filters": [{"field": "x"}]},
+            {"kind": "k", "cursor": "!!"}):
+    try:
+        build_search(bad, ["data_text"], use_cursor=True)
+        print("❌ Accepted", bad)
+    except ValueError as e:
+        print("✅ Rejected:", e)
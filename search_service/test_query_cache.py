@@ -0,0 +1,47 @@
+# test_query_cache.py
+# Exercises the query result cache: normalized keys, TTL, size eviction and
+# invalidation by index generation.
+import time
+
+from query_cache import QueryResultCache
+
+cache = QueryResultCache(max_entries=3, max_bytes=1024, ttl=0.2)
+
+# Same query in a different key order / with None fields / padded text -> same key
+a = cache.key("query", {"kind": "osdu:wks:master-data--Well:1.0.0", "query": "Well 1", "limit": 10})
+b = cache.key("query", {"limit": 10, "query": " Well 1 ", "kind": "osdu:wks:master-data--Well:1.0.0",
+                        "offset": None})
+c = cache.key("query_with_cursor", {"kind": "osdu:wks:master-data--Well:1.0.0", "query": "Well 1", "limit": 10})
+print("✅ Normalized keys" if a == b and a != c else "❌ Key normalization")
+
+cache.put(a, b'{"results":[]}')
+print("✅ Hit" if cache.get(b) == b'{"results":[]}' else "❌ Miss on cached query")
+
+# Size-based eviction: entry count, then bytes
+for n in range(4):
+    cache.put(cache.key("query", {"n": n}), b"x")
+print("✅ Entry limit" if cache.stats()["entries"] == 3 and cache.get(a) is None else "❌ Entry limit", cache.stats())
+cache.put(cache.key("query", {"big": 1}), b"y" * 1000)
+stats = cache.stats()
+print("✅ Byte limit" if stats["bytes"] <= 1024 else "❌ Byte limit", stats)
+cache.put(cache.key("query", {"huge": 1}), b"z" * 2048)
+print("✅ Oversized entry skipped" if cache.get(cache.key("query", {"huge": 1})) is None else "❌ Oversized entry cached")
+
+# Generation bump invalidates everything
+key = cache.key("query", {"kind": "k"})
+cache.put(key, b"1")
+generation = cache.bump_generation(42)
+print("✅ Generation bump" if generation == 42 and cache.get(key) is None
+      and cache.key("query", {"kind": "k"}) != key else "❌ Generation bump")
+print("✅ Generation monotonic" if cache.bump_generation(5) == 43 else "❌ Generation went backwards")
+
+# TTL expiry
+key = cache.key("query", {"kind": "ttl"})
+cache.put(key, b"1")
+time.sleep(0.25)
+print("✅ TTL expiry" if cache.get(key) is None else "❌ Entry outlived TTL")
+
+disabled = QueryResultCache(ttl=0)
+disabled.put("k", b"1")
+print("✅ Disabled with ttl=0" if disabled.get("k") is None else "❌ Cached while disabled")
+print(cache.stats())
@@ -0,0 +1,83 @@
+"""
+Change feed over the records table.
+
+Every mutation in record_service appends to the record_changes outbox inside
+its own transaction, so a change is visible in the feed exactly when the write
+commits. Consumers (indexers, caches) page through it with a sequence cursor.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+from psycopg2.extras import execute_values
+from db import get_conn
+
+logger = logging.getLogger(__name__)
+
+# Transaction-scoped advisory lock serializing appends (arbitrary, app-wide key)
+CHANGE_FEED_LOCK_KEY = 7_302_146_001
+
+_INSERT_CHANGES_SQL = """
+    INSERT INTO record_changes (data_partition_id, record_id, kind, operation, version)
+    VALUES %s
+"""
+
+
+def append_changes(cur, tenant_id: str, changes: List[Tuple[str, Optional[str], str, Optional[int]]]) -> None:
+    """
+    Appends (record_id, kind, operation, version) rows in the caller's transaction.
+    Call it immediately before commit: the advisory lock is held until then, so
+    sequence numbers are handed out in commit order and a reader that has seen
+    sequence N never later finds a committed change below N.
+    """
+    if not changes:
+        return
+    cur.execute("SELECT pg_advisory_xact_lock(%s)", (CHANGE_FEED_LOCK_KEY,))
+    execute_values(cur, _INSERT_CHANGES_SQL, [(tenant_id, *change) for change in changes])
+
+
+def latest_sequence(tenant_id: str) -> int:
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT MAX(seq) FROM record_changes WHERE data_partition_id = %s", (tenant_id,))
+        return cur.fetchone()[0] or 0
+    finally:
+        cur.close()
+
+
+def read_changes(tenant_id: str, since: int = 0, limit: int = 1000) -> Dict:
+    """
+    Returns up to `limit` changes with sequence > since, oldest first.
+    Pass nextSince back as `since` to continue.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT seq, record_id, kind, operation, version, changed_at
+            FROM record_changes
+            WHERE data_partition_id = %s AND seq > %s
+            ORDER BY seq
+            LIMIT %s
+        """, (tenant_id, since, limit + 1))
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    changes = [
+        {
+            "sequence": seq,
+            "id": record_id,
+            "kind": kind,
+            "operation": operation,
+            "version": version,
+            "changedAt": changed_at
+        }
+        for seq, record_id, kind, operation, version, changed_at in rows
+    ]
+    return {
+        "changes": changes,
+        "nextSince": changes[-1]["sequence"] if changes else since,
+        "hasMore": has_more
+    }
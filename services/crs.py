@@ -0,0 +1,210 @@
+"""
+Batched coordinate reference system transforms for frame-of-reference
+normalization (`crs=` in the frame-of-reference header).
+
+Every GeoJSON geometry in a batch is collected first, e.g.
+`{"type": "Point", "coordinates": [...], "crs": {"type": "name", "properties": {"name": "EPSG:32631"}}}`,
+as are OSDU AnyCrs geometries (`CoordinateReferenceSystemID`). A geometry
+without a crs of its own inherits one from its enclosing
+Feature/FeatureCollection, and otherwise counts as WGS84. All positions are
+then grouped by source CRS and each group is transformed with one array call.
+
+pyproj is used when installed, with one Transformer cached per
+(source, target) pair. Without it only WGS84 <-> Web Mercator is supported.
+"""
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speed-up
+    np = None
+
+try:
+    from pyproj import Transformer
+except ImportError:  # pragma: no cover - optional dependency
+    Transformer = None
+
+logger = logging.getLogger(__name__)
+
+WGS84 = "EPSG:4326"
+WEB_MERCATOR = "EPSG:3857"
+GEOMETRY_TYPES = {"Point", "MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon"}
+CONTAINER_TYPES = {"Feature", "FeatureCollection", "GeometryCollection"}
+ANY_CRS_PREFIX = "AnyCrs"
+_EPSG_RE = re.compile(r"EPSG:{1,2}(\d+)", re.IGNORECASE)
+_ALIASES = {"wgs84": WGS84, "wgs 84": WGS84, "crs84": WGS84, "ogc:crs84": WGS84, "ogc:1.3:crs84": WGS84,
+            "webmercator": WEB_MERCATOR, "epsg:900913": WEB_MERCATOR}
+_MERCATOR_RADIUS = 6378137.0
+
+# -------------------- CRS names --------------------
+
+def normalize_crs_name(name: Optional[str]) -> Optional[str]:
+    """
+    `EPSG:4326`, `urn:ogc:def:crs:EPSG::4326`, `...CoordinateReferenceSystem:Geographic2D:EPSG::4326:`
+    and `wgs84` all give `EPSG:4326`; other names pass through unchanged.
+    """
+    if not name:
+        return None
+    name = str(name).strip()
+    lowered = name.lower()
+    for alias, canonical in _ALIASES.items():
+        if lowered == alias or lowered.endswith(":" + alias):
+            return canonical
+    match = _EPSG_RE.search(name)
+    return f"EPSG:{match.group(1)}" if match else name
+
+
+def _crs_of(node: dict) -> Tuple[Optional[str], Optional[Callable[[str], None]]]:
+    """
+    The node's own CRS name and a setter that rewrites it.
+    """
+    crs = node.get("crs")
+    if isinstance(crs, str):
+        return crs, lambda name: node.__setitem__("crs", name)
+    if isinstance(crs, dict):
+        props = crs.get("properties")
+        if isinstance(props, dict) and props.get("name"):
+            return props["name"], lambda name: props.__setitem__("name", name)
+    crs_id = node.get("CoordinateReferenceSystemID")
+    if crs_id:
+        def set_crs_id(name: str):
+            # keep the reference-data id shape: ...:Projected:EPSG::32631: -> ...:EPSG::4326:
+            if _EPSG_RE.search(crs_id) and name.startswith("EPSG:"):
+                name = _EPSG_RE.sub(name.replace("EPSG:", "EPSG::"), crs_id)
+            node["CoordinateReferenceSystemID"] = name
+        return crs_id, set_crs_id
+    return None, None
+
+# -------------------- Collection --------------------
+
+def _positions(coordinates, found: List[list]):
+    if isinstance(coordinates, list) and len(coordinates) >= 2 \
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in coordinates[:2]):
+        found.append(coordinates)
+    elif isinstance(coordinates, list):
+        for child in coordinates:
+            _positions(child, found)
+
+
+def _geometry_type(node: dict) -> Optional[str]:
+    kind = node.get("type")
+    if not isinstance(kind, str):
+        return None
+    return kind[len(ANY_CRS_PREFIX):] if kind.startswith(ANY_CRS_PREFIX) else kind
+
+
+def collect_geometries(node, found: List[Tuple[str, List[list], Optional[Callable]]],
+                       inherited: Optional[str] = None, inherited_setter: Optional[Callable] = None):
+    """
+    Appends (source CRS, positions, crs setter) for every geometry under node.
+    """
+    if isinstance(node, list):
+        for child in node:
+            collect_geometries(child, found, inherited, inherited_setter)
+        return
+    if not isinstance(node, dict):
+        return
+
+    own, setter = _crs_of(node)
+    crs = normalize_crs_name(own) or inherited
+    setter = setter if own else inherited_setter
+    kind = _geometry_type(node)
+
+    if kind in GEOMETRY_TYPES and "coordinates" in node:
+        positions: List[list] = []
+        _positions(node["coordinates"], positions)
+        if positions:
+            if setter is None:
+                def setter(name: str, geometry=node):
+                    geometry["crs"] = {"type": "name", "properties": {"name": name}}
+            found.append((crs or WGS84, positions, setter))
+        return
+    if kind in CONTAINER_TYPES:
+        for key in ("geometry", "geometries", "features"):
+            if key in node:
+                collect_geometries(node[key], found, crs, setter)
+        return
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            collect_geometries(value, found, inherited, inherited_setter)
+
+# -------------------- Transforms --------------------
+
+@lru_cache(maxsize=128)
+def get_transformer(source: str, target: str):
+    """
+    Cached pyproj Transformer (x/y = lon/lat order, as GeoJSON).
+    """
+    return Transformer.from_crs(source, target, always_xy=True)
+
+
+def _builtin_transform(source: str, target: str, xs, ys):
+    if np is not None:
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        if (source, target) == (WGS84, WEB_MERCATOR):
+            return (np.radians(xs) * _MERCATOR_RADIUS,
+                    np.log(np.tan(math.pi / 4 + np.radians(ys) / 2)) * _MERCATOR_RADIUS)
+        return (np.degrees(xs / _MERCATOR_RADIUS),
+                np.degrees(2 * np.arctan(np.exp(ys / _MERCATOR_RADIUS)) - math.pi / 2))
+    if (source, target) == (WGS84, WEB_MERCATOR):
+        return ([math.radians(x) * _MERCATOR_RADIUS for x in xs],
+                [math.log(math.tan(math.pi / 4 + math.radians(y) / 2)) * _MERCATOR_RADIUS for y in ys])
+    return ([math.degrees(x / _MERCATOR_RADIUS) for x in xs],
+            [math.degrees(2 * math.atan(math.exp(y / _MERCATOR_RADIUS)) - math.pi / 2) for y in ys])
+
+
+def transform_arrays(source: str, target: str, xs, ys):
+    """
+    Transforms coordinate arrays from source to target CRS.
+    Raises ValueError when the pair cannot be transformed here.
+    """
+    if Transformer is not None:
+        try:
+            return get_transformer(source, target).transform(xs, ys)
+        except Exception as e:
+            raise ValueError(f"Cannot transform {source} to {target}: {e}")
+    if {source, target} == {WGS84, WEB_MERCATOR}:
+        return _builtin_transform(source, target, xs, ys)
+    raise ValueError(f"Cannot transform {source} to {target}: pyproj is not installed")
+
+
+def normalize_crs(records: List[Dict], crs_spec: str,
+                  roots: Optional[Callable[[Dict], List]] = None) -> Dict[str, List[str]]:
+    """
+    Transforms every geometry in the records' data to `crs_spec` in place.
+    `roots(record)` narrows the search to the returned subtrees (default: all of data).
+    Returns {record id: [errors]}; geometries that fail are left unchanged.
+    """
+    target = normalize_crs_name(crs_spec) or WGS84
+    errors: Dict[str, List[str]] = {}
+    groups: Dict[str, List[Tuple[str, List[list], Optional[Callable]]]] = {}
+
+    for record in records:
+        found: List[Tuple[str, List[list], Optional[Callable]]] = []
+        for node in (roots(record) if roots else [record.get("data")]):
+            collect_geometries(node, found)
+        for source, positions, setter in found:
+            if source != target:
+                groups.setdefault(source, []).append((record["id"], positions, setter))
+
+    for source, geometries in groups.items():
+        positions = [p for _, geometry_positions, _ in geometries for p in geometry_positions]
+        try:
+            xs, ys = transform_arrays(source, target, [p[0] for p in positions], [p[1] for p in positions])
+        except ValueError as e:
+            for record_id in dict.fromkeys(record_id for record_id, _, _ in geometries):
+                errors.setdefault(record_id, []).append(str(e))
+            continue
+        xs = xs.tolist() if hasattr(xs, "tolist") else list(xs)
+        ys = ys.tolist() if hasattr(ys, "tolist") else list(ys)
+        for position, x, y in zip(positions, xs, ys):
+            position[0], position[1] = x, y
+        for _, _, setter in geometries:
+            if setter:
+                setter(target)
+        logger.debug(f"🌐 Transformed {len(positions)} position(s) from {source} to {target}")
+    return errors
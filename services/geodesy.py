@@ -0,0 +1,150 @@
+"""
+Ellipsoidal (WGS84) distances between lon/lat positions.
+
+geodesic_distances evaluates Vincenty's inverse formula for one origin
+against arrays of targets, iterating on all pairs at once with NumPy and
+masking pairs out as they converge. Vincenty does not converge for nearly
+antipodal pairs; those are solved with geographiclib (Karney) when installed,
+otherwise with the haversine distance on the mean-radius sphere (within 0.5%).
+vincenty_distance is the same formula for a single pair in plain Python, used
+when NumPy is missing.
+"""
+import math
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speed-up
+    np = None
+
+try:
+    from geographiclib.geodesic import Geodesic
+except ImportError:  # pragma: no cover - optional dependency
+    Geodesic = None
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+MEAN_RADIUS_M = 6371008.8
+TOLERANCE = 1e-12
+MAX_ITERATIONS = 200
+
+# -------------------- Fallbacks --------------------
+
+def haversine_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """
+    Great-circle distance in metres on the mean-radius sphere.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * MEAN_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+
+def _unconverged_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    if Geodesic is not None:
+        return Geodesic.WGS84.Inverse(lat1, lon1, lat2, lon2)["s12"]
+    return haversine_distance(lon1, lat1, lon2, lat2)
+
+# -------------------- Vincenty --------------------
+
+def vincenty_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """
+    Distance in metres between two positions on the WGS84 ellipsoid.
+    """
+    f = WGS84_F
+    L = math.radians(lon2 - lon1)
+    U1 = math.atan((1 - f) * math.tan(math.radians(lat1)))
+    U2 = math.atan((1 - f) * math.tan(math.radians(lat2)))
+    sinU1, cosU1, sinU2, cosU2 = math.sin(U1), math.cos(U1), math.sin(U2), math.cos(U2)
+
+    lam = L
+    for _ in range(MAX_ITERATIONS):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.hypot(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)
+        if sin_sigma == 0:
+            return 0.0
+        cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cosU1 * cosU2 * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos_2sm = cos_sigma - 2 * sinU1 * sinU2 / cos2_alpha if cos2_alpha else 0.0
+        C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        previous = lam
+        lam = L + (1 - C) * f * sin_alpha * (
+            sigma + C * sin_sigma * (cos_2sm + C * cos_sigma * (-1 + 2 * cos_2sm ** 2)))
+        if abs(lam - previous) < TOLERANCE:
+            break
+    else:
+        return _unconverged_distance(lon1, lat1, lon2, lat2)
+
+    u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sm + B / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sm ** 2)
+        - B / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sm ** 2)))
+    return WGS84_B * A * (sigma - delta_sigma)
+
+
+def _vincenty_arrays(lon1: float, lat1: float, lons, lats):
+    f = WGS84_F
+    lons, lats = np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)
+    L = np.radians(lons - lon1)
+    U1 = math.atan((1 - f) * math.tan(math.radians(lat1)))
+    U2 = np.arctan((1 - f) * np.tan(np.radians(lats)))
+    sinU1, cosU1 = math.sin(U1), math.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    lam = L.copy()
+    sin_sigma = np.zeros_like(L)
+    cos_sigma = np.ones_like(L)
+    sigma = np.zeros_like(L)
+    cos2_alpha = np.ones_like(L)
+    cos_2sm = np.zeros_like(L)
+    active = np.ones(L.shape, dtype=bool)
+
+    for _ in range(MAX_ITERATIONS):
+        idx = np.nonzero(active)[0]
+        if not idx.size:
+            break
+        lam_i, cosU2_i, sinU2_i = lam[idx], cosU2[idx], sinU2[idx]
+        sin_lam, cos_lam = np.sin(lam_i), np.cos(lam_i)
+        s_sigma = np.hypot(cosU2_i * sin_lam, cosU1 * sinU2_i - sinU1 * cosU2_i * cos_lam)
+        c_sigma = sinU1 * sinU2_i + cosU1 * cosU2_i * cos_lam
+        sig = np.arctan2(s_sigma, c_sigma)
+        coincident = s_sigma == 0
+        sin_alpha = np.where(coincident, 0.0, cosU1 * cosU2_i * sin_lam / np.where(coincident, 1.0, s_sigma))
+        c2_alpha = 1 - sin_alpha ** 2
+        equatorial = c2_alpha == 0
+        c_2sm = np.where(equatorial, 0.0,
+                         c_sigma - 2 * sinU1 * sinU2_i / np.where(equatorial, 1.0, c2_alpha))
+        C = f / 16 * c2_alpha * (4 + f * (4 - 3 * c2_alpha))
+        new_lam = L[idx] + (1 - C) * f * sin_alpha * (
+            sig + C * s_sigma * (c_2sm + C * c_sigma * (-1 + 2 * c_2sm ** 2)))
+
+        sin_sigma[idx], cos_sigma[idx], sigma[idx] = s_sigma, c_sigma, sig
+        cos2_alpha[idx], cos_2sm[idx], lam[idx] = c2_alpha, c_2sm, new_lam
+        active[idx] = ~((np.abs(new_lam - lam_i) < TOLERANCE) | coincident)
+
+    u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sm + B / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sm ** 2)
+        - B / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sm ** 2)))
+    distances = WGS84_B * A * (sigma - delta_sigma)
+    for i in np.nonzero(active)[0]:
+        distances[i] = _unconverged_distance(lon1, lat1, float(lons[i]), float(lats[i]))
+    return distances
+
+
+def geodesic_distances(lon: float, lat: float, lons: Sequence[float], lats: Sequence[float]) -> List[float]:
+    """
+    WGS84 ellipsoidal distances in metres from (lon, lat) to every (lons[i], lats[i]).
+    """
+    if not len(lons):
+        return []
+    if np is not None:
+        return _vincenty_arrays(lon, lat, lons, lats).tolist()
+    return [vincenty_distance(lon, lat, x, y) for x, y in zip(lons, lats)]
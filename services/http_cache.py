@@ -0,0 +1,59 @@
+"""
+Strong ETags and If-None-Match handling for cacheable GET routes.
+"""
+import hashlib
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi.responses import Response
+
+RECORD_CACHE_CONTROL = "private, no-cache"
+SCHEMA_CACHE_CONTROL = "public, no-cache"
+
+
+def _etag_part(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return ",".join(sorted(_etag_part(v) for v in value))
+    return str(value)
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong ETag from the values that identify a representation.
+    Datetimes and their isoformat() strings hash identically.
+    """
+    digest = hashlib.sha1("\x1f".join(_etag_part(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def record_etag(record_id: str, version, modify_time, attributes=None) -> str:
+    return make_etag("record", record_id, version, modify_time, attributes or [])
+
+
+def schema_etag(key: str, modify_time) -> str:
+    return make_etag("schema", key, modify_time)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison (RFC 9110 §13.1.2), so W/ prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,308 @@
+"""
+In-process metrics in the Prometheus text format (GET /metrics).
+
+Collection is a dict lookup, a bisect and a few additions under an
+uncontended lock per observation, so it stays on in production:
+
+  MetricsMiddleware     pure ASGI middleware timing every request per
+                        (method, route template, status)
+  InstrumentedCursor    psycopg2 cursor_factory (db.py) timing every query
+                        per SQL operation; on_query observers see each one
+  timed(name)           decorator timing a service function
+  RECORDS_*             record ingestion / validation counters per kind
+
+Values live in this process only; run one scrape target per worker.
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence
+
+from psycopg2.extensions import cursor as _pg_cursor
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "CREATE", "ALTER", "DROP",
+                  "TRUNCATE", "LOCK", "BEGIN", "COMMIT", "ROLLBACK", "SET", "SHOW"}
+UNMATCHED_ROUTE = "<unmatched>"
+
+_registry: List["_Metric"] = []
+
+# -------------------- Metric types --------------------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    @property
+    def family(self) -> str:
+        """
+        Name used on the HELP/TYPE lines.
+        """
+        return self.name
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.family} {self.help}", f"# TYPE {self.family} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+            return lines + [line for labels, value in items for line in self._samples(labels, value)]
+
+    def _samples(self, labels: tuple, value) -> List[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    @property
+    def family(self) -> str:
+        return f"{self.name}_total"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self, labels: tuple, value) -> List[str]:
+        return [f"{self.family}{_labels(self.labelnames, labels)} {value}"]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self, labels: tuple, value) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value}"]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # per-bucket (non-cumulative) counts, then +Inf, sum, count
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, *labels) -> int:
+        state = self._values.get(labels)
+        return state[-1] if state else 0
+
+    def _samples(self, labels: tuple, state) -> List[str]:
+        lines, cumulative = [], 0
+        bounds = [repr(float(b)) for b in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, state):
+            cumulative += count
+            le = 'le="' + bound + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {state[-2]}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format.
+    """
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+# -------------------- Metrics --------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "osdu_http_request_duration_seconds", "HTTP request latency by route template and status.",
+    ("method", "route", "status"))
+HTTP_REQUESTS_IN_PROGRESS = Gauge("osdu_http_requests_in_progress", "HTTP requests being served.", ("method",))
+DB_QUERY_SECONDS = Histogram(
+    "osdu_db_query_duration_seconds", "Database query latency by SQL operation.", ("operation",), DB_BUCKETS)
+DB_QUERY_ERRORS = Counter("osdu_db_query_errors", "Database queries that raised, by SQL operation.", ("operation",))
+SERVICE_SECONDS = Histogram(
+    "osdu_service_duration_seconds", "Service function latency.", ("function", "outcome"))
+RECORDS_INGESTED = Counter("osdu_records_ingested", "Records written by ingestion, by kind.", ("kind", "operation"))
+RECORDS_VALIDATED = Counter("osdu_records_validated", "Schema validations, by kind and result.", ("kind", "result"))
+RECORDS_REJECTED = Counter("osdu_records_rejected", "Records rejected by ingestion, by kind and reason.",
+                           ("kind", "reason"))
+
+# -------------------- Service timing --------------------
+
+def timed(name: str):
+    """
+    Records the decorated function's duration in osdu_service_duration_seconds
+    (outcome "ok" or "error").
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                SERVICE_SECONDS.observe(time.perf_counter() - started, name, outcome)
+        return wrapper
+    return decorator
+
+# -------------------- Database --------------------
+
+def sql_operation(query) -> str:
+    """
+    Leading SQL keyword of a query (str, bytes or psycopg2.sql object).
+    """
+    if isinstance(query, bytes):
+        query = query[:64].decode("utf-8", "ignore")
+    elif not isinstance(query, str):
+        return "OTHER"
+    query = query.lstrip()
+    while query.startswith("--"):
+        query = query.split("\n", 1)[1].lstrip() if "\n" in query else ""
+    keyword = query[:10].split(None, 1)[0].upper() if query else ""
+    return keyword if keyword in SQL_OPERATIONS else "OTHER"
+
+
+_query_observers: List[Callable] = []
+
+
+def on_query(observer: Callable):
+    """
+    Registers observer(query, vars, seconds, failed), called after every
+    InstrumentedCursor query. Usable as a decorator.
+    """
+    _query_observers.append(observer)
+    return observer
+
+
+def _observe_query(query, vars, seconds: float, failed: bool):
+    operation = sql_operation(query)
+    if failed:
+        DB_QUERY_ERRORS.inc(operation)
+    DB_QUERY_SECONDS.observe(seconds, operation)
+    for observer in _query_observers:
+        observer(query, vars, seconds, failed)
+
+
+class InstrumentedCursor(_pg_cursor):
+    """
+    psycopg2 cursor recording each execute() in osdu_db_query_duration_seconds
+    and passing it to the on_query observers.
+    execute_values pages go through execute() and are timed per page.
+    """
+
+    def execute(self, query, vars=None):
+        started, failed = time.perf_counter(), True
+        try:
+            result = super().execute(query, vars)
+            failed = False
+            return result
+        finally:
+            _observe_query(query, vars, time.perf_counter() - started, failed)
+
+    def executemany(self, query, vars_list):
+        started, failed = time.perf_counter(), True
+        try:
+            result = super().executemany(query, vars_list)
+            failed = False
+            return result
+        finally:
+            _observe_query(query, vars_list, time.perf_counter() - started, failed)
+
+# -------------------- HTTP --------------------
+
+_route_templates: Dict[int, str] = {}
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the route that served a request (after routing), e.g.
+    /api/storage/v2/records/{record_id}; "<unmatched>" when none did.
+    """
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    template = _route_templates.get(id(endpoint))
+    if template is None:
+        for candidate in getattr(scope.get("app"), "routes", ()):
+            if getattr(candidate, "endpoint", None) is endpoint:
+                template = candidate.path
+                break
+        template = _route_templates[id(endpoint)] = template or UNMATCHED_ROUTE
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no per-request task or body buffering, unlike
+    BaseHTTPMiddleware) timing requests per route template, so /records/{record_id}
+    is one series. Requests no route matched share the "<unmatched>" label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        method = scope.get("method", "")
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method, route_template(scope), str(status[0]))
@@ -0,0 +1,321 @@
+"""
+Frame-of-reference normalization for POST /query/records:batch.
+
+The `frame-of-reference` header is a `key=value;` list, e.g.
+`units=SI;crs=wgs84;elevation=msl;azimuth=true north;dates=utc;`. `crs`
+selects the target CRS for geometries (services/crs.py); `units` selects
+target units: `SI` converts every value to the base unit of its
+dimension, and unit codes after it override single dimensions
+(`units=SI,ft` keeps lengths in feet).
+
+Conversion factors come from the UnitOfMeasure reference data
+(`osdu:wks:reference-data--UnitOfMeasure:*`). Each unit's Energistics
+coefficients convert to the base unit as base = (A + B*x) / (C + D*x). They
+are read from `PersistableReference` (`abcd` or `scaleOffset`), or from
+ParameterA-D / CoefficientA-D when present.
+
+Every `{"value": <number>, "uom": <code or UnitOfMeasure id>}` (or
+`{"Value", "Unit"}`) object in a record's data is collected first, visiting
+only the paths of the kind's precompiled plan (services/normalization_plans.py)
+when its schema is registered. Values are then grouped by (from, to) unit
+and converted one NumPy array per group (plain Python when NumPy is missing).
+"""
+import json
+import logging
+import os
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from db import get_conn
+from services.cache import LRUCache
+from services.crs import normalize_crs
+from services.normalization_plans import (
+    Plan,
+    geometry_roots,
+    get_plans,
+    measured_values,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speed-up
+    np = None
+
+logger = logging.getLogger(__name__)
+
+UOM_KIND_PATTERN = "%:reference-data--UnitOfMeasure:%"
+UOM_ID_MARKER = "--UnitOfMeasure:"
+# Partition holding shared reference data (ingest_reference_values.py loads into "osdu")
+REFERENCE_PARTITION = os.getenv("OSDU_REFERENCE_PARTITION", "osdu")
+UOM_CACHE_TTL = float(os.getenv("OSDU_UOM_CACHE_TTL", "300"))
+_catalogue_cache = LRUCache(maxsize=32, ttl=UOM_CACHE_TTL)
+
+# frame-of-reference keys that are applied; elevation, azimuth, dates, ... are ignored
+FRAME_KEYS = ("units", "crs")
+
+STATUS_SUCCESS = "SUCCESS"
+STATUS_ERROR = "ERROR"
+
+Unit = namedtuple("Unit", ["code", "a", "b", "c", "d", "dimension", "reference"])
+
+# -------------------- Frame of reference --------------------
+
+def parse_frame_of_reference(header: Optional[str]) -> Dict[str, str]:
+    """
+    Parses `key=value;key=value;` into a dict with lower-cased keys, keeping
+    only the keys acted on (FRAME_KEYS). Malformed and other entries are
+    skipped. Raises ValueError when `units` or `crs` has no value.
+    """
+    frame = {}
+    for entry in (header or "").split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if "=" not in entry:
+            logger.warning(f"⚠️ Ignoring malformed frame-of-reference entry: {entry!r}")
+            continue
+        key, value = (part.strip() for part in entry.split("=", 1))
+        key = key.lower()
+        if key not in FRAME_KEYS:
+            logger.debug(f"Ignoring frame-of-reference entry: {entry!r}")
+            continue
+        if not value.strip(", "):
+            raise ValueError(f"Invalid frame-of-reference entry: {entry!r} (expected a value for {key})")
+        frame[key] = value
+    return frame
+
+# -------------------- Unit catalogue --------------------
+
+def unit_code(reference: str) -> str:
+    """
+    `ft`, `osdu:reference-data--UnitOfMeasure:ft` and `...:ft:` all give `ft`.
+    """
+    reference = str(reference).strip()
+    if UOM_ID_MARKER in reference:
+        reference = reference.split(UOM_ID_MARKER, 1)[1].rstrip(":")
+    return reference
+
+
+def _persistable_reference(data: Dict) -> Dict:
+    ref = data.get("PersistableReference")
+    if isinstance(ref, str):
+        try:
+            ref = json.loads(ref)
+        except ValueError:
+            return {}
+    return ref if isinstance(ref, dict) else {}
+
+
+def unit_from_reference_data(data: Dict) -> Optional[Unit]:
+    """
+    Builds a Unit from a UnitOfMeasure record's data; None when it carries no
+    conversion coefficients.
+    """
+    ref = _persistable_reference(data)
+    code = data.get("Code") or data.get("ID") or ref.get("symbol") or data.get("Name")
+    if not code:
+        return None
+
+    coefficients = None
+    for prefix in ("Parameter", "Coefficient"):
+        if all(f"{prefix}{p}" in data for p in "ABCD"):
+            coefficients = [data[f"{prefix}{p}"] for p in "ABCD"]
+            break
+    if coefficients is None and isinstance(ref.get("abcd"), dict):
+        abcd = ref["abcd"]
+        coefficients = [abcd.get("a", 0.0), abcd.get("b", 1.0), abcd.get("c", 1.0), abcd.get("d", 0.0)]
+    if coefficients is None and isinstance(ref.get("scaleOffset"), dict):
+        scale = float(ref["scaleOffset"].get("scale", 1.0))
+        offset = float(ref["scaleOffset"].get("offset", 0.0))
+        coefficients = [-scale * offset, scale, 1.0, 0.0]
+    if coefficients is None:
+        return None
+
+    try:
+        a, b, c, d = (float(v) for v in coefficients)
+    except (TypeError, ValueError):
+        return None
+    dimension = (data.get("UnitDimensionCode")
+                 or (ref.get("baseMeasurement") or {}).get("ancestry")
+                 or data.get("BaseForConversion"))
+    return Unit(str(code), a, b, c, d, dimension, data.get("PersistableReference"))
+
+
+class UnitCatalogue:
+    """
+    Units by code, plus each dimension's base unit (A=0, B=1, C=1, D=0).
+    """
+
+    def __init__(self, units: List[Unit]):
+        self.units: Dict[str, Unit] = {}
+        self.base_units: Dict[str, Unit] = {}
+        for unit in units:
+            self.units[unit.code] = unit
+            if unit.dimension and (unit.a, unit.b, unit.c, unit.d) == (0.0, 1.0, 1.0, 0.0):
+                self.base_units.setdefault(unit.dimension, unit)
+
+    def __len__(self):
+        return len(self.units)
+
+    def get(self, reference: str) -> Optional[Unit]:
+        return self.units.get(unit_code(reference))
+
+
+def load_unit_catalogue(tenant_id: str) -> UnitCatalogue:
+    """
+    UnitOfMeasure reference data from the tenant's and the reference partition,
+    cached for OSDU_UOM_CACHE_TTL seconds. Tenant entries win on code clashes.
+    """
+    cached = _catalogue_cache.get(tenant_id)
+    if cached is not None:
+        return cached
+
+    partitions = [REFERENCE_PARTITION, tenant_id] if REFERENCE_PARTITION != tenant_id else [tenant_id]
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT data_partition_id, data
+            FROM records
+            WHERE data_partition_id = ANY(%s) AND kind_group = 'reference-data'
+              AND kind LIKE %s AND osdu_record_is_deleted(osdu_deleted, data) = 0
+        """, (partitions, UOM_KIND_PATTERN))
+        rows = cur.fetchall()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    rows.sort(key=lambda row: partitions.index(row[0]))
+    units = []
+    for _, data in rows:
+        data = json.loads(data) if isinstance(data, str) else data
+        unit = unit_from_reference_data(data or {})
+        if unit:
+            units.append(unit)
+    catalogue = UnitCatalogue(units)
+    logger.info(f"📏 Loaded {len(catalogue)} units of measure for {tenant_id}")
+    _catalogue_cache.set(tenant_id, catalogue)
+    return catalogue
+
+# -------------------- Targets --------------------
+
+def unit_targets(units_spec: str, catalogue: UnitCatalogue) -> Tuple[bool, Dict[str, Unit]]:
+    """
+    Returns (convert to base units, {dimension: explicit target unit}).
+    Raises ValueError for unknown units in the spec.
+    """
+    to_base, overrides = False, {}
+    for token in (t.strip() for t in units_spec.split(",")):
+        if not token:
+            continue
+        if token.upper() == "SI":
+            to_base = True
+            continue
+        unit = catalogue.get(token)
+        if unit is None or not unit.dimension:
+            raise ValueError(f"Unknown unit in frame-of-reference: {token}")
+        overrides[unit.dimension] = unit
+    return to_base, overrides
+
+# -------------------- Conversion --------------------
+
+def _convert(values, source: Unit, target: Unit):
+    """
+    Converts an array (or list) of values from `source` to `target` through
+    the base unit.
+    """
+    if np is not None:
+        x = np.asarray(values, dtype=float)
+        base = (source.a + source.b * x) / (source.c + source.d * x)
+        return ((target.a - target.c * base) / (target.d * base - target.b)).tolist()
+    out = []
+    for x in values:
+        base = (source.a + source.b * x) / (source.c + source.d * x)
+        out.append((target.a - target.c * base) / (target.d * base - target.b))
+    return out
+
+
+def _target_reference(original: str, target: Unit) -> str:
+    original = str(original)
+    if UOM_ID_MARKER in original:
+        prefix = original.split(UOM_ID_MARKER, 1)[0]
+        return f"{prefix}{UOM_ID_MARKER}{target.code}" + (":" if original.endswith(":") else "")
+    return target.code
+
+
+def normalize_units(records: List[Dict], units_spec: str, catalogue: UnitCatalogue,
+                    plans: Optional[Dict[str, Optional[Plan]]] = None) -> Dict[str, List[str]]:
+    """
+    Converts every measured value (see measured_values) in the records' data in place.
+    Records whose kind has a plan in `plans` only have the plan's paths visited.
+    Returns {record id: [errors]} for records with values that could not be
+    converted (those values are left unchanged).
+    """
+    plans = plans or {}
+    to_base, overrides = unit_targets(units_spec, catalogue)
+    errors: Dict[str, List[str]] = {}
+    groups: Dict[Tuple[str, str], List[Tuple[dict, str, str]]] = {}
+
+    for record in records:
+        for pair in measured_values(record.get("data"), plans.get(record.get("kind"))):
+            node, _, unit_key = pair
+            source = catalogue.get(node[unit_key])
+            if source is None:
+                errors.setdefault(record["id"], []).append(f"Unknown unit of measure: {node[unit_key]}")
+                continue
+            target = overrides.get(source.dimension)
+            if target is None and to_base:
+                target = catalogue.base_units.get(source.dimension)
+                if target is None:
+                    errors.setdefault(record["id"], []).append(
+                        f"No base unit for dimension {source.dimension} ({source.code})")
+                    continue
+            if target is None or target.code == source.code:
+                continue
+            groups.setdefault((source.code, target.code), []).append(pair)
+
+    for (source_code, target_code), pairs in groups.items():
+        source, target = catalogue.units[source_code], catalogue.units[target_code]
+        converted = _convert([node[value_key] for node, value_key, _ in pairs], source, target)
+        for (node, value_key, unit_key), value in zip(pairs, converted):
+            node[value_key] = value
+            node[unit_key] = _target_reference(node[unit_key], target)
+    return errors
+
+
+def conversion_statuses(records: List[Dict], errors: Dict[str, List[str]]) -> List[Dict]:
+    return [
+        {
+            "id": record["id"],
+            "status": STATUS_ERROR if errors.get(record["id"]) else STATUS_SUCCESS,
+            "errors": errors.get(record["id"], [])
+        }
+        for record in records
+    ]
+
+
+# -------------------- Batch --------------------
+
+def wants_normalization(frame: Dict[str, str]) -> bool:
+    return bool(frame.get("units") or frame.get("crs"))
+
+
+def normalize_records(records: List[Dict], frame: Dict[str, str], tenant_id: str) -> List[Dict]:
+    """
+    Applies the frame's units and crs stages to decoded records in place and
+    returns their conversionStatuses. Raises ValueError for an invalid frame.
+    """
+    errors: Dict[str, List[str]] = {}
+    plans = get_plans(record["kind"] for record in records if record.get("kind"))
+    stages = []
+    if frame.get("units"):
+        stages.append(normalize_units(records, frame["units"], load_unit_catalogue(tenant_id), plans))
+    if frame.get("crs"):
+        stages.append(normalize_crs(records, frame["crs"],
+                                    lambda record: geometry_roots(record.get("data"), plans.get(record.get("kind")))))
+    for stage_errors in stages:
+        for record_id, messages in stage_errors.items():
+            errors.setdefault(record_id, []).extend(messages)
+    return conversion_statuses(records, errors)
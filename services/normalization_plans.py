@@ -0,0 +1,220 @@
+"""
+Per-kind normalization plans.
+
+A plan lists the data paths the frame-of-reference stages need to visit for
+a kind, compiled once from its registered schema (following $ref into other
+kinds and local #/ pointers, plus allOf/anyOf/oneOf):
+
+  measures    (path, value key, unit key) for objects shaped {value, uom} /
+              {Value, Unit}, and for numbers annotated
+              `x-osdu-frame-of-reference: "UOM_via_property:<sibling>"`
+              (path is then the containing object)
+  geometries  paths of objects holding GeoJSON / AnyCrs geometries
+              (`coordinates`, `features`, `Wgs84Coordinates`, ...) or
+              annotated `x-osdu-frame-of-reference: "CRS..."`
+
+Paths are key tuples; "[]" steps into every array element. Normalizing a
+record then only visits these paths, instead of walking the whole data block.
+Kinds without a registered schema have no plan and are walked in full.
+
+Plans are cached per kind and dropped whenever schemas are registered
+(schema_service.on_schema_change). The TTL bounds staleness in other workers.
+"""
+import logging
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.cache import LRUCache
+from services.schema_service import load_schema_closure, on_schema_change
+
+logger = logging.getLogger(__name__)
+
+# (value key, unit key) shapes of a measured value: {"value", "uom"} and {"Value", "Unit"}
+PAIR_KEYS = (("value", "uom"), ("Value", "Unit"))
+GEOMETRY_MARKERS = {"coordinates", "features", "geometries", "Wgs84Coordinates", "AsIngestedCoordinates"}
+FRAME_OF_REFERENCE = "x-osdu-frame-of-reference"
+UOM_VIA_PROPERTY = "UOM_via_property:"
+ARRAY_STEP = "[]"
+MAX_DEPTH = 32
+
+Plan = namedtuple("Plan", ["kind", "measures", "geometries"])
+
+_NO_PLAN = object()
+_plan_cache = LRUCache(maxsize=512, ttl=300)
+
+# -------------------- Compilation --------------------
+
+def _pointer(root: Dict, fragment: str) -> Dict:
+    node = root
+    for part in fragment.lstrip("/").split("/"):
+        if not part:
+            continue
+        part = part.replace("~1", "/").replace("~0", "~")
+        node = node.get(part, {}) if isinstance(node, dict) else {}
+    return node if isinstance(node, dict) else {}
+
+
+def _resolve(node: Dict, root: Dict, schemas: Dict[str, Dict], refs: tuple) -> Tuple[Dict, Dict, tuple]:
+    """
+    Follows a $ref chain; returns (schema, its root, refs seen). A cycle resolves to {}.
+    """
+    while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+        ref = node["$ref"]
+        if ref in refs:
+            return {}, root, refs
+        refs = refs + (ref,)
+        base, _, fragment = ref.partition("#")
+        if base:
+            root = schemas.get(base) or {}
+        node = _pointer(root, fragment) if fragment else root
+    return node if isinstance(node, dict) else {}, root, refs
+
+
+def _properties(node: Dict, root: Dict, schemas: Dict[str, Dict], refs: tuple) -> Dict[str, tuple]:
+    """
+    Merged {name: (schema, root, refs)} of an object schema and its allOf/anyOf/oneOf parts.
+    """
+    node, root, refs = _resolve(node, root, schemas, refs)
+    merged = {}
+    for name, prop in (node.get("properties") or {}).items():
+        merged[name] = (prop, root, refs)
+    for key in ("allOf", "anyOf", "oneOf"):
+        for part in node.get(key) or []:
+            merged.update(_properties(part, root, schemas, refs))
+    return merged
+
+
+def _walk(node: Dict, root: Dict, schemas: Dict[str, Dict], refs: tuple, path: tuple,
+          measures: List[tuple], geometries: List[tuple]):
+    if len(path) > MAX_DEPTH:
+        return
+    props = _properties(node, root, schemas, refs)
+    names = set(props)
+    for value_key, unit_key in PAIR_KEYS:
+        if value_key in names and unit_key in names:
+            measures.append((path, value_key, unit_key))
+            return
+    if names & GEOMETRY_MARKERS:
+        geometries.append(path)
+        return
+
+    for name, (prop, prop_root, prop_refs) in props.items():
+        resolved, resolved_root, resolved_refs = _resolve(prop, prop_root, schemas, prop_refs)
+        annotation = prop.get(FRAME_OF_REFERENCE) or resolved.get(FRAME_OF_REFERENCE)
+        if isinstance(annotation, str):
+            if annotation.startswith(UOM_VIA_PROPERTY):
+                measures.append((path, name, annotation[len(UOM_VIA_PROPERTY):].strip()))
+                continue
+            if annotation.upper().startswith("CRS"):
+                geometries.append(path + (name,))
+                continue
+        if resolved.get("type") == "array" or "items" in resolved:
+            items = resolved.get("items")
+            if isinstance(items, dict):
+                _walk(items, resolved_root, schemas, resolved_refs, path + (name, ARRAY_STEP), measures, geometries)
+        elif resolved.get("properties") or any(k in resolved for k in ("allOf", "anyOf", "oneOf")):
+            _walk(resolved, resolved_root, schemas, resolved_refs, path + (name,), measures, geometries)
+
+
+def compile_plan(kind: str, schemas: Dict[str, Dict]) -> Optional[Plan]:
+    """
+    Compiles a kind's plan from a schema closure (schema_service.load_schema_closure);
+    None when the kind has no registered schema.
+    """
+    root = schemas.get(kind)
+    if not root:
+        return None
+    measures, geometries = [], []
+    data = (root.get("properties") or {}).get("data") or {}
+    _walk(data, root, schemas, (), (), measures, geometries)
+    return Plan(kind, tuple(dict.fromkeys(measures)), tuple(dict.fromkeys(geometries)))
+
+
+def get_plans(kinds: Iterable[str]) -> Dict[str, Optional[Plan]]:
+    """
+    Plans for the given kinds, compiling the missing ones against one shared
+    schema closure.
+    """
+    plans, missing = {}, []
+    for kind in dict.fromkeys(kinds):
+        cached = _plan_cache.get(kind)
+        if cached is None:
+            missing.append(kind)
+        else:
+            plans[kind] = None if cached is _NO_PLAN else cached
+    if missing:
+        schemas = load_schema_closure(missing)
+        for kind in missing:
+            plan = compile_plan(kind, schemas)
+            _plan_cache.set(kind, _NO_PLAN if plan is None else plan)
+            plans[kind] = plan
+            if plan:
+                logger.info(f"🗺️ Normalization plan for {kind}: {len(plan.measures)} measure path(s), "
+                            f"{len(plan.geometries)} geometry path(s)")
+    return plans
+
+
+@on_schema_change
+def _drop_plans(kinds: List[str]):
+    # Registrations are rare and a plan can depend on any referenced kind: start over.
+    _plan_cache.clear()
+
+# -------------------- Navigation --------------------
+
+def nodes_at(node, path: tuple):
+    """
+    Yields every object at `path` under node.
+    """
+    if not path:
+        if isinstance(node, dict):
+            yield node
+        return
+    step, rest = path[0], path[1:]
+    if step == ARRAY_STEP:
+        if isinstance(node, list):
+            for item in node:
+                yield from nodes_at(item, rest)
+    elif isinstance(node, dict) and step in node:
+        yield from nodes_at(node[step], rest)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _walk_pairs(node, found: List[Tuple[dict, str, str]]):
+    if isinstance(node, dict):
+        for value_key, unit_key in PAIR_KEYS:
+            if unit_key in node and _is_number(node.get(value_key)):
+                found.append((node, value_key, unit_key))
+                return
+        for child in node.values():
+            _walk_pairs(child, found)
+    elif isinstance(node, list):
+        for child in node:
+            _walk_pairs(child, found)
+
+
+def measured_values(data, plan: Optional[Plan]) -> List[Tuple[dict, str, str]]:
+    """
+    (object, value key, unit key) for every measured value in a record's data;
+    only the plan's paths are visited when there is a plan.
+    """
+    found: List[Tuple[dict, str, str]] = []
+    if plan is None:
+        _walk_pairs(data, found)
+        return found
+    for path, value_key, unit_key in plan.measures:
+        for node in nodes_at(data, path):
+            if unit_key in node and _is_number(node.get(value_key)):
+                found.append((node, value_key, unit_key))
+    return found
+
+
+def geometry_roots(data, plan: Optional[Plan]) -> List:
+    """
+    Subtrees of a record's data that can hold geometries.
+    """
+    if plan is None:
+        return [data]
+    return [node for path in plan.geometries for node in nodes_at(data, path)]
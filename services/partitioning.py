@@ -0,0 +1,59 @@
+"""
+Tenant and kind-group partitioning of the records table.
+
+records is LIST-partitioned by data_partition_id, and each tenant partition is
+LIST-partitioned by kind_group (see sql/002_partition_records_by_tenant.sql).
+Every query should filter on data_partition_id so Postgres prunes to a single
+tenant's partitions.
+"""
+import logging
+import threading
+from db import get_conn
+
+logger = logging.getLogger(__name__)
+
+# Kind families with their own sub-partition; everything else lands in "other".
+# Keep in sync with osdu_kind_group() in sql/002_partition_records_by_tenant.sql.
+KIND_GROUPS = ("master-data", "reference-data", "work-product-component", "work-product", "dataset")
+OTHER_KIND_GROUP = "other"
+
+_ensured_tenants = set()
+_ensure_lock = threading.Lock()
+
+
+def kind_group(kind: str) -> str:
+    """
+    Maps a kind to its partition group, e.g.
+    osdu:wks:master-data--Well:1.0.0 -> master-data.
+    """
+    parts = (kind or "").split(":")
+    entity_type = parts[2] if len(parts) >= 3 else ""
+    if "--" not in entity_type:
+        return OTHER_KIND_GROUP
+    group = entity_type.split("--", 1)[0]
+    return group if group in KIND_GROUPS else OTHER_KIND_GROUP
+
+
+def ensure_tenant_partition(tenant_id: str) -> None:
+    """
+    Creates the tenant's partitions on first write. Runs and commits in its own
+    transaction; tenants already seen by this process are skipped.
+    """
+    if tenant_id in _ensured_tenants:
+        return
+    with _ensure_lock:
+        if tenant_id in _ensured_tenants:
+            return
+        conn = get_conn()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT osdu_ensure_record_partition(%s)", (tenant_id,))
+            table = cur.fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+        _ensured_tenants.add(tenant_id)
+        logger.info(f"🗂️ Records partition ready for tenant {tenant_id}: {table}")
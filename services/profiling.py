@@ -0,0 +1,224 @@
+"""
+On-demand profiling of the running service, guarded by OSDU_ADMIN_TOKEN.
+
+Sampling profiler: a daemon thread snapshots every other thread's stack
+(sys._current_frames) at a fixed interval for a bounded time and aggregates
+them as collapsed stacks (`thread;outer;...;inner count` lines), the input
+format of flamegraph.pl, speedscope and inferno. Nothing runs while stopped.
+
+Per-request profiling: a request sent with `X-Profile: 1` and the admin
+token runs under cProfile. The stats are kept in memory (the last
+PROFILE_KEEP requests) and the response carries an `X-Profile-Id` to fetch
+them with. cProfile only sees the event-loop thread, which is where the
+async routes run the service code. Other requests served concurrently on
+that thread show up in the profile too. Only one request is profiled at a
+time (cProfile hooks the thread); overlapping ones run unprofiled.
+
+With no OSDU_ADMIN_TOKEN set, profiling is disabled.
+"""
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+
+from services.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN = os.getenv("OSDU_ADMIN_TOKEN", "")
+ADMIN_TOKEN_HEADER = "x-admin-token"
+PROFILE_REQUEST_HEADER = b"x-profile"
+DEFAULT_INTERVAL = 0.01
+MIN_INTERVAL = 0.001
+MAX_SECONDS = 300.0
+MAX_DEPTH = 128
+PROFILE_KEEP = 16
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_request_profiles = LRUCache(maxsize=PROFILE_KEEP)
+_request_profile_lock = threading.Lock()
+
+# -------------------- Guard --------------------
+
+def profiling_enabled() -> bool:
+    return bool(ADMIN_TOKEN)
+
+
+def check_admin_token(token: Optional[str]) -> bool:
+    """
+    Constant-time comparison with OSDU_ADMIN_TOKEN; always False when unset.
+    """
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+# -------------------- Sampling --------------------
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    One sampling session at a time; the last result stays downloadable.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = DEFAULT_INTERVAL
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.deadline: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float = DEFAULT_INTERVAL) -> Dict:
+        """
+        Starts sampling for `seconds`. Raises RuntimeError if already running
+        and ValueError for out-of-range settings.
+        """
+        if not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds must be in (0, {MAX_SECONDS:g}]")
+        if interval < MIN_INTERVAL:
+            raise ValueError(f"interval must be >= {MIN_INTERVAL * 1000:g} ms")
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A profiling session is already running")
+            self._stop.clear()
+            self._stacks = Counter()
+            self.samples = 0
+            self.interval = interval
+            self.started_at, self.stopped_at = time.time(), None
+            self.deadline = time.monotonic() + seconds
+            self._thread = threading.Thread(target=self._run, name="osdu-sampling-profiler", daemon=True)
+            self._thread.start()
+        logger.info(f"🔬 Sampling profiler started for {seconds:g}s every {interval * 1000:g} ms")
+        return self.status()
+
+    def stop(self) -> Dict:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        return self.status()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.is_set() and time.monotonic() < self.deadline:
+            frames = sys._current_frames()
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            del frames
+            self._stop.wait(self.interval)
+        self.stopped_at = time.time()
+        logger.info(f"🔬 Sampling profiler stopped after {self.samples} samples")
+
+    def status(self) -> Dict:
+        return {
+            "running": self.running,
+            "samples": self.samples,
+            "distinctStacks": len(self._stacks),
+            "intervalMs": self.interval * 1000,
+            "startedAt": self.started_at,
+            "stoppedAt": self.stopped_at,
+        }
+
+    def collapsed(self) -> str:
+        """
+        The (current or last) session as collapsed stacks, most frequent first.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+profiler = SamplingProfiler()
+
+# -------------------- Per request --------------------
+
+def request_profile(profile_id: str) -> Optional[Dict]:
+    return _request_profiles.get(profile_id)
+
+
+def format_stats(profile: cProfile.Profile, sort: str = "cumulative", limit: int = 60) -> str:
+    out = io.StringIO()
+    pstats.Stats(profile, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware running requests sent with `X-Profile: 1` and a
+    valid X-Admin-Token under cProfile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMIN_TOKEN:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers", ()))
+        wanted = headers.get(PROFILE_REQUEST_HEADER, b"").strip() in (b"1", b"true")
+        if not wanted or not check_admin_token(headers.get(ADMIN_TOKEN_HEADER.encode(), b"").decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+        if not _request_profile_lock.acquire(blocking=False):
+            logger.warning(f"🔬 Not profiling {scope.get('method')} {scope.get('path')}: another request is being profiled")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profile = cProfile.Profile()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.disable()
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.disable()
+            _request_profile_lock.release()
+            elapsed = time.perf_counter() - started
+            _request_profiles.set(profile_id, {
+                "id": profile_id,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "elapsedMs": round(elapsed * 1000, 3),
+                "profile": profile,
+            })
+            logger.info(f"🔬 Profiled {scope.get('method')} {scope.get('path')} in {elapsed * 1000:.1f} ms "
+                        f"(profile {profile_id})")
@@ -0,0 +1,202 @@
+"""
+Per-request database query accounting and the slow-query log.
+
+QueryAccountingMiddleware opens a RequestQueries in a context variable for
+every HTTP request; the InstrumentedCursor observer (services/metrics.on_query)
+adds each query to it. When the request ends:
+
+  - statements slower than OSDU_SLOW_QUERY_MS were logged as they ran, with
+    literals and parameters replaced by placeholders (types and sizes only)
+  - a statement shape executed more than OSDU_N_PLUS_ONE_THRESHOLD times is
+    logged as a likely N+1 pattern
+  - OSDU_QUERY_DEBUG=header adds the summary as X-DB-* response headers to
+    requests sent with `X-Debug-Queries: 1`; `always` adds them to every response
+
+Queries outside a request (scripts, startup) are only checked against the
+slow-query threshold.
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter as ShapeCounter
+from contextvars import ContextVar
+from typing import List, Optional
+
+from services.metrics import Counter, Histogram, on_query, route_template
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_SECONDS = float(os.getenv("OSDU_SLOW_QUERY_MS", "200")) / 1000
+N_PLUS_ONE_THRESHOLD = int(os.getenv("OSDU_N_PLUS_ONE_THRESHOLD", "10"))
+# off | header | always
+QUERY_DEBUG = os.getenv("OSDU_QUERY_DEBUG", "off").lower()
+DEBUG_REQUEST_HEADER = b"x-debug-queries"
+MAX_SHAPE_LENGTH = 300
+
+QUERIES_PER_REQUEST = Histogram(
+    "osdu_db_queries_per_request", "Database queries issued per HTTP request.", ("route",),
+    (1, 2, 5, 10, 20, 50, 100, 250, 1000))
+DB_SECONDS_PER_REQUEST = Histogram(
+    "osdu_db_seconds_per_request", "Database time per HTTP request.", ("route",))
+SLOW_QUERIES = Counter("osdu_db_slow_queries", "Queries slower than OSDU_SLOW_QUERY_MS.", ())
+N_PLUS_ONE = Counter("osdu_db_n_plus_one", "Requests repeating one statement shape over the threshold.", ("route",))
+
+_current: ContextVar[Optional["RequestQueries"]] = ContextVar("osdu_request_queries", default=None)
+
+# -------------------- Shapes --------------------
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+_VALUES_RE = re.compile(r"(VALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+
+
+def statement_shape(query) -> str:
+    """
+    A statement with whitespace collapsed and inline literals replaced by ?,
+    so repeated executions of one statement (and execute_values pages) compare equal.
+    """
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        query = str(query)
+    shape = _WHITESPACE_RE.sub(" ", query).strip()
+    shape = _NUMBER_RE.sub("?", _STRING_RE.sub("?", shape))
+    shape = _VALUES_RE.sub(r"\1, ...", shape)
+    return shape if len(shape) <= MAX_SHAPE_LENGTH else shape[:MAX_SHAPE_LENGTH] + "…"
+
+
+def redact_params(vars) -> str:
+    """
+    Parameter types and sizes without their values: (<str>, <list[3]>, <dict{2}>).
+    """
+    def placeholder(value) -> str:
+        if value is None:
+            return "NULL"
+        if isinstance(value, (list, tuple)):
+            return f"<{type(value).__name__}[{len(value)}]>"
+        if isinstance(value, dict):
+            return f"<dict{{{len(value)}}}>"
+        return f"<{type(value).__name__}>"
+
+    if vars is None:
+        return "()"
+    if isinstance(vars, dict):
+        return "{" + ", ".join(f"{key}: {placeholder(value)}" for key, value in vars.items()) + "}"
+    if isinstance(vars, (list, tuple)):
+        return "(" + ", ".join(placeholder(value) for value in vars) + ")"
+    return placeholder(vars)
+
+# -------------------- Accounting --------------------
+
+class RequestQueries:
+    """
+    Queries issued while serving one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slow = 0
+        self.shapes: ShapeCounter = ShapeCounter()
+
+    def add(self, shape: str, seconds: float, slow: bool):
+        self.count += 1
+        self.seconds += seconds
+        self.slow += slow
+        self.shapes[shape] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[tuple]:
+        """
+        (shape, executions) for shapes run more than `threshold` times, most first.
+        """
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+def current_queries() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+@on_query
+def _record_query(query, vars, seconds: float, failed: bool):
+    slow = seconds >= SLOW_QUERY_SECONDS
+    accounting = _current.get()
+    if not slow and accounting is None:
+        return
+    shape = statement_shape(query)
+    if accounting is not None:
+        accounting.add(shape, seconds, slow)
+    if slow:
+        SLOW_QUERIES.inc()
+        params = redact_params(vars[0] if isinstance(vars, list) and vars and isinstance(vars[0], (list, tuple, dict))
+                               else vars)
+        logger.warning(f"🐢 Slow query ({seconds * 1000:.1f} ms{', failed' if failed else ''}): {shape} params={params}")
+
+# -------------------- HTTP --------------------
+
+def _wants_headers(scope) -> bool:
+    if QUERY_DEBUG == "always":
+        return True
+    if QUERY_DEBUG != "header":
+        return False
+    return any(name == DEBUG_REQUEST_HEADER and value.strip() in (b"1", b"true")
+               for name, value in scope.get("headers", ()))
+
+
+def summary_headers(accounting: RequestQueries) -> List[tuple]:
+    headers = [
+        (b"x-db-query-count", str(accounting.count).encode()),
+        (b"x-db-time-ms", f"{accounting.seconds * 1000:.3f}".encode()),
+        (b"x-db-slow-queries", str(accounting.slow).encode()),
+    ]
+    repeated = accounting.repeated()
+    if repeated:
+        shape, n = repeated[0]
+        headers.append((b"x-db-n-plus-one", f"{n}x {shape[:120]}".encode("ascii", "replace")))
+    return headers
+
+
+class QueryAccountingMiddleware:
+    """
+    Pure ASGI middleware giving each request its own RequestQueries.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accounting = RequestQueries()
+        token = _current.set(accounting)
+        debug = _wants_headers(scope)
+
+        async def send_wrapper(message):
+            if debug and message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + summary_headers(accounting)}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._report(scope, accounting, time.perf_counter() - started)
+
+    @staticmethod
+    def _report(scope, accounting: RequestQueries, elapsed: float):
+        if not accounting.count:
+            return
+        route = route_template(scope)
+        QUERIES_PER_REQUEST.observe(accounting.count, route)
+        DB_SECONDS_PER_REQUEST.observe(accounting.seconds, route)
+        repeated = accounting.repeated()
+        if repeated:
+            N_PLUS_ONE.inc(route)
+            shape, n = repeated[0]
+            logger.warning(f"🔁 Possible N+1 in {scope.get('method')} {route}: {n}x {shape} "
+                           f"({accounting.count} queries, {accounting.seconds * 1000:.1f} ms DB "
+                           f"of {elapsed * 1000:.1f} ms)")
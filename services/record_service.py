@@ -1,20 +1,94 @@
 import json
 import logging
+import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from fastapi import HTTPException
 from db import get_conn
-import json
-from datetime import datetime
-from db import get_conn
-from services.schema_service import validate_data_against_schema
-from services.schema_service import validate_record, validate_data_against_schema
+from services.cache import LRUCache
+from services.change_feed import append_changes
+from services.metrics import RECORDS_INGESTED, RECORDS_REJECTED, timed
+from services.normalization import (
+    normalize_records,
+    parse_frame_of_reference,
+    wants_normalization,
+)
+from services.partitioning import ensure_tenant_partition, kind_group
+from services.schema_service import kind_label, validate_record, validate_data_against_schema
+from services.spatial_service import remove_locations, sync_locations
+from services.serialization import RawJSON
+from services.tracing import kinds_attribute, traced
 
 logger = logging.getLogger(__name__)
 
+# "sql": Postgres builds the response JSON and the bytes are returned untouched.
+# "python": rows are assembled in Python with the JSONB text spliced in.
+RECORD_READ_MODE = os.getenv("OSDU_RECORD_READ_MODE", "sql").lower()
+
+# Kind catalogue per tenant (None = all tenants). kind_stats is updated in the
+# writing transaction, so the TTL is the only staleness.
+KINDS_CACHE_TTL = float(os.getenv("OSDU_KINDS_CACHE_TTL", "15"))
+_kinds_cache = LRUCache(maxsize=64, ttl=KINDS_CACHE_TTL)
+
+def _as_json(value):
+    """
+    Decodes a JSON column that the driver returned as text; dicts pass through.
+    """
+    return json.loads(value) if isinstance(value, str) else value
+
+# -------------------- SQL-built JSON --------------------
+
+def _record_json_sql(include_deleted_flag: bool = False) -> str:
+    extra = ", 'osdu_deleted', r.osdu_deleted" if include_deleted_flag else ""
+    return f"""json_build_object(
+                'id', r.id, 'kind', r.kind, 'acl', r.acl, 'legal', r.legal, 'data', r.data,
+                'version', r.version, 'createUser', r.create_user, 'createTime', r.create_time,
+                'modifyUser', r.modify_user, 'modifyTime', r.modify_time{extra}
+            )"""
+
+def _fetch_records_json(record_ids: List[str], tenant_id: str, deleted_filter: str = "",
+                        include_deleted_flag: bool = False, envelope: Optional[Dict] = None) -> bytes:
+    """
+    Returns the {"records": [...], "missingRecordIds": [...]} response as JSON
+    bytes built entirely by Postgres (json_build_object / json_agg), so no
+    per-record Python work is needed. `envelope` adds leading scalar fields.
+    """
+    envelope_sql, envelope_params = "", []
+    for key, value in (envelope or {}).items():
+        envelope_sql += "%s, %s, "
+        envelope_params += [key, value]
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            WITH requested AS (
+                SELECT DISTINCT unnest(%s::text[]) AS id
+            ), found AS (
+                SELECT r.id, {_record_json_sql(include_deleted_flag)} AS doc
+                FROM records r
+                WHERE r.data_partition_id = %s AND r.id = ANY(%s::text[]) {deleted_filter}
+            )
+            SELECT json_build_object(
+                {envelope_sql}
+                'records', COALESCE((SELECT json_agg(doc) FROM found), '[]'::json),
+                'missingRecordIds', COALESCE((
+                    SELECT json_agg(q.id) FROM requested q
+                    WHERE NOT EXISTS (SELECT 1 FROM found f WHERE f.id = q.id)
+                ), '[]'::json)
+            )::text
+        """, [record_ids, tenant_id, record_ids] + envelope_params)
+        return cur.fetchone()[0].encode("utf-8")
+    finally:
+        cur.close()
+
 # -------------------- Ingestion --------------------
 
-def ingest_records(records: List[Dict]) -> Dict:
+@timed("record_service.ingest_records")
+@traced("record_service.ingest_records", lambda records, tenant_id: {
+    "osdu.data_partition_id": tenant_id, "osdu.record.count": len(records), "osdu.kinds": kinds_attribute(records)})
+def ingest_records(records: List[Dict], tenant_id: str) -> Dict:
+    ensure_tenant_partition(tenant_id)
     conn = get_conn()
     ingested_ids, record_errors = [], []
 
@@ -25,40 +99,46 @@ def ingest_records(records: List[Dict]) -> Dict:
             validate_record(record)
             now = datetime.utcnow()
             cur = conn.cursor()
-            cur.execute("SELECT version, data FROM records WHERE id = %s", (record["id"],))
+            cur.execute("SELECT version, data FROM records WHERE data_partition_id = %s AND id = %s",
+                        (tenant_id, record["id"]))
             existing = cur.fetchone()
 
             if existing:
                 current_version, existing_data = existing
-                if isinstance(existing_data, str):
-                    existing_data = json.loads(existing_data)
+                existing_data = _as_json(existing_data)
                 if isinstance(existing_data, dict) and existing_data.get("osdu_deleted"):
                     existing_data.pop("osdu_deleted", None)
                     existing_data.pop("osdu_deleted_at", None)
 
                 new_version = current_version + 1
+                change = (record["id"], record["kind"], "update", new_version)
                 cur.execute("""
                     UPDATE records
-                    SET kind = %s, legal = %s, acl = %s, data = %s,
+                    SET kind = %s, kind_group = %s, legal = %s, acl = %s, data = %s,
                         version = %s, modify_user = %s, modify_time = %s
-                    WHERE id = %s
+                    WHERE data_partition_id = %s AND id = %s
                 """, (
                     record["kind"],
+                    kind_group(record["kind"]),
                     json.dumps(record["legal"]),
                     json.dumps(record["acl"]),
                     json.dumps(record["data"]),
                     new_version,
                     "system",
                     now,
+                    tenant_id,
                     record["id"]
                 ))
             else:
+                change = (record["id"], record["kind"], "create", 1)
                 cur.execute("""
                     INSERT INTO records (
-                        id, kind, legal, acl, data, version,
+                        data_partition_id, kind_group, id, kind, legal, acl, data, version,
                         create_user, create_time, modify_user, modify_time
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 """, (
+                    tenant_id,
+                    kind_group(record["kind"]),
                     record["id"],
                     record["kind"],
                     json.dumps(record["legal"]),
@@ -71,12 +151,17 @@ def ingest_records(records: List[Dict]) -> Dict:
                     now
                 ))
 
+            sync_locations(cur, tenant_id, [(record["id"], record["kind"], record["data"])])
+            append_changes(cur, tenant_id, [change])
             conn.commit()
             ingested_ids.append(record["id"])
+            RECORDS_INGESTED.inc(record["kind"], change[2])
 
         except Exception as e:
             if conn:
                 conn.rollback()
+            RECORDS_REJECTED.inc(kind_label(record.get("kind")),
+                                 "validation" if isinstance(e, ValueError) else "db_error")
             logger.exception(f"Failed to ingest record {record_id}")
             record_errors.append({
                 "id": record_id,
@@ -102,41 +187,49 @@ def ingest_records(records: List[Dict]) -> Dict:
 
 # -------------------- Retrieval --------------------
 
-def get_records_by_ids(record_ids: List[str], include_deleted: bool = False) -> Dict:
+@timed("record_service.get_records_by_ids")
+def get_records_by_ids(record_ids: List[str], tenant_id: str, include_deleted: bool = False) -> Union[Dict, bytes]:
+    if RECORD_READ_MODE == "sql":
+        try:
+            deleted_filter = "" if include_deleted else "AND COALESCE(r.data->>'osdu_deleted' = 'true', FALSE) = FALSE"
+            return _fetch_records_json(record_ids, tenant_id, deleted_filter)
+        except Exception as e:
+            logger.exception("Unhandled exception in get_records_by_ids")
+            raise HTTPException(status_code=500, detail=str(e))
+
     conn = get_conn()
     cur = conn.cursor()
     try:
+        # JSONB columns come back as text and are spliced into the response as-is
         cur.execute("""
-            SELECT id, kind, legal, acl, data, version,
-                   create_user, create_time, modify_user, modify_time
+            SELECT id, kind, legal::text, acl::text, data::text, version,
+                   create_user, create_time, modify_user, modify_time,
+                   COALESCE(data->>'osdu_deleted' = 'true', FALSE)
             FROM records
-            WHERE id = ANY(%s)
-        """, (record_ids,))
+            WHERE data_partition_id = %s AND id = ANY(%s)
+        """, (tenant_id, record_ids))
         rows = cur.fetchall()
 
         found_records = []
         missing_ids = set(record_ids)
 
         for row in rows:
-            rec_id, kind, legal, acl, data, version, create_user, create_time, modify_user, modify_time = row
-            legal = json.loads(legal) if isinstance(legal, str) else legal
-            acl = json.loads(acl) if isinstance(acl, str) else acl
-            data = json.loads(data) if isinstance(data, str) else data
+            rec_id, kind, legal, acl, data, version, create_user, create_time, modify_user, modify_time, data_deleted = row
 
-            if data.get("osdu_deleted") and not include_deleted:
+            if data_deleted and not include_deleted:
                 continue
 
             record = {
                 "id": rec_id,
                 "kind": kind,
-                "acl": acl,
-                "legal": legal,
-                "data": data,
+                "acl": RawJSON(acl),
+                "legal": RawJSON(legal),
+                "data": RawJSON(data),
                 "version": version,
                 "createUser": create_user,
-                "createTime": create_time.isoformat() if create_time else None,
+                "createTime": create_time,
                 "modifyUser": modify_user,
-                "modifyTime": modify_time.isoformat() if modify_time else None
+                "modifyTime": modify_time
             }
             found_records.append(record)
             missing_ids.discard(rec_id)
@@ -158,7 +251,8 @@ def get_records_by_ids(record_ids: List[str], include_deleted: bool = False) ->
 # record, validates against schema, and updates the DB with a new version.
 # ------------------------------------------------------------------------------
 
-def patch_record(record_id, payload):
+@timed("record_service.patch_record")
+def patch_record(record_id, tenant_id, payload):
     conn = get_conn()
     cur = conn.cursor()
     try:
@@ -166,8 +260,8 @@ def patch_record(record_id, payload):
         cur.execute("""
             SELECT kind, legal, acl, data, version, osdu_deleted
             FROM records
-            WHERE id = %s
-        """, (record_id,))
+            WHERE data_partition_id = %s AND id = %s
+        """, (tenant_id, record_id))
         row = cur.fetchone()
 
         if not row:
@@ -176,12 +270,7 @@ def patch_record(record_id, payload):
         kind, legal, acl, data, version, osdu_deleted = row
 
         # Ensure JSON types
-        if isinstance(legal, str):
-            legal = json.loads(legal)
-        if isinstance(acl, str):
-            acl = json.loads(acl)
-        if isinstance(data, str):
-            data = json.loads(data)
+        legal, acl, data = _as_json(legal), _as_json(acl), _as_json(data)
 
         if osdu_deleted:
             return ({
@@ -213,23 +302,28 @@ def patch_record(record_id, payload):
         cur.execute("""
             UPDATE records
             SET kind = %s,
+                kind_group = %s,
                 legal = %s,
                 acl = %s,
                 data = %s,
                 version = %s,
                 modify_user = %s,
                 modify_time = %s
-            WHERE id = %s
+            WHERE data_partition_id = %s AND id = %s
         """, (
             kind,
+            kind_group(kind),
             json.dumps(legal),
             json.dumps(acl),
             json.dumps(data),
             new_version,
             "system",
             now,
+            tenant_id,
             record_id
         ))
+        sync_locations(cur, tenant_id, [(record_id, kind, data)])
+        append_changes(cur, tenant_id, [(record_id, kind, "update", new_version)])
         conn.commit()
 
         return ({
@@ -244,12 +338,16 @@ def patch_record(record_id, payload):
         return ({"error": "Internal server error", "details": str(e)}), 500
     finally:
         cur.close()
-def ingest_records_batch(records: List[Dict]) -> Dict:
+@timed("record_service.ingest_records_batch")
+@traced("record_service.ingest_records_batch", lambda records, tenant_id: {
+    "osdu.data_partition_id": tenant_id, "osdu.record.count": len(records), "osdu.kinds": kinds_attribute(records)})
+def ingest_records_batch(records: List[Dict], tenant_id: str) -> Dict:
     """
     Handles ingestion of multiple records in one request.
     Validates required fields, checks schema compliance,
     and inserts or updates records with versioning.
     """
+    ensure_tenant_partition(tenant_id)
     conn = get_conn()
     record_ids, record_errors = [], []
 
@@ -261,38 +359,46 @@ def ingest_records_batch(records: List[Dict]) -> Dict:
 
             now = datetime.utcnow()
             cur = conn.cursor()
-            cur.execute("SELECT version FROM records WHERE id = %s", (record["id"],))
+            cur.execute("SELECT version FROM records WHERE data_partition_id = %s AND id = %s",
+                        (tenant_id, record["id"]))
             existing = cur.fetchone()
 
             if existing:
                 new_version = existing[0] + 1
+                change = (record["id"], record["kind"], "update", new_version)
                 cur.execute("""
                     UPDATE records
                     SET kind = %s,
+                        kind_group = %s,
                         legal = %s,
                         acl = %s,
                         data = %s,
                         version = %s,
                         modify_user = %s,
                         modify_time = %s
-                    WHERE id = %s
+                    WHERE data_partition_id = %s AND id = %s
                 """, (
                     record["kind"],
+                    kind_group(record["kind"]),
                     json.dumps(record["legal"]),
                     json.dumps(record["acl"]),
                     json.dumps(record["data"]),
                     new_version,
                     "system",
                     now,
+                    tenant_id,
                     record["id"]
                 ))
             else:
+                change = (record["id"], record["kind"], "create", 1)
                 cur.execute("""
                     INSERT INTO records (
-                        id, kind, legal, acl, data, version,
+                        data_partition_id, kind_group, id, kind, legal, acl, data, version,
                         create_user, create_time, modify_user, modify_time
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 """, (
+                    tenant_id,
+                    kind_group(record["kind"]),
                     record["id"],
                     record["kind"],
                     json.dumps(record["legal"]),
@@ -305,12 +411,17 @@ def ingest_records_batch(records: List[Dict]) -> Dict:
                     now
                 ))
 
+            sync_locations(cur, tenant_id, [(record["id"], record["kind"], record["data"])])
+            append_changes(cur, tenant_id, [change])
             conn.commit()
             record_ids.append(record["id"])
+            RECORDS_INGESTED.inc(record["kind"], change[2])
 
         except Exception as e:
             if conn:
                 conn.rollback()
+            RECORDS_REJECTED.inc(kind_label(record.get("kind")),
+                                 "validation" if isinstance(e, ValueError) else "db_error")
             logger.exception(f"Failed to ingest record {record_id}")
             record_errors.append({
                 "id": record_id,
@@ -342,7 +453,8 @@ def ingest_records_batch(records: List[Dict]) -> Dict:
 # with successes and per-record errors.
 # ------------------------------------------------------------------------------
 
-def delete_records_bulk(ids):
+@timed("record_service.delete_records_bulk")
+def delete_records_bulk(ids, tenant_id):
     conn = get_conn()
     record_ids, record_errors = [], []
 
@@ -350,7 +462,8 @@ def delete_records_bulk(ids):
         cur = None
         try:
             cur = conn.cursor()
-            cur.execute("SELECT osdu_deleted FROM records WHERE id = %s", (rid,))
+            cur.execute("SELECT osdu_deleted FROM records WHERE data_partition_id = %s AND id = %s",
+                        (tenant_id, rid))
             row = cur.fetchone()
 
             if not row:
@@ -377,8 +490,12 @@ def delete_records_bulk(ids):
                         osdu_deleted_at = %s,
                         modify_user = %s,
                         modify_time = %s
-                    WHERE id = %s
-                """, (now, "system", now, rid))
+                    WHERE data_partition_id = %s AND id = %s
+                    RETURNING kind, version
+                """, (now, "system", now, tenant_id, rid))
+                kind, version = cur.fetchone()
+                remove_locations(cur, tenant_id, [rid])
+                append_changes(cur, tenant_id, [(rid, kind, "delete", version)])
                 conn.commit()
                 record_ids.append(rid)
 
@@ -400,17 +517,26 @@ def delete_records_bulk(ids):
         "recordErrors": record_errors
     }), 200
 
-def retrieve_records(ids, include_deleted=False, latest_only=True):
+@timed("record_service.retrieve_records")
+def retrieve_records(ids, tenant_id, include_deleted=False, latest_only=True):
+    if RECORD_READ_MODE == "sql":
+        try:
+            deleted_filter = "" if include_deleted else "AND r.osdu_deleted IS NOT TRUE"
+            return _fetch_records_json(ids, tenant_id, deleted_filter), 200
+        except Exception as e:
+            logger.exception("Unhandled exception in retrieve_records")
+            return ({"error": "Internal server error", "details": str(e)}), 500
+
     conn = get_conn()
     cur = conn.cursor()
     try:
         # For now, latest_only and version history are the same query
         cur.execute("""
-            SELECT id, kind, legal, acl, data, version,
+            SELECT id, kind, legal::text, acl::text, data::text, version,
                    create_user, create_time, modify_user, modify_time, osdu_deleted
             FROM records
-            WHERE id = ANY(%s)
-        """, (ids,))
+            WHERE data_partition_id = %s AND id = ANY(%s)
+        """, (tenant_id, ids))
         rows = cur.fetchall()
 
         found_records = []
@@ -419,14 +545,6 @@ def retrieve_records(ids, include_deleted=False, latest_only=True):
         for row in rows:
             rec_id, kind, legal, acl, data, version, create_user, create_time, modify_user, modify_time, osdu_deleted = row
 
-            # Ensure JSON types
-            if isinstance(legal, str):
-                legal = json.loads(legal)
-            if isinstance(acl, str):
-                acl = json.loads(acl)
-            if isinstance(data, str):
-                data = json.loads(data)
-
             # Skip soft-deleted unless explicitly requested
             if osdu_deleted and not include_deleted:
                 continue
@@ -434,14 +552,14 @@ def retrieve_records(ids, include_deleted=False, latest_only=True):
             record = {
                 "id": rec_id,
                 "kind": kind,
-                "acl": acl,
-                "legal": legal,
-                "data": data,
+                "acl": RawJSON(acl),
+                "legal": RawJSON(legal),
+                "data": RawJSON(data),
                 "version": version,
                 "createUser": create_user,
-                "createTime": create_time.isoformat() if create_time else None,
+                "createTime": create_time,
                 "modifyUser": modify_user,
-                "modifyTime": modify_time.isoformat() if modify_time else None
+                "modifyTime": modify_time
             }
             found_records.append(record)
             missing_ids.discard(rec_id)
@@ -459,7 +577,10 @@ def retrieve_records(ids, include_deleted=False, latest_only=True):
 
 # -------------------- Bulk Patch --------------------
 
-def patch_records_bulk(patches: List[Dict]) -> Dict:
+@timed("record_service.patch_records_bulk")
+@traced("record_service.patch_records_bulk", lambda patches, tenant_id: {
+    "osdu.data_partition_id": tenant_id, "osdu.record.count": len(patches)})
+def patch_records_bulk(patches: List[Dict], tenant_id: str) -> Dict:
     conn = get_conn()
     record_ids, record_errors = [], []
 
@@ -479,8 +600,8 @@ def patch_records_bulk(patches: List[Dict]) -> Dict:
             cur.execute("""
                 SELECT kind, legal, acl, data, version, osdu_deleted
                 FROM records
-                WHERE id = %s
-            """, (record_id,))
+                WHERE data_partition_id = %s AND id = %s
+            """, (tenant_id, record_id))
             row = cur.fetchone()
 
             if not row:
@@ -492,9 +613,7 @@ def patch_records_bulk(patches: List[Dict]) -> Dict:
                 continue
 
             kind, legal, acl, data, version, osdu_deleted = row
-            legal = json.loads(legal) if isinstance(legal, str) else legal
-            acl = json.loads(acl) if isinstance(acl, str) else acl
-            data = json.loads(data) if isinstance(data, str) else data
+            legal, acl, data = _as_json(legal), _as_json(acl), _as_json(data)
 
             if osdu_deleted:
                 record_errors.append({
@@ -535,23 +654,28 @@ def patch_records_bulk(patches: List[Dict]) -> Dict:
             cur.execute("""
                 UPDATE records
                 SET kind = %s,
+                    kind_group = %s,
                     legal = %s,
                     acl = %s,
                     data = %s,
                     version = %s,
                     modify_user = %s,
                     modify_time = %s
-                WHERE id = %s
+                WHERE data_partition_id = %s AND id = %s
             """, (
                 kind,
+                kind_group(kind),
                 json.dumps(legal),
                 json.dumps(acl),
                 json.dumps(data),
                 new_version,
                 "system",
                 now,
+                tenant_id,
                 record_id
             ))
+            sync_locations(cur, tenant_id, [(record_id, kind, data)])
+            append_changes(cur, tenant_id, [(record_id, kind, "update", new_version)])
             conn.commit()
             record_ids.append(record_id)
 
@@ -572,7 +696,8 @@ def patch_records_bulk(patches: List[Dict]) -> Dict:
         "recordIds": record_ids,
         "recordErrors": record_errors
     }
-def delete_record(record_id: str) -> dict:
+@timed("record_service.delete_record")
+def delete_record(record_id: str, tenant_id: str) -> dict:
     """
     Soft-deletes a record by ID.
     Adds osdu_deleted and osdu_deleted_at fields to the record's data.
@@ -584,17 +709,15 @@ def delete_record(record_id: str) -> dict:
         cur.execute("""
             SELECT id, data
             FROM records
-            WHERE id = %s
-        """, (record_id,))
+            WHERE data_partition_id = %s AND id = %s
+        """, (tenant_id, record_id))
         row = cur.fetchone()
 
         if not row:
             logger.info(f"Record {record_id} not found")
             raise HTTPException(status_code=404, detail="Record not found")
 
-        data = row[1]
-        if isinstance(data, str):
-            data = json.loads(data)
+        data = _as_json(row[1])
 
         # Mark as deleted
         data["osdu_deleted"] = True
@@ -602,10 +725,16 @@ def delete_record(record_id: str) -> dict:
 
         cur.execute("""
             UPDATE records
-            SET data = %s
-            WHERE id = %s
-        """, (json.dumps(data), record_id))
+            SET data = %s,
+                modify_user = %s,
+                modify_time = %s
+            WHERE data_partition_id = %s AND id = %s
+            RETURNING kind, version
+        """, (json.dumps(data), "system", datetime.utcnow(), tenant_id, record_id))
+        kind, version = cur.fetchone()
 
+        remove_locations(cur, tenant_id, [record_id])
+        append_changes(cur, tenant_id, [(record_id, kind, "delete", version)])
         conn.commit()
         logger.info(f"Record {record_id} soft-deleted successfully")
 
@@ -623,17 +752,18 @@ def delete_record(record_id: str) -> dict:
 
 # -------------------- Flattened Records --------------------
 
-def get_flattened_records(limit: int, offset: int) -> List[Dict]:
+def get_flattened_records(tenant_id: str, limit: int, offset: int) -> List[Dict]:
     query = """
         SELECT id, kind, data
         FROM records
+        WHERE data_partition_id = %s
         LIMIT %s OFFSET %s
     """
 
     try:
         conn = get_conn()
         with conn.cursor() as cur:
-            cur.execute(query, (limit, offset))
+            cur.execute(query, (tenant_id, limit, offset))
             rows = cur.fetchall()
 
         results = []
@@ -653,18 +783,18 @@ def get_flattened_records(limit: int, offset: int) -> List[Dict]:
         logger.error(f"Error in get_flattened_records: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-def get_flattened_records_by_kind(kind: str) -> List[Dict]:
+def get_flattened_records_by_kind(kind: str, tenant_id: str) -> List[Dict]:
     query = """
         SELECT id, kind, data
         FROM records
-        WHERE kind = %s
+        WHERE data_partition_id = %s AND kind_group = %s AND kind = %s
         LIMIT 100
     """
 
     try:
         conn = get_conn()
         with conn.cursor() as cur:
-            cur.execute(query, (kind,))
+            cur.execute(query, (tenant_id, kind_group(kind), kind))
             rows = cur.fetchall()
 
         results = []
@@ -684,6 +814,84 @@ def get_flattened_records_by_kind(kind: str) -> List[Dict]:
         logger.error(f"Error in get_flattened_records_by_kind: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def get_kind_stats(tenant_id: str, group: Optional[str] = None) -> List[Dict]:
+    """
+    Returns the trigger-maintained per-kind summary for a tenant (one row per
+    kind, no scan of records). Optionally limited to one kind group.
+    """
+    query = """
+        SELECT kind, kind_group, record_count, deleted_count, total_bytes, last_modified
+        FROM kind_stats
+        WHERE data_partition_id = %s AND record_count > 0
+    """
+    params = [tenant_id]
+    if group:
+        query += " AND kind_group = %s"
+        params.append(group)
+    query += " ORDER BY kind"
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(query, params)
+        return [
+            {
+                "kind": kind,
+                "kindGroup": group_name,
+                "recordCount": record_count,
+                "deletedCount": deleted_count,
+                "totalBytes": total_bytes,
+                "averageBytes": total_bytes // record_count,
+                "lastModified": last_modified
+            }
+            for kind, group_name, record_count, deleted_count, total_bytes, last_modified in cur.fetchall()
+        ]
+    finally:
+        cur.close()
+
+def list_record_kinds(tenant_id: Optional[str] = None) -> List[str]:
+    """
+    Returns the sorted kinds that have at least one live (not soft-deleted)
+    record, for one tenant or across all tenants. Reads kind_stats only and is
+    served from a short TTL cache.
+    """
+    kinds = _kinds_cache.get(tenant_id)
+    if kinds is not None:
+        return kinds
+
+    query = "SELECT DISTINCT kind FROM kind_stats WHERE record_count > deleted_count"
+    params = []
+    if tenant_id:
+        query += " AND data_partition_id = %s"
+        params.append(tenant_id)
+    query += " ORDER BY kind"
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(query, params)
+        kinds = [row[0] for row in cur.fetchall()]
+    finally:
+        cur.close()
+
+    _kinds_cache.set(tenant_id, kinds)
+    return kinds
+
+def get_record_stamp(record_id: str, tenant_id: str) -> Optional[tuple]:
+    """
+    Returns (version, modify_time) for a record without loading its documents.
+    Used to answer conditional GETs.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT version, modify_time FROM records WHERE data_partition_id = %s AND id = %s",
+                    (tenant_id, record_id))
+        return cur.fetchone()
+    finally:
+        cur.close()
+
+@timed("record_service.get_latest_record")
 def get_latest_record(record_id: str, tenant_id: str, attributes: Optional[List[str]] = None) -> dict:
     """
     Fetches the latest version of a record by ID.
@@ -696,8 +904,8 @@ def get_latest_record(record_id: str, tenant_id: str, attributes: Optional[List[
             SELECT id, kind, legal, acl, data, version,
                    create_user, create_time, modify_user, modify_time, osdu_deleted
             FROM records
-            WHERE id = %s
-        """, (record_id,))
+            WHERE data_partition_id = %s AND id = %s
+        """, (tenant_id, record_id))
         row = cur.fetchone()
 
         if not row:
@@ -707,9 +915,7 @@ def get_latest_record(record_id: str, tenant_id: str, attributes: Optional[List[
         rec_id, kind, legal, acl, data, version, create_user, create_time, modify_user, modify_time, osdu_deleted = row
 
         # Ensure JSON types
-        legal = json.loads(legal) if isinstance(legal, str) else legal
-        acl = json.loads(acl) if isinstance(acl, str) else acl
-        data = json.loads(data) if isinstance(data, str) else data
+        legal, acl, data = _as_json(legal), _as_json(acl), _as_json(data)
 
         # Apply attribute filtering if requested
         if attributes:
@@ -741,6 +947,7 @@ def get_latest_record(record_id: str, tenant_id: str, attributes: Optional[List[
     finally:
         cur.close()
 
+@timed("record_service.get_specific_record_version")
 def get_specific_record_version(record_id: str, version: int, tenant_id: str, attributes: Optional[List[str]] = None) -> dict:
     """
     Fetches a specific version of a record by ID and version number.
@@ -753,8 +960,8 @@ def get_specific_record_version(record_id: str, version: int, tenant_id: str, at
             SELECT id, kind, legal, acl, data, version,
                    create_user, create_time, modify_user, modify_time, osdu_deleted
             FROM records
-            WHERE id = %s AND version = %s
-        """, (record_id, version))
+            WHERE data_partition_id = %s AND id = %s AND version = %s
+        """, (tenant_id, record_id, version))
         row = cur.fetchone()
 
         if not row:
@@ -764,9 +971,7 @@ def get_specific_record_version(record_id: str, version: int, tenant_id: str, at
         rec_id, kind, legal, acl, data, version, create_user, create_time, modify_user, modify_time, osdu_deleted = row
 
         # Ensure JSON types
-        legal = json.loads(legal) if isinstance(legal, str) else legal
-        acl = json.loads(acl) if isinstance(acl, str) else acl
-        data = json.loads(data) if isinstance(data, str) else data
+        legal, acl, data = _as_json(legal), _as_json(acl), _as_json(data)
 
         # Apply attribute filtering if requested
         if attributes:
@@ -798,7 +1003,8 @@ def get_specific_record_version(record_id: str, version: int, tenant_id: str, at
     finally:
         cur.close()
 
-def soft_delete_single_record(record_id: str) -> dict:
+@timed("record_service.soft_delete_single_record")
+def soft_delete_single_record(record_id: str, tenant_id: str) -> dict:
     """
     Soft-deletes a single record by setting osdu_deleted=true and osdu_deleted_at timestamp.
     Returns status and record ID.
@@ -807,8 +1013,8 @@ def soft_delete_single_record(record_id: str) -> dict:
     cur = conn.cursor()
     try:
         cur.execute("""
-            SELECT osdu_deleted FROM records WHERE id = %s
-        """, (record_id,))
+            SELECT osdu_deleted FROM records WHERE data_partition_id = %s AND id = %s
+        """, (tenant_id, record_id))
         row = cur.fetchone()
 
         if not row:
@@ -827,8 +1033,12 @@ def soft_delete_single_record(record_id: str) -> dict:
                 osdu_deleted_at = %s,
                 modify_user = %s,
                 modify_time = %s
-            WHERE id = %s
-        """, (now, "system", now, record_id))
+            WHERE data_partition_id = %s AND id = %s
+            RETURNING kind, version
+        """, (now, "system", now, tenant_id, record_id))
+        kind, version = cur.fetchone()
+        remove_locations(cur, tenant_id, [record_id])
+        append_changes(cur, tenant_id, [(record_id, kind, "delete", version)])
         conn.commit()
 
         logger.info(f"Record {record_id} soft-deleted successfully")
@@ -843,11 +1053,14 @@ def soft_delete_single_record(record_id: str) -> dict:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     finally:
         cur.close()
-def copy_record_references(source_ns: str, target_ns: str, record_ids: List[str]) -> dict:
+@timed("record_service.copy_record_references")
+def copy_record_references(source_ns: str, target_ns: str, record_ids: List[str], tenant_id: str) -> dict:
     """
     Copies record references from source namespace to target namespace.
-    All-or-nothing transactional copy. Fails if any target record already exists.
+    All-or-nothing transactional copy within one data partition.
+    Fails if any target record already exists.
     """
+    ensure_tenant_partition(tenant_id)
     conn = get_conn()
     cur = conn.cursor()
     copied_ids, copy_errors = [], []
@@ -855,7 +1068,8 @@ def copy_record_references(source_ns: str, target_ns: str, record_ids: List[str]
     try:
         # Check for existing records in target namespace
         target_ids = [rid.replace(source_ns, target_ns, 1) for rid in record_ids]
-        cur.execute("SELECT id FROM records WHERE id = ANY(%s)", (target_ids,))
+        cur.execute("SELECT id FROM records WHERE data_partition_id = %s AND id = ANY(%s)",
+                    (tenant_id, target_ids))
         existing = {row[0] for row in cur.fetchall()}
 
         if existing:
@@ -867,7 +1081,10 @@ def copy_record_references(source_ns: str, target_ns: str, record_ids: List[str]
             })
 
         # Fetch source records
-        cur.execute("SELECT id, kind, legal, acl, data, version FROM records WHERE id = ANY(%s)", (record_ids,))
+        cur.execute("""
+            SELECT id, kind, legal, acl, data, version FROM records
+            WHERE data_partition_id = %s AND id = ANY(%s)
+        """, (tenant_id, record_ids))
         rows = cur.fetchall()
 
         if len(rows) != len(record_ids):
@@ -880,16 +1097,19 @@ def copy_record_references(source_ns: str, target_ns: str, record_ids: List[str]
             })
 
         now = datetime.utcnow()
+        changes, located = [], []
         for row in rows:
             src_id, kind, legal, acl, data, version = row
             tgt_id = src_id.replace(source_ns, target_ns, 1)
 
             cur.execute("""
                 INSERT INTO records (
-                    id, kind, legal, acl, data, version,
+                    data_partition_id, kind_group, id, kind, legal, acl, data, version,
                     create_user, create_time, modify_user, modify_time
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (
+                tenant_id,
+                kind_group(kind),
                 tgt_id,
                 kind,
                 legal,
@@ -902,7 +1122,11 @@ def copy_record_references(source_ns: str, target_ns: str, record_ids: List[str]
                 now
             ))
             copied_ids.append(tgt_id)
+            changes.append((tgt_id, kind, "create", version))
+            located.append((tgt_id, kind, _as_json(data)))
 
+        sync_locations(cur, tenant_id, located)
+        append_changes(cur, tenant_id, changes)
         conn.commit()
         logger.info(f"Copied {len(copied_ids)} records from {source_ns} to {target_ns}")
         return {
@@ -921,20 +1145,41 @@ def copy_record_references(source_ns: str, target_ns: str, record_ids: List[str]
     finally:
         cur.close()
 
-def fetch_normalized_records(record_ids: List[str], frame_of_reference: str) -> dict:
+@timed("record_service.fetch_normalized_records")
+@traced("record_service.fetch_normalized_records", lambda record_ids, tenant_id, frame_of_reference: {
+    "osdu.data_partition_id": tenant_id, "osdu.record.count": len(record_ids),
+    "osdu.frame_of_reference": frame_of_reference})
+def fetch_normalized_records(record_ids: List[str], tenant_id: str, frame_of_reference: str) -> Union[dict, bytes]:
     """
-    Fetches multiple records and applies normalization context.
-    Currently returns raw records with frame-of-reference echoed for future normalization logic.
+    Fetches multiple records and normalizes them to the frame of reference.
+    With `units` / `crs` entries, measured values and geometries in the
+    records' data are converted (services/normalization.py) and a per-record
+    conversionStatuses list is returned; otherwise the records are returned
+    unchanged.
     """
+    try:
+        frame = parse_frame_of_reference(frame_of_reference)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    normalize = wants_normalization(frame)
+
+    if not normalize and RECORD_READ_MODE == "sql":
+        try:
+            return _fetch_records_json(record_ids, tenant_id, include_deleted_flag=True,
+                                       envelope={"frameOfReference": frame_of_reference})
+        except Exception as e:
+            logger.exception("Unhandled exception in fetch_normalized_records")
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
     conn = get_conn()
     cur = conn.cursor()
     try:
         cur.execute("""
-            SELECT id, kind, legal, acl, data, version,
+            SELECT id, kind, legal::text, acl::text, data::text, version,
                    create_user, create_time, modify_user, modify_time, osdu_deleted
             FROM records
-            WHERE id = ANY(%s)
-        """, (record_ids,))
+            WHERE data_partition_id = %s AND id = ANY(%s)
+        """, (tenant_id, record_ids))
         rows = cur.fetchall()
 
         found_records = []
@@ -943,33 +1188,36 @@ def fetch_normalized_records(record_ids: List[str], frame_of_reference: str) ->
         for row in rows:
             rec_id, kind, legal, acl, data, version, create_user, create_time, modify_user, modify_time, osdu_deleted = row
 
-            legal = json.loads(legal) if isinstance(legal, str) else legal
-            acl = json.loads(acl) if isinstance(acl, str) else acl
-            data = json.loads(data) if isinstance(data, str) else data
-
             record = {
                 "id": rec_id,
                 "kind": kind,
-                "acl": acl,
-                "legal": legal,
-                "data": data,
+                "acl": RawJSON(acl),
+                "legal": RawJSON(legal),
+                # decoded only when its values have to be converted
+                "data": _as_json(data) if normalize else RawJSON(data),
                 "version": version,
                 "createUser": create_user,
-                "createTime": create_time.isoformat() if create_time else None,
+                "createTime": create_time,
                 "modifyUser": modify_user,
-                "modifyTime": modify_time.isoformat() if modify_time else None,
+                "modifyTime": modify_time,
                 "osdu_deleted": osdu_deleted
             }
             found_records.append(record)
             missing_ids.discard(rec_id)
 
-        return {
+        response = {
             "frameOfReference": frame_of_reference,
             "records": found_records,
             "missingRecordIds": list(missing_ids)
         }
+        if normalize:
+            response["conversionStatuses"] = normalize_records(found_records, frame, tenant_id)
+        return response
 
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
+        conn.rollback()
         logger.exception("Unhandled exception in fetch_normalized_records")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     finally:
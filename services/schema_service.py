@@ -1,23 +1,68 @@
 import json
 import logging
 from datetime import datetime
-from typing import List, Dict
-from jsonschema import validate, ValidationError
+from typing import Callable, List, Dict
+from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+from psycopg2.extras import execute_values
 from db import get_conn
+from services.cache import LRUCache
+from services.metrics import RECORDS_VALIDATED
+from services.tracing import set_attributes, span, traced
 from backend.resolve_schema_refs import fetch_and_resolve as external_resolve
 
 logger = logging.getLogger(__name__)
 
-# -------------------- Registration --------------------
+# Compiled validators keyed by kind. Cleared whenever schemas are registered
+# (a resolved schema can pull in any other kind); the TTL bounds staleness in other workers.
+_validator_cache = LRUCache(maxsize=512, ttl=300)
 
-def register_schema(schema: dict) -> str:
-    schema_id = schema.get("id")
-    kind = schema.get("kind")
-    if not schema_id or not kind:
-        raise ValueError("Schema must include both 'id' and 'kind' fields")
+# Called with the registered kinds after register_schemas commits, so caches
+# derived from schemas (e.g. services/normalization_plans.py) can drop entries.
+_schema_change_listeners: List[Callable[[List[str]], None]] = []
 
-    status = schema.get("status") or schema.get("schemaInfo", {}).get("status") or "PUBLISHED"
+def on_schema_change(listener: Callable[[List[str]], None]):
+    _schema_change_listeners.append(listener)
+    return listener
 
+# -------------------- Registration --------------------
+
+_UPSERT_SCHEMA_SQL = """
+    INSERT INTO schema_registry (
+        id, kind, status, version, schema,
+        created_time, modify_time,
+        authority, source, entity_type,
+        version_major, version_minor, version_patch,
+        class
+    )
+    VALUES %s
+    ON CONFLICT (id) DO UPDATE
+    SET kind = EXCLUDED.kind,
+        status = EXCLUDED.status,
+        version = EXCLUDED.version,
+        schema = EXCLUDED.schema,
+        modify_time = now(),
+        authority = EXCLUDED.authority,
+        source = EXCLUDED.source,
+        entity_type = EXCLUDED.entity_type,
+        version_major = EXCLUDED.version_major,
+        version_minor = EXCLUDED.version_minor,
+        version_patch = EXCLUDED.version_patch,
+        class = EXCLUDED.class
+"""
+
+_UPSERT_SCHEMA_TEMPLATE = """(%s, %s, %s, %s, %s,
+    now(), now(),
+    %s, %s, %s,
+    %s, %s, %s,
+    %s)"""
+
+def _parse_kind(kind: str) -> tuple:
+    """
+    Splits a kind into (authority, source, entity_type, version_major,
+    version_minor, version_patch, version) for the schema_registry columns.
+    """
     try:
         parts = kind.split(":")
         authority = parts[0] if len(parts) > 0 else "unknown"
@@ -41,54 +86,66 @@ def register_schema(schema: dict) -> str:
         version_major, version_minor, version_patch = 1, 0, 0
         version = "1.0.0"
 
-    class_name = schema.get("class")
+    return authority, source, entity_type, version_major, version_minor, version_patch, version
+
+def _schema_row(schema: dict) -> tuple:
+    schema_id = schema.get("id")
+    kind = schema.get("kind")
+    if not schema_id or not kind:
+        raise ValueError("Schema must include both 'id' and 'kind' fields")
+
+    status = schema.get("status") or schema.get("schemaInfo", {}).get("status") or "PUBLISHED"
+    authority, source, entity_type, version_major, version_minor, version_patch, version = _parse_kind(kind)
+
+    return (
+        schema_id, kind, status, version, json.dumps(schema),
+        authority, source, entity_type,
+        version_major, version_minor, version_patch,
+        schema.get("class")
+    )
+
+def register_schema(schema: dict) -> str:
+    return register_schemas([schema])[0]
+
+def register_schemas(schemas: List[dict]) -> List[str]:
+    """
+    Upserts many schemas with a single multi-row INSERT ... ON CONFLICT in one
+    transaction. Either every schema is stored or none is.
+    """
+    # A multi-row upsert may not touch the same id twice; last one wins.
+    rows = list({row[0]: row for row in map(_schema_row, schemas)}.values())
+    if not rows:
+        return []
 
     conn = get_conn()
     cur = conn.cursor()
     try:
-        cur.execute("""
-            INSERT INTO schema_registry (
-                id, kind, status, version, schema,
-                created_time, modify_time,
-                authority, source, entity_type,
-                version_major, version_minor, version_patch,
-                class
-            )
-            VALUES (%s, %s, %s, %s, %s,
-                    now(), now(),
-                    %s, %s, %s,
-                    %s, %s, %s,
-                    %s)
-            ON CONFLICT (id) DO UPDATE
-            SET kind = EXCLUDED.kind,
-                status = EXCLUDED.status,
-                version = EXCLUDED.version,
-                schema = EXCLUDED.schema,
-                modify_time = now(),
-                authority = EXCLUDED.authority,
-                source = EXCLUDED.source,
-                entity_type = EXCLUDED.entity_type,
-                version_major = EXCLUDED.version_major,
-                version_minor = EXCLUDED.version_minor,
-                version_patch = EXCLUDED.version_patch,
-                class = EXCLUDED.class
-        """, (
-            schema_id, kind, status, version, json.dumps(schema),
-            authority, source, entity_type,
-            version_major, version_minor, version_patch,
-            class_name
-        ))
+        execute_values(cur, _UPSERT_SCHEMA_SQL, rows, template=_UPSERT_SCHEMA_TEMPLATE, page_size=len(rows))
         conn.commit()
-        return schema_id
     except Exception as e:
         conn.rollback()
-        logger.exception(f"❌ SQL error while registering schema {schema_id}: {e}")
+        logger.exception(f"❌ SQL error while registering {len(rows)} schema(s): {e}")
         raise
     finally:
         cur.close()
 
+    # Best effort: the schemas are stored; field lists are recomputed lazily on failure.
+    kinds = [row[1] for row in rows]
+    try:
+        refreshed = refresh_flattened_fields(kinds)
+        logger.info(f"🧮 Precomputed flattened fields for {refreshed} kind(s)")
+    except Exception as e:
+        logger.warning(f"⚠️ Flattened field precomputation failed: {e}")
+    for listener in _schema_change_listeners:
+        try:
+            listener(kinds)
+        except Exception as e:
+            logger.warning(f"⚠️ Schema change listener {getattr(listener, '__name__', listener)} failed: {e}")
+    return [row[0] for row in rows]
+
 # -------------------- Retrieval --------------------
 
+@traced("schema_service.get_schema_by_kind", lambda kind: {"osdu.kind": kind})
 def get_schema_by_kind(kind: str):
     conn = get_conn()
     cur = conn.cursor()
@@ -119,14 +176,105 @@ def get_schema_by_id(schema_id: str):
     finally:
         cur.close()
 
+def get_schema_stamp(schema_id: str = None, kind: str = None):
+    """
+    Returns modify_time for a schema (by id or kind) without loading the document.
+    """
+    column, value = ("id", schema_id) if schema_id is not None else ("kind", kind)
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT modify_time FROM schema_registry WHERE {column} = %s LIMIT 1", (value,))
+        row = cur.fetchone()
+        return row[0] if row else None
+    finally:
+        cur.close()
+
+def get_schema_with_stamp(schema_id: str = None, kind: str = None):
+    """
+    Returns (schema, modify_time) for a schema by id or kind, or None.
+    """
+    column, value = ("id", schema_id) if schema_id is not None else ("kind", kind)
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT schema, modify_time FROM schema_registry WHERE {column} = %s LIMIT 1", (value,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        definition, modify_time = row
+        if isinstance(definition, str):
+            definition = json.loads(definition)
+        return definition, modify_time
+    finally:
+        cur.close()
+
+def get_schemas_by_kinds(kinds: List[str]) -> Dict[str, dict]:
+    """
+    Looks up the registered schemas for many kinds in one query.
+    Kinds without a registered schema are absent from the result.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT kind, schema FROM schema_registry WHERE kind = ANY(%s)", (list(kinds),))
+        schemas = {}
+        for kind, definition in cur.fetchall():
+            if isinstance(definition, str):
+                definition = json.loads(definition)
+            schemas[kind] = definition
+        return schemas
+    finally:
+        cur.close()
+
+@traced("schema_service.resolve_schema", lambda kind: {"osdu.kind": kind})
 def resolve_schema(kind: str) -> dict:
     schema = get_schema_by_kind(kind)
     if schema:
         return schema
-    return external_resolve(kind)
+    with span("schema_service.fetch_and_resolve", {"osdu.kind": kind}):
+        return external_resolve(kind)
 
 # -------------------- Validation --------------------
 
+def build_validator(schema: dict):
+    """
+    Checks a schema once and returns a reusable validator instance for it.
+    """
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+def get_validator(kind: str):
+    validator = _validator_cache.get(kind)
+    set_attributes({"osdu.validator.cached": validator is not None})
+    if validator is None:
+        validator = build_validator(resolve_schema(kind))
+        _validator_cache.set(kind, validator)
+    return validator
+
+@on_schema_change
+def _drop_validators(kinds: List[str]):
+    _validator_cache.clear()
+
+def kind_label(kind) -> str:
+    """
+    `kind` as a metric label. Only kinds with a registered schema (a cached
+    validator) keep their name; anything else is "<unknown>", so arbitrary
+    client-supplied kinds cannot grow the label set.
+    """
+    return kind if isinstance(kind, str) and _validator_cache.get(kind) is not None else "<unknown>"
+
+def check_instance(validator, instance):
+    """
+    Raises the most relevant ValidationError, as jsonschema.validate() does.
+    """
+    error = best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
+@traced("schema_service.validate_record",
+        lambda record: {"osdu.record.id": str(record.get("id")), "osdu.kind": str(record.get("kind"))})
 def validate_record(record: dict):
     record_id = record.get("id", "<missing>")
     logger.info(f"🔍 Validating record: {record_id}")
@@ -137,21 +285,26 @@ def validate_record(record: dict):
             logger.error(f"❌ Record {record_id} missing required field: {field}")
             raise ValueError(f"Missing required field: {field}")
 
-    schema = resolve_schema(record["kind"])
+    validator = get_validator(record["kind"])
     try:
-        validate(instance=record["data"], schema=schema)
+        check_instance(validator, record["data"])
+        RECORDS_VALIDATED.inc(record["kind"], "valid")
         logger.info(f"✅ Record {record_id} passed schema validation")
     except ValidationError as ve:
+        RECORDS_VALIDATED.inc(record["kind"], "invalid")
         logger.error(f"❌ Record {record_id} failed schema validation: {ve.message}")
         raise ValueError(f"Schema validation failed: {ve.message}")
 
+@traced("schema_service.validate_data_against_schema", lambda kind, data: {"osdu.kind": kind})
 def validate_data_against_schema(kind: str, data: dict):
     logger.info(f"🔍 Validating data against schema for kind: {kind}")
-    schema = resolve_schema(kind)
+    validator = get_validator(kind)
     try:
-        validate(instance=data, schema=schema)
+        check_instance(validator, data)
+        RECORDS_VALIDATED.inc(kind, "valid")
         logger.info(f"✅ Data passed schema validation for kind: {kind}")
     except ValidationError as ve:
+        RECORDS_VALIDATED.inc(kind, "invalid")
         logger.error(f"❌ Schema validation failed for kind {kind}: {ve.message}")
         raise ValueError(ve.message)
 
@@ -184,29 +337,78 @@ def get_registered_field_types(kind: str) -> List[Dict[str, str]]:
             for field, field_def in sorted(data_fields.items())
         ]
 
-def get_flattened_data_fields(kind: str) -> List[Dict[str, str]]:
+# Flattened field lists keyed by kind. Backed by schema_flattened_fields, which is
+# refreshed on registration; the TTL bounds staleness in other worker processes.
+_flattened_cache = LRUCache(maxsize=512, ttl=300)
+
+_UPSERT_FLATTENED_SQL = """
+    INSERT INTO schema_flattened_fields (kind, fields, depends_on, computed_at)
+    VALUES %s
+    ON CONFLICT (kind) DO UPDATE SET
+        fields = EXCLUDED.fields,
+        depends_on = EXCLUDED.depends_on,
+        computed_at = EXCLUDED.computed_at
+"""
+
+def _relationship_kind(attrs: Dict) -> str:
+    rel = attrs["x-osdu-relationship"][0]
+    return f"osdu:wks:reference-data--{rel['EntityType']}:1.0.0"
+
+def _collect_ref_kinds(node, found: set):
+    """
+    Collects every kind a schema body can point the flattener at.
+    """
+    if isinstance(node, dict):
+        if "x-osdu-relationship" in node:
+            try:
+                found.add(_relationship_kind(node))
+            except Exception:
+                pass
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("osdu:wks:"):
+            found.add(ref)
+        for value in node.values():
+            _collect_ref_kinds(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_ref_kinds(value, found)
+
+def load_schema_closure(kinds) -> Dict[str, Dict]:
+    """
+    Loads schema->'schema' for the given kinds and everything they reference,
+    one query per level of references. Unregistered kinds map to {}.
+    """
+    schemas = {}
+    pending = set(kinds)
+    conn = get_conn()
+    with conn.cursor() as cur:
+        while pending:
+            cur.execute("""
+                SELECT kind, schema->'schema' FROM schema_registry
+                WHERE kind = ANY(%s)
+            """, (list(pending),))
+            found = dict(cur.fetchall())
+            referenced = set()
+            for kind in pending:
+                body = found.get(kind) or {}
+                if isinstance(body, str):
+                    body = json.loads(body)
+                schemas[kind] = body
+                _collect_ref_kinds(body, referenced)
+            pending = referenced - schemas.keys()
+    return schemas
+
+def _flatten_kind(kind: str, schemas: Dict[str, Dict]):
     """
     Recursively flattens all fields from schema_registry.schema->'schema'->'properties'->'data'.
     Handles nested objects, arrays, relationships, and $ref targets.
+    Returns (fields, depends_on) where depends_on lists every kind that was looked up.
     """
-    conn = get_conn()
-    resolved_cache = {}
+    depends_on = set()
 
-    def fetch_schema(kind: str) -> Dict:
-        if kind in resolved_cache:
-            return resolved_cache[kind]
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT schema->'schema' FROM schema_registry
-                WHERE kind = %s
-                LIMIT 1
-            """, (kind,))
-            row = cur.fetchone()
-            if not row:
-                return {}
-            schema_def = row[0]
-            resolved_cache[kind] = schema_def
-            return schema_def
+    def fetch_schema(ref_kind: str) -> Dict:
+        depends_on.add(ref_kind)
+        return schemas.get(ref_kind) or {}
 
     flattened = []
 
@@ -235,9 +437,7 @@ def get_flattened_data_fields(kind: str) -> List[Dict[str, str]]:
             # 🔗 Relationship resolution
             if "x-osdu-relationship" in attrs:
                 try:
-                    rel = attrs["x-osdu-relationship"][0]
-                    ref_kind = f"osdu:wks:reference-data--{rel['EntityType']}:1.0.0"
-                    ref_schema = fetch_schema(ref_kind)
+                    ref_schema = fetch_schema(_relationship_kind(attrs))
                     ref_props = ref_schema.get("properties", {}).get("data", {}).get("properties", {})
                     for subfield, subattrs in ref_props.items():
                         sub = {"field": f"{full_path}.{subfield}"}
@@ -252,15 +452,13 @@ def get_flattened_data_fields(kind: str) -> List[Dict[str, str]]:
                 try:
                     ref_id = attrs["$ref"]
                     if ref_id.startswith("osdu:wks:"):
-                        ref_kind = ref_id
-                        ref_schema = fetch_schema(ref_kind)
+                        ref_schema = fetch_schema(ref_id)
                         ref_props = ref_schema.get("properties", {})
                         flatten_properties(ref_props, path=f"{full_path}.")
                 except Exception as e:
                     logger.warning(f"⚠️ Failed to resolve $ref for {full_path}: {e}")
 
-    # Load main schema
-    main_schema = fetch_schema(kind)
+    main_schema = schemas.get(kind) or {}
 
     # Handle data.allOf blocks
     data_allof = main_schema.get("properties", {}).get("data", {}).get("allOf", [])
@@ -273,4 +471,96 @@ def get_flattened_data_fields(kind: str) -> List[Dict[str, str]]:
     if direct_props:
         flatten_properties(direct_props)
 
-    return flattened
\ No newline at end of file
+    depends_on.discard(kind)
+    return flattened, sorted(depends_on)
+
+def compute_flattened_data_fields(kinds: List[str]) -> Dict[str, tuple]:
+    """
+    Flattens many kinds against one shared schema closure.
+    Returns {kind: (fields, depends_on)}.
+    """
+    schemas = load_schema_closure(kinds)
+    return {kind: _flatten_kind(kind, schemas) for kind in kinds}
+
+def _store_flattened_fields(cur, results: Dict[str, tuple]):
+    now = datetime.utcnow()
+    rows = [(kind, json.dumps(fields), depends_on, now) for kind, (fields, depends_on) in results.items()]
+    execute_values(cur, _UPSERT_FLATTENED_SQL, rows, page_size=500)
+
+def refresh_flattened_fields(kinds: List[str]) -> int:
+    """
+    Recomputes the stored field lists for the given kinds and for every kind whose
+    flattening looked any of them up. Returns the number of kinds refreshed.
+    """
+    kinds = list(dict.fromkeys(kinds))
+    if not kinds:
+        return 0
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            DELETE FROM schema_flattened_fields
+            WHERE kind = ANY(%s) OR depends_on && %s::text[]
+            RETURNING kind
+        """, (kinds, kinds))
+        targets = list(dict.fromkeys(kinds + [row[0] for row in cur.fetchall()]))
+        results = compute_flattened_data_fields(targets)
+        _store_flattened_fields(cur, results)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        for kind in kinds:
+            _flattened_cache.invalidate(kind)
+
+    for kind, (fields, _) in results.items():
+        _flattened_cache.set(kind, fields)
+    return len(results)
+
+def _load_stored_flattened_fields(kind: str):
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT fields FROM schema_flattened_fields WHERE kind = %s", (kind,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        fields = row[0]
+        if isinstance(fields, str):
+            fields = json.loads(fields)
+        return fields
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"⚠️ Stored flattened fields unavailable for {kind}: {e}")
+        return None
+    finally:
+        cur.close()
+
+def get_flattened_data_fields(kind: str) -> List[Dict[str, str]]:
+    """
+    Returns the flattened data fields for a kind: from the in-process cache, then the
+    schema_flattened_fields table, and only computes (and stores) them on a miss.
+    """
+    fields = _flattened_cache.get(kind)
+    if fields is not None:
+        return fields
+
+    fields = _load_stored_flattened_fields(kind)
+    if fields is None:
+        fields, depends_on = compute_flattened_data_fields([kind])[kind]
+        conn = get_conn()
+        cur = conn.cursor()
+        try:
+            _store_flattened_fields(cur, {kind: (fields, depends_on)})
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"⚠️ Could not store flattened fields for {kind}: {e}")
+        finally:
+            cur.close()
+
+    _flattened_cache.set(kind, fields)
+    return fields
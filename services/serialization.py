@@ -0,0 +1,78 @@
+"""
+Fast JSON encoding for record responses.
+
+Uses orjson when it is installed and falls back to the stdlib encoder.
+JSONB columns selected as ::text can be wrapped in RawJSON and are then
+spliced into the response verbatim instead of being decoded and re-encoded.
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+class RawJSON:
+    """
+    Already-encoded JSON text (str or bytes) emitted as-is by dumps_spliced.
+    """
+    __slots__ = ("raw",)
+
+    def __init__(self, raw):
+        if raw is None:
+            raw = b"null"
+        self.raw = raw.encode("utf-8") if isinstance(raw, str) else raw
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encodes a value to compact JSON bytes. Datetimes become ISO-8601 strings.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+_CONTAINERS = (RawJSON, dict, list, tuple)
+
+
+def dumps_spliced(value: Any) -> bytes:
+    """
+    Like dumps, but RawJSON values nested in dicts/lists are inserted verbatim.
+    Only dicts and lists are walked in Python, so keep large payloads in RawJSON.
+    """
+    if isinstance(value, RawJSON):
+        return value.raw
+    if isinstance(value, dict):
+        if not any(isinstance(v, _CONTAINERS) for v in value.values()):
+            return dumps(value)
+        return b"{" + b",".join(
+            dumps(str(k)) + b":" + dumps_spliced(v) for k, v in value.items()
+        ) + b"}"
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(dumps_spliced(v) for v in value) + b"]"
+    return dumps(value)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response that skips FastAPI's jsonable_encoder. Accepts plain
+    structures (optionally containing RawJSON) or pre-encoded bytes.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps_spliced(content)
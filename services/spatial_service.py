@@ -0,0 +1,446 @@
+"""
+Spatial index over record geometries (record_locations, sql/007).
+
+Every geometry in a record's data (see services/crs.collect_geometries) is
+stored as its WGS84 lon/lat extent in a GiST-indexed box column. Writes in
+record_service call sync_locations / remove_locations in their own
+transaction, so the index commits with the record.
+
+Queries take an OSDU search-style spatialFilter:
+
+  {"byBoundingBox": {"topLeft": {"latitude": .., "longitude": ..}, "bottomRight": {...}}}
+  {"byGeoPolygon": {"points": [{"latitude": .., "longitude": ..}, ...]}}
+  {"byDistance": {"point": {"latitude": .., "longitude": ..}, "distance": <metres>}}
+
+The GiST index narrows candidates by box overlap; polygon and distance
+filters are then re-checked exactly for points, and against the extent for
+lines and areas.
+
+nearest_locations ranks records by WGS84 ellipsoidal distance
+(services/geodesy.py): an index-ordered KNN scan on the extent centres finds
+k candidates, whose k-th distance bounds a radius re-check that catches
+anything the lon/lat ordering ranked too low.
+"""
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from db import get_conn
+from services.crs import WGS84, collect_geometries, transform_arrays
+from services.geodesy import geodesic_distances
+from services.metrics import timed
+from services.tracing import set_attributes, traced
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10000
+MAX_NEAREST = 1000
+# Candidate rows fetched per wanted record in the KNN pass (records can have several geometries)
+KNN_OVERSAMPLE = 4
+# Sphere/ellipsoid slack on the re-check boxes
+RECHECK_MARGIN = 1.01
+EARTH_RADIUS_M = 6371008.8
+
+# Top-level record fields selectable through returnedFields
+RECORD_COLUMNS = {
+    "id": "r.id", "kind": "r.kind", "version": "r.version", "acl": "r.acl", "legal": "r.legal",
+    "data": "r.data", "createUser": "r.create_user", "createTime": "r.create_time",
+    "modifyUser": "r.modify_user", "modifyTime": "r.modify_time",
+}
+
+_INSERT_LOCATIONS_SQL = """
+    INSERT INTO record_locations (data_partition_id, record_id, kind, extent)
+    VALUES %s
+"""
+_LOCATION_TEMPLATE = "(%s, %s, %s, box(point(%s, %s), point(%s, %s)))"
+
+Extent = Tuple[float, float, float, float]
+
+# -------------------- Extraction --------------------
+
+def _extent(xs, ys) -> Optional[Extent]:
+    pairs = [(x, y) for x, y in zip(xs, ys)
+             if math.isfinite(x) and math.isfinite(y) and -180.0 <= x <= 180.0 and -90.0 <= y <= 90.0]
+    if len(pairs) != len(xs):
+        return None
+    return (min(x for x, _ in pairs), min(y for _, y in pairs),
+            max(x for x, _ in pairs), max(y for _, y in pairs))
+
+
+def record_extents(data) -> List[Extent]:
+    """
+    WGS84 (west, south, east, north) extent of every geometry in a record's
+    data. Geometries in other CRSs are transformed when possible; those that
+    cannot be, or that fall outside lon/lat range, are skipped.
+    """
+    found = []
+    collect_geometries(data, found)
+    extents = []
+    for source, positions, _ in found:
+        xs, ys = [float(p[0]) for p in positions], [float(p[1]) for p in positions]
+        if source != WGS84:
+            try:
+                xs, ys = transform_arrays(source, WGS84, xs, ys)
+            except ValueError as e:
+                logger.debug(f"Skipping geometry for spatial index: {e}")
+                continue
+            xs = xs.tolist() if hasattr(xs, "tolist") else list(xs)
+            ys = ys.tolist() if hasattr(ys, "tolist") else list(ys)
+        extent = _extent(xs, ys)
+        if extent:
+            extents.append(extent)
+    return extents
+
+# -------------------- Maintenance --------------------
+
+def remove_locations(cur, tenant_id: str, record_ids: List[str]) -> None:
+    """
+    Drops the records' index rows in the caller's transaction.
+    """
+    if record_ids:
+        cur.execute("DELETE FROM record_locations WHERE data_partition_id = %s AND record_id = ANY(%s)",
+                    (tenant_id, list(record_ids)))
+
+
+@traced("spatial_service.sync_locations")
+def sync_locations(cur, tenant_id: str, records: Iterable[Tuple[str, str, Dict]]) -> int:
+    """
+    Replaces the index rows of (record_id, kind, data) records in the caller's
+    transaction. Returns the number of geometries indexed.
+    """
+    records = list(records)
+    remove_locations(cur, tenant_id, [record_id for record_id, _, _ in records])
+    rows = [
+        (tenant_id, record_id, kind, west, south, east, north)
+        for record_id, kind, data in records
+        for west, south, east, north in record_extents(data)
+    ]
+    set_attributes({"osdu.record.count": len(records), "osdu.geometry.count": len(rows)})
+    if rows:
+        execute_values(cur, _INSERT_LOCATIONS_SQL, rows, template=_LOCATION_TEMPLATE)
+    return len(rows)
+
+
+def rebuild_locations(tenant_id: Optional[str] = None, batch_size: int = 1000) -> int:
+    """
+    Re-indexes every live record (of one tenant, or all), one transaction per
+    batch. Returns the number of records processed.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    last, processed = ("", ""), 0
+    try:
+        if tenant_id:
+            cur.execute("DELETE FROM record_locations WHERE data_partition_id = %s", (tenant_id,))
+        else:
+            cur.execute("TRUNCATE record_locations")
+        conn.commit()
+
+        while True:
+            cur.execute("""
+                SELECT data_partition_id, id, kind, data
+                FROM records
+                WHERE (data_partition_id, id) > (%s, %s)
+                  AND (%s::text IS NULL OR data_partition_id = %s)
+                  AND osdu_record_is_deleted(osdu_deleted, data) = 0
+                ORDER BY data_partition_id, id
+                LIMIT %s
+            """, (last[0], last[1], tenant_id, tenant_id, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            by_tenant: Dict[str, List[Tuple[str, str, Dict]]] = {}
+            for partition, record_id, kind, data in rows:
+                by_tenant.setdefault(partition, []).append((record_id, kind, data))
+            for partition, records in by_tenant.items():
+                sync_locations(cur, partition, records)
+            conn.commit()
+            processed += len(rows)
+            last = rows[-1][0], rows[-1][1]
+            logger.info(f"🗺️ Indexed locations for {processed} records")
+        return processed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+# -------------------- Filters --------------------
+
+def _position(spec, name: str) -> Tuple[float, float]:
+    """
+    (longitude, latitude) of a {"latitude", "longitude"} object.
+    Raises ValueError when missing or out of range.
+    """
+    try:
+        lon, lat = float(spec["longitude"]), float(spec["latitude"])
+    except (TypeError, KeyError, ValueError):
+        raise ValueError(f"{name} needs numeric latitude and longitude")
+    if not (-180.0 <= lon <= 180.0 and -90.0 <= lat <= 90.0):
+        raise ValueError(f"{name} is outside longitude [-180, 180] / latitude [-90, 90]")
+    return lon, lat
+
+
+def _boxes(west: float, south: float, east: float, north: float) -> List[Extent]:
+    """
+    Splits a box crossing the antimeridian (west > east) in two.
+    """
+    if west <= east:
+        return [(west, south, east, north)]
+    return [(west, south, 180.0, north), (-180.0, south, east, north)]
+
+
+def _overlap_sql(boxes: List[Extent]) -> Tuple[str, list]:
+    sql = " OR ".join("l.extent && box(point(%s, %s), point(%s, %s))" for _ in boxes)
+    return f"({sql})", [v for b in boxes for v in b]
+
+
+def distance_boxes(lon: float, lat: float, distance: float) -> List[Extent]:
+    """
+    Lon/lat boxes covering every position within `distance` metres.
+    """
+    dlat = math.degrees(distance / EARTH_RADIUS_M)
+    south, north = lat - dlat, lat + dlat
+    if south <= -90.0 or north >= 90.0:
+        return [(-180.0, max(south, -90.0), 180.0, min(north, 90.0))]
+    # widest longitude span is at the latitude furthest from the equator
+    dlon = math.degrees(distance / (EARTH_RADIUS_M * math.cos(math.radians(max(abs(south), abs(north))))))
+    if dlon >= 180.0:
+        return [(-180.0, south, 180.0, north)]
+    west, east = lon - dlon, lon + dlon
+    if west < -180.0:
+        return _boxes(west + 360.0, south, east, north)
+    if east > 180.0:
+        return _boxes(west, south, east - 360.0, north)
+    return [(west, south, east, north)]
+
+
+def spatial_filter_sql(spatial_filter: Dict) -> Tuple[str, list]:
+    """
+    WHERE fragment (over record_locations l) and its parameters for a
+    spatialFilter. Raises ValueError for malformed filters.
+    """
+    if not isinstance(spatial_filter, dict):
+        raise ValueError("spatialFilter must be an object")
+
+    if "byBoundingBox" in spatial_filter:
+        spec = spatial_filter["byBoundingBox"] or {}
+        west, north = _position(spec.get("topLeft"), "byBoundingBox.topLeft")
+        east, south = _position(spec.get("bottomRight"), "byBoundingBox.bottomRight")
+        if north < south:
+            raise ValueError("byBoundingBox.topLeft must lie north of bottomRight")
+        return _overlap_sql(_boxes(west, south, east, north))
+
+    if "byGeoPolygon" in spatial_filter:
+        points = (spatial_filter["byGeoPolygon"] or {}).get("points") or []
+        vertices = [_position(p, "byGeoPolygon.points") for p in points]
+        if len(vertices) < 3:
+            raise ValueError("byGeoPolygon needs at least 3 points")
+        polygon = "(" + ",".join(f"({x!r},{y!r})" for x, y in vertices) + ")"
+        sql = """l.extent && box(%s::polygon)
+            AND CASE WHEN l.extent[0] ~= l.extent[1] THEN %s::polygon @> l.extent[0]
+                     ELSE %s::polygon && polygon(l.extent) END"""
+        return sql, [polygon, polygon, polygon]
+
+    if "byDistance" in spatial_filter:
+        spec = spatial_filter["byDistance"] or {}
+        lon, lat = _position(spec.get("point"), "byDistance.point")
+        try:
+            distance = float(spec["distance"])
+        except (TypeError, KeyError, ValueError):
+            raise ValueError("byDistance needs a numeric distance in metres")
+        if distance <= 0:
+            raise ValueError("byDistance.distance must be > 0")
+        overlap, params = _overlap_sql(distance_boxes(lon, lat, distance))
+        # distance to the nearest position of the extent (the point itself for points)
+        sql = f"""{overlap}
+            AND osdu_haversine_m(%s, %s,
+                                 greatest((l.extent[1])[0], least((l.extent[0])[0], %s)),
+                                 greatest((l.extent[1])[1], least((l.extent[0])[1], %s))) <= %s"""
+        return sql, params + [lon, lat, lon, lat, distance]
+
+    raise ValueError("spatialFilter needs byBoundingBox, byGeoPolygon or byDistance")
+
+
+def _kind_sql(kinds) -> Tuple[str, list]:
+    if not kinds:
+        return "", []
+    kinds = [kinds] if isinstance(kinds, str) else list(kinds)
+    patterns = [k.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("*", "%") for k in kinds]
+    return "AND l.kind LIKE ANY(%s)", [patterns]
+
+# -------------------- Queries --------------------
+
+def _projection(fields: List[str]) -> Tuple[List[str], List[tuple], list]:
+    """
+    SELECT expressions for returnedFields plus the path each value goes back to.
+    """
+    if "*" in fields:
+        fields = list(RECORD_COLUMNS)
+    columns, paths, params = [], [], []
+    for field in dict.fromkeys(["id"] + list(fields)):
+        parts = tuple(field.split("."))
+        if parts[0] not in RECORD_COLUMNS or (len(parts) > 1 and parts[0] != "data"):
+            raise ValueError(f"Unsupported returnedField: {field}")
+        if len(parts) == 1:
+            columns.append(RECORD_COLUMNS[field])
+        else:
+            columns.append("r.data #> %s")
+            params.append(list(parts[1:]))
+        paths.append(parts)
+    return columns, paths, params
+
+
+def _assemble(row, paths: List[tuple]) -> Dict:
+    result: Dict = {}
+    for parts, value in zip(paths, row):
+        if value is None and len(parts) > 1:
+            continue
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        node = result
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return result
+
+
+def _fetch_projected(cur, tenant_id: str, record_ids: List[str], projection) -> Dict[str, Dict]:
+    """
+    {record id: projected record} for the live records among record_ids.
+    """
+    if not record_ids:
+        return {}
+    columns, paths, column_params = projection
+    cur.execute(f"""
+        SELECT {", ".join(columns)}
+        FROM records r
+        WHERE r.data_partition_id = %s AND r.id = ANY(%s)
+          AND osdu_record_is_deleted(r.osdu_deleted, r.data) = 0
+    """, column_params + [tenant_id, record_ids])
+    return {row[0]: _assemble(row, paths) for row in cur.fetchall()}
+
+
+@timed("spatial_service.query_locations")
+def query_locations(tenant_id: str, spatial_filter: Dict, kinds=None, returned_fields: Optional[List[str]] = None,
+                    limit: int = DEFAULT_LIMIT, offset: int = 0) -> Dict:
+    """
+    IDs of records with a geometry matching `spatial_filter` (ordered by id),
+    plus their projected `results` when returned_fields is given.
+    Raises ValueError for an invalid request.
+    """
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    offset = max(0, int(offset or 0))
+    where, params = spatial_filter_sql(spatial_filter)
+    kind_sql, kind_params = _kind_sql(kinds)
+    projection = _projection(returned_fields) if returned_fields else None
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            SELECT DISTINCT l.record_id
+            FROM record_locations l
+            WHERE l.data_partition_id = %s AND {where} {kind_sql}
+            ORDER BY l.record_id
+            LIMIT %s OFFSET %s
+        """, [tenant_id] + params + kind_params + [limit + 1, offset])
+        record_ids = [row[0] for row in cur.fetchall()]
+        has_more = len(record_ids) > limit
+        record_ids = record_ids[:limit]
+        response = {"recordIds": record_ids, "count": len(record_ids), "offset": offset, "hasMore": has_more}
+
+        if projection:
+            projected = _fetch_projected(cur, tenant_id, record_ids, projection)
+            response["results"] = [projected[record_id] for record_id in record_ids if record_id in projected]
+        return response
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+# -------------------- Nearest --------------------
+
+# Nearest position of an extent to the query point (the point itself for points)
+_NEAREST_POSITION_SQL = """l.record_id,
+                   greatest((l.extent[1])[0], least((l.extent[0])[0], %s)),
+                   greatest((l.extent[1])[1], least((l.extent[0])[1], %s))"""
+
+
+def _closest(lon: float, lat: float, rows) -> Dict[str, float]:
+    """
+    {record id: distance in metres} of each record's closest geometry.
+    """
+    distances = geodesic_distances(lon, lat, [row[1] for row in rows], [row[2] for row in rows])
+    closest: Dict[str, float] = {}
+    for (record_id, _, _), distance in zip(rows, distances):
+        if distance < closest.get(record_id, math.inf):
+            closest[record_id] = distance
+    return closest
+
+
+@timed("spatial_service.nearest_locations")
+def nearest_locations(tenant_id: str, point: Dict, k: int = 10, kinds=None, max_distance: Optional[float] = None,
+                      returned_fields: Optional[List[str]] = None) -> Dict:
+    """
+    The k records with a geometry closest to `point` ({"latitude", "longitude"}),
+    nearest first, with WGS84 ellipsoidal distances in metres; optionally only
+    those within max_distance. Raises ValueError for an invalid request.
+    """
+    lon, lat = _position(point, "point")
+    k = max(1, min(int(k or 10), MAX_NEAREST))
+    if max_distance is not None and float(max_distance) <= 0:
+        raise ValueError("maxDistance must be > 0")
+    kind_sql, kind_params = _kind_sql(kinds)
+    projection = _projection(returned_fields) if returned_fields else None
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        # 1. KNN in lon/lat: k records whose distances bound the k-th nearest
+        limit = k * KNN_OVERSAMPLE
+        while True:
+            cur.execute(f"""
+                SELECT {_NEAREST_POSITION_SQL}
+                FROM record_locations l
+                WHERE l.data_partition_id = %s {kind_sql}
+                ORDER BY point(l.extent) <-> point(%s, %s)
+                LIMIT %s
+            """, [lon, lat, tenant_id] + kind_params + [lon, lat, limit])
+            rows = cur.fetchall()
+            closest = _closest(lon, lat, rows)
+            if len(closest) >= k or len(rows) < limit:
+                break
+            limit *= 2
+        if not closest:
+            return {"results": [], "count": 0}
+
+        radius = sorted(closest.values())[min(k, len(closest)) - 1]
+        if max_distance is not None:
+            radius = min(radius, float(max_distance))
+
+        # 2. Re-check everything within that radius: lon/lat order is not geodesic order
+        overlap, params = _overlap_sql(distance_boxes(lon, lat, radius * RECHECK_MARGIN))
+        cur.execute(f"""
+            SELECT {_NEAREST_POSITION_SQL}
+            FROM record_locations l
+            WHERE l.data_partition_id = %s AND {overlap} {kind_sql}
+        """, [lon, lat, tenant_id] + params + kind_params)
+        closest = _closest(lon, lat, cur.fetchall())
+        ranked = sorted((d, record_id) for record_id, d in closest.items() if d <= radius)[:k]
+
+        results = [{"id": record_id, "distance": distance} for distance, record_id in ranked]
+        if projection:
+            projected = _fetch_projected(cur, tenant_id, [r["id"] for r in results], projection)
+            results = [{**projected[r["id"]], "distance": r["distance"]} for r in results if r["id"] in projected]
+        return {"results": results, "count": len(results)}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
@@ -0,0 +1,372 @@
+"""
+Tracing spans across routes, record ingestion, validation, schema resolution
+and SQL.
+
+OSDU_TRACING selects the backend (read at import; default off):
+
+  off       span() and traced() cost nothing; traced() returns the function as is
+  console   built-in spans, one JSON object per line on stdout
+  file      built-in spans appended to OSDU_TRACE_FILE (default logs/traces.jsonl)
+  otel      spans go to the OpenTelemetry API (opentelemetry-api installed); the
+            configured TracerProvider / exporter decides where they end up
+
+Built-in spans use the OTLP field names (traceId, spanId, parentSpanId,
+startTimeUnixNano, ...) with attributes as a plain object, and honour an
+incoming W3C `traceparent`. OSDU_TRACE_SAMPLE_RATE (0..1, default 1) samples
+whole traces. Lines are written when a trace's root span ends, so a request
+costs one write. trace_report.py summarises a trace file per stage.
+
+TracingMiddleware opens the request span (named after the route template)
+and returns its trace id as X-Trace-Id. Each InstrumentedCursor query becomes
+a child span carrying the redacted statement shape.
+"""
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from services.metrics import on_query, route_template, sql_operation
+from services.query_log import statement_shape
+from services.serialization import dumps
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.propagate import extract as otel_extract
+except ImportError:  # pragma: no cover - optional dependency
+    otel_trace = None
+    otel_extract = None
+
+logger = logging.getLogger(__name__)
+
+TRACING = os.getenv("OSDU_TRACING", "off").lower()
+TRACE_FILE = os.getenv("OSDU_TRACE_FILE", "logs/traces.jsonl")
+SAMPLE_RATE = float(os.getenv("OSDU_TRACE_SAMPLE_RATE", "1"))
+SERVICE_NAME = os.getenv("OSDU_SERVICE_NAME", "osdu-storage")
+
+if TRACING == "otel" and otel_trace is None:
+    logger.warning("⚠️ OSDU_TRACING=otel but opentelemetry-api is not installed; tracing is off")
+    TRACING = "off"
+elif TRACING not in ("off", "console", "file", "otel"):
+    logger.warning(f"⚠️ Unknown OSDU_TRACING={TRACING!r}; tracing is off")
+    TRACING = "off"
+
+ENABLED = TRACING != "off"
+_OTEL = TRACING == "otel"
+_tracer = otel_trace.get_tracer("osdu.storage") if _OTEL else None
+
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_UNSAMPLED = object()
+_current: ContextVar[object] = ContextVar("osdu_current_span", default=None)
+
+# -------------------- Built-in spans --------------------
+
+class Span:
+    """
+    A finished-or-running span of the built-in backend.
+    """
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "error", "local_root")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict] = None, start_ns: Optional[int] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.error = None
+        # first span of the trace in this process; its end flushes the trace
+        self.local_root = False
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict):
+        self.attributes.update(attributes)
+
+    def update_name(self, name: str):
+        self.name = name
+
+    def record_exception(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self, end_ns: Optional[int] = None):
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        _export(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error
+                      else {"code": "STATUS_CODE_UNSET"},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def update_name(self, name):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_trace_file = None
+
+
+def _export(span: Span):
+    line = dumps(span.to_dict()) + b"\n"
+    with _buffer_lock:
+        _buffer.append(line)
+        if not span.local_root:
+            return
+        payload = b"".join(_buffer)
+        _buffer.clear()
+        try:
+            _write(payload)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write trace spans: {e}")
+
+
+def _write(payload: bytes):
+    global _trace_file
+    if TRACING == "console":
+        sys.stdout.buffer.write(payload)
+        sys.stdout.flush()
+        return
+    if _trace_file is None:
+        directory = os.path.dirname(TRACE_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _trace_file = open(TRACE_FILE, "ab")
+    _trace_file.write(payload)
+    _trace_file.flush()
+
+
+def _start(name: str, kind: str, attributes: Optional[Dict], traceparent: Optional[str] = None,
+           start_ns: Optional[int] = None):
+    """
+    A new built-in Span under the current one (a local root otherwise), or
+    _UNSAMPLED when the trace is not sampled.
+    """
+    parent = _current.get()
+    if parent is _UNSAMPLED:
+        return _UNSAMPLED
+    if parent is not None:
+        return Span(name, kind, parent.trace_id, parent.span_id, attributes, start_ns)
+    match = _TRACEPARENT_RE.match(traceparent or "")
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        if not int(flags, 16) & 1:
+            return _UNSAMPLED
+    elif SAMPLE_RATE < 1 and random.random() >= SAMPLE_RATE:
+        return _UNSAMPLED
+    else:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+    root = Span(name, kind, trace_id, parent_id, attributes, start_ns)
+    root.local_root = True
+    return root
+
+# -------------------- API --------------------
+
+class _SpanContext:
+    __slots__ = ("name", "kind", "attributes", "traceparent", "span", "token", "otel_cm")
+
+    def __init__(self, name: str, kind: str, attributes: Optional[Dict], traceparent: Optional[str]):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.traceparent = traceparent
+
+    def __enter__(self):
+        if _OTEL:
+            context = otel_extract({"traceparent": self.traceparent}) if self.traceparent else None
+            self.otel_cm = _tracer.start_as_current_span(
+                self.name, context=context, kind=getattr(otel_trace.SpanKind, self.kind), attributes=self.attributes)
+            return self.otel_cm.__enter__()
+        self.span = _start(self.name, self.kind, self.attributes, self.traceparent)
+        self.token = _current.set(self.span)
+        return NOOP_SPAN if self.span is _UNSAMPLED else self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if _OTEL:
+            return self.otel_cm.__exit__(exc_type, exc, tb)
+        _current.reset(self.token)
+        if self.span is not _UNSAMPLED:
+            if exc is not None:
+                self.span.record_exception(exc)
+            self.span.end()
+        return False
+
+
+class _NoopContext:
+    def __enter__(self):
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_CONTEXT = _NoopContext()
+
+
+def span(name: str, attributes: Optional[Dict] = None, kind: str = "INTERNAL", traceparent: Optional[str] = None):
+    """
+    Context manager for a child span of the current one (a new trace when
+    there is none). Yields the span, or a no-op span when tracing is off.
+    """
+    if not ENABLED:
+        return _NOOP_CONTEXT
+    return _SpanContext(name, kind, attributes, traceparent)
+
+
+def traced(name: str, attributes: Optional[Callable[..., Dict]] = None):
+    """
+    Runs the decorated function in span `name`. `attributes` is called with
+    the function's arguments (only when tracing is on) and returns span attributes.
+    """
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, attributes(*args, **kwargs) if attributes else None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """
+    The active span (built-in or OpenTelemetry), or a no-op span.
+    """
+    if _OTEL:
+        return otel_trace.get_current_span()
+    current = _current.get()
+    return NOOP_SPAN if current is None or current is _UNSAMPLED else current
+
+
+def set_attributes(attributes: Dict):
+    if ENABLED:
+        current_span().set_attributes(attributes)
+
+
+def mark_error(target, message: str):
+    if _OTEL:
+        target.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, message))
+    elif isinstance(target, Span) and target.error is None:
+        target.error = message
+
+
+def kinds_attribute(records) -> list:
+    return sorted({str(record.get("kind")) for record in records if isinstance(record, dict)})
+
+# -------------------- Database --------------------
+
+def _trace_query(query, vars, seconds: float, failed: bool):
+    end_ns = time.time_ns()
+    start_ns = end_ns - int(seconds * 1e9)
+    operation = sql_operation(query)
+    attributes = {"db.system": "postgresql", "db.operation.name": operation,
+                  "db.query.text": statement_shape(query)}
+    if _OTEL:
+        db_span = _tracer.start_span(operation, kind=otel_trace.SpanKind.CLIENT, attributes=attributes,
+                                     start_time=start_ns)
+        if failed:
+            mark_error(db_span, "query failed")
+        db_span.end(end_time=end_ns)
+        return
+    # queries outside a traced request or function (scripts, startup) are not traced
+    if _current.get() is None:
+        return
+    db_span = _start(operation, "CLIENT", attributes, start_ns=start_ns)
+    if db_span is _UNSAMPLED:
+        return
+    if failed:
+        mark_error(db_span, "query failed")
+    db_span.end(end_ns)
+
+
+if ENABLED:
+    on_query(_trace_query)
+
+# -------------------- HTTP --------------------
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware running each request in a SERVER span named
+    "<METHOD> <route template>".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", ()))
+        method = scope.get("method", "")
+        attributes = {"http.request.method": method, "url.path": scope.get("path", "")}
+        tenant = headers.get(b"data-partition-id")
+        if tenant:
+            attributes["osdu.data_partition_id"] = tenant.decode("latin-1")
+
+        with span(method, attributes, kind="SERVER",
+                  traceparent=headers.get(b"traceparent", b"").decode("latin-1")) as request_span:
+            status = [500]
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    status[0] = message["status"]
+                    trace_id = self._trace_id(request_span)
+                    if trace_id:
+                        message = {**message, "headers": list(message.get("headers", [])) + [
+                            (b"x-trace-id", trace_id.encode())]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                request_span.update_name(f"{method} {route}")
+                request_span.set_attributes({"http.route": route, "http.response.status_code": status[0]})
+                if status[0] >= 500:
+                    mark_error(request_span, f"HTTP {status[0]}")
+
+    @staticmethod
+    def _trace_id(request_span) -> Optional[str]:
+        if _OTEL:
+            context = request_span.get_span_context()
+            return f"{context.trace_id:032x}" if context.is_valid else None
+        return request_span.trace_id if isinstance(request_span, Span) else None
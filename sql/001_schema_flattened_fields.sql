@@ -0,0 +1,13 @@
+-- Precomputed flattened data fields per schema kind (GET /schema/fields/full).
+-- depends_on lists every kind the flattening looked up ($ref targets and
+-- x-osdu-relationship reference kinds) so re-registering any of them
+-- invalidates the row.
+CREATE TABLE IF NOT EXISTS schema_flattened_fields (
+    kind        TEXT PRIMARY KEY,
+    fields      JSONB NOT NULL,
+    depends_on  TEXT[] NOT NULL DEFAULT '{}',
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS schema_flattened_fields_depends_on_idx
+    ON schema_flattened_fields USING GIN (depends_on);
@@ -0,0 +1,108 @@
+-- Declaratively partitioned records table:
+--   records                          PARTITION BY LIST (data_partition_id)
+--     records_<tenant>_<hash>        PARTITION BY LIST (kind_group), one per tenant
+--       ..._master_data, ..._reference_data, ..._work_product_component,
+--       ..._work_product, ..._dataset, ..._other (DEFAULT)
+--
+-- kind_group is set by the application (services/partitioning.kind_group) and
+-- mirrored here by osdu_kind_group() for the legacy copy. Tenant partitions are
+-- created on demand by osdu_ensure_record_partition(tenant).
+--
+-- An existing unpartitioned records table is renamed to records_unpartitioned
+-- and its rows are copied across. The legacy table had no tenant column, so
+-- every legacy row goes to one data partition: the osdu.legacy_partition
+-- setting (apply_migrations.py sets it from DATA_PARTITION_ID), or 'opendes'.
+-- Drop records_unpartitioned once verified.
+--
+-- Tradeoff: a unique key on a partitioned table must include the partition
+-- keys, so the primary key is (data_partition_id, kind_group, id) and does not
+-- by itself keep an id unique within a tenant: the same id under kinds of two
+-- groups would land in two partitions. sql/009_record_ids.sql restores that
+-- guarantee with a trigger-maintained record_ids (data_partition_id, id) key.
+
+DO $$
+BEGIN
+    IF to_regclass('records') IS NOT NULL
+       AND NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'records'::regclass) THEN
+        ALTER TABLE records RENAME TO records_unpartitioned;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS records (
+    data_partition_id TEXT NOT NULL,
+    kind_group        TEXT NOT NULL,
+    id                TEXT NOT NULL,
+    kind              TEXT NOT NULL,
+    legal             JSONB,
+    acl               JSONB,
+    data              JSONB,
+    version           INTEGER NOT NULL DEFAULT 1,
+    create_user       TEXT,
+    create_time       TIMESTAMP,
+    modify_user       TEXT,
+    modify_time       TIMESTAMP,
+    osdu_deleted      BOOLEAN DEFAULT FALSE,
+    osdu_deleted_at   TIMESTAMP,
+    CONSTRAINT records_partitioned_pkey PRIMARY KEY (data_partition_id, kind_group, id)
+) PARTITION BY LIST (data_partition_id);
+
+CREATE INDEX IF NOT EXISTS records_tenant_id_idx ON records (data_partition_id, id);
+CREATE INDEX IF NOT EXISTS records_tenant_kind_idx ON records (data_partition_id, kind);
+
+CREATE OR REPLACE FUNCTION osdu_kind_group(p_kind TEXT) RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN position('--' IN split_part(p_kind, ':', 3)) > 0
+         AND split_part(split_part(p_kind, ':', 3), '--', 1)
+             IN ('master-data', 'reference-data', 'work-product-component', 'work-product', 'dataset')
+        THEN split_part(split_part(p_kind, ':', 3), '--', 1)
+        ELSE 'other'
+    END
+$$;
+
+CREATE OR REPLACE FUNCTION osdu_ensure_record_partition(p_tenant TEXT) RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_table TEXT := 'records_' || left(regexp_replace(lower(p_tenant), '[^a-z0-9]+', '_', 'g'), 20)
+                    || '_' || left(md5(p_tenant), 8);
+    v_group TEXT;
+BEGIN
+    IF to_regclass(v_table) IS NOT NULL THEN
+        RETURN v_table;
+    END IF;
+
+    -- Serialize concurrent first writes for the same tenant
+    PERFORM pg_advisory_xact_lock(hashtext('osdu_ensure_record_partition'), hashtext(p_tenant));
+    IF to_regclass(v_table) IS NOT NULL THEN
+        RETURN v_table;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF records FOR VALUES IN (%L) PARTITION BY LIST (kind_group)',
+                   v_table, p_tenant);
+    FOREACH v_group IN ARRAY ARRAY['master-data', 'reference-data', 'work-product-component', 'work-product', 'dataset'] LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES IN (%L)',
+                       v_table || '_' || replace(v_group, '-', '_'), v_table, v_group);
+    END LOOP;
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', v_table || '_other', v_table);
+    RETURN v_table;
+END $$;
+
+DO $$
+DECLARE
+    v_tenant TEXT := COALESCE(NULLIF(current_setting('osdu.legacy_partition', true), ''), 'opendes');
+BEGIN
+    IF to_regclass('records_unpartitioned') IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM osdu_ensure_record_partition(v_tenant);
+
+    INSERT INTO records (
+        data_partition_id, kind_group, id, kind, legal, acl, data, version,
+        create_user, create_time, modify_user, modify_time, osdu_deleted, osdu_deleted_at
+    )
+    SELECT v_tenant, osdu_kind_group(kind), id, kind, legal, acl, data, version,
+           create_user, create_time, modify_user, modify_time, osdu_deleted, osdu_deleted_at
+    FROM records_unpartitioned
+    ON CONFLICT DO NOTHING;
+END $$;
@@ -0,0 +1,75 @@
+-- Per-tenant, per-kind summary of the records table, maintained by an AFTER ROW
+-- trigger so kind listings and audits read one row per kind instead of scanning
+-- records. total_bytes is the approximate stored size of legal + acl + data.
+
+CREATE TABLE IF NOT EXISTS kind_stats (
+    data_partition_id TEXT NOT NULL,
+    kind              TEXT NOT NULL,
+    kind_group        TEXT NOT NULL,
+    record_count      BIGINT NOT NULL DEFAULT 0,
+    total_bytes       BIGINT NOT NULL DEFAULT 0,
+    last_modified     TIMESTAMP,
+    PRIMARY KEY (data_partition_id, kind)
+);
+
+CREATE INDEX IF NOT EXISTS kind_stats_kind_idx ON kind_stats (kind);
+
+CREATE OR REPLACE FUNCTION osdu_record_bytes(p_legal JSONB, p_acl JSONB, p_data JSONB) RETURNS BIGINT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT COALESCE(pg_column_size(p_legal), 0)::BIGINT
+         + COALESCE(pg_column_size(p_acl), 0)
+         + COALESCE(pg_column_size(p_data), 0)
+$$;
+
+CREATE OR REPLACE FUNCTION osdu_kind_stats_apply(
+    p_tenant TEXT, p_kind TEXT, p_group TEXT, p_count BIGINT, p_bytes BIGINT, p_modified TIMESTAMP
+) RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO kind_stats AS s (data_partition_id, kind, kind_group, record_count, total_bytes, last_modified)
+    VALUES (p_tenant, p_kind, p_group, p_count, p_bytes, p_modified)
+    ON CONFLICT (data_partition_id, kind) DO UPDATE SET
+        kind_group = EXCLUDED.kind_group,
+        record_count = s.record_count + EXCLUDED.record_count,
+        total_bytes = s.total_bytes + EXCLUDED.total_bytes,
+        last_modified = GREATEST(s.last_modified, EXCLUDED.last_modified)
+$$;
+
+-- Updates that cross a partition boundary fire AFTER DELETE + AFTER INSERT
+-- instead of AFTER UPDATE, which this function handles the same way.
+CREATE OR REPLACE FUNCTION osdu_kind_stats_trigger() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.data_partition_id = NEW.data_partition_id AND OLD.kind = NEW.kind THEN
+        PERFORM osdu_kind_stats_apply(
+            NEW.data_partition_id, NEW.kind, NEW.kind_group, 0,
+            osdu_record_bytes(NEW.legal, NEW.acl, NEW.data) - osdu_record_bytes(OLD.legal, OLD.acl, OLD.data),
+            NEW.modify_time);
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM osdu_kind_stats_apply(
+            OLD.data_partition_id, OLD.kind, OLD.kind_group, -1,
+            -osdu_record_bytes(OLD.legal, OLD.acl, OLD.data), NULL);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM osdu_kind_stats_apply(
+            NEW.data_partition_id, NEW.kind, NEW.kind_group, 1,
+            osdu_record_bytes(NEW.legal, NEW.acl, NEW.data), NEW.modify_time);
+    END IF;
+    RETURN NULL;
+END $$;
+
+-- Backfill under a SHARE lock so no write slips between the snapshot and the trigger
+LOCK TABLE records IN SHARE MODE;
+
+DROP TRIGGER IF EXISTS records_kind_stats ON records;
+CREATE TRIGGER records_kind_stats
+    AFTER INSERT OR UPDATE OR DELETE ON records
+    FOR EACH ROW EXECUTE FUNCTION osdu_kind_stats_trigger();
+
+TRUNCATE kind_stats;
+INSERT INTO kind_stats (data_partition_id, kind, kind_group, record_count, total_bytes, last_modified)
+SELECT data_partition_id, kind, kind_group, COUNT(*), SUM(osdu_record_bytes(legal, acl, data)), MAX(modify_time)
+FROM records
+GROUP BY data_partition_id, kind, kind_group;
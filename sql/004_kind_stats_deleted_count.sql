@@ -0,0 +1,67 @@
+-- Track soft-deleted records per kind so the kinds catalogue can list only kinds
+-- with live records. A record counts as deleted when the osdu_deleted column is
+-- set (records:delete, :delete) or data.osdu_deleted is true (DELETE /records/{id}).
+
+ALTER TABLE kind_stats ADD COLUMN IF NOT EXISTS deleted_count BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION osdu_record_is_deleted(p_flag BOOLEAN, p_data JSONB) RETURNS BIGINT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE WHEN p_flag IS TRUE OR COALESCE(p_data->>'osdu_deleted' = 'true', FALSE) THEN 1 ELSE 0 END::BIGINT
+$$;
+
+DROP FUNCTION IF EXISTS osdu_kind_stats_apply(TEXT, TEXT, TEXT, BIGINT, BIGINT, TIMESTAMP);
+
+CREATE OR REPLACE FUNCTION osdu_kind_stats_apply(
+    p_tenant TEXT, p_kind TEXT, p_group TEXT, p_count BIGINT, p_deleted BIGINT, p_bytes BIGINT, p_modified TIMESTAMP
+) RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO kind_stats AS s (data_partition_id, kind, kind_group, record_count, deleted_count, total_bytes, last_modified)
+    VALUES (p_tenant, p_kind, p_group, p_count, p_deleted, p_bytes, p_modified)
+    ON CONFLICT (data_partition_id, kind) DO UPDATE SET
+        kind_group = EXCLUDED.kind_group,
+        record_count = s.record_count + EXCLUDED.record_count,
+        deleted_count = s.deleted_count + EXCLUDED.deleted_count,
+        total_bytes = s.total_bytes + EXCLUDED.total_bytes,
+        last_modified = GREATEST(s.last_modified, EXCLUDED.last_modified)
+$$;
+
+CREATE OR REPLACE FUNCTION osdu_kind_stats_trigger() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.data_partition_id = NEW.data_partition_id AND OLD.kind = NEW.kind THEN
+        PERFORM osdu_kind_stats_apply(
+            NEW.data_partition_id, NEW.kind, NEW.kind_group, 0,
+            osdu_record_is_deleted(NEW.osdu_deleted, NEW.data) - osdu_record_is_deleted(OLD.osdu_deleted, OLD.data),
+            osdu_record_bytes(NEW.legal, NEW.acl, NEW.data) - osdu_record_bytes(OLD.legal, OLD.acl, OLD.data),
+            NEW.modify_time);
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM osdu_kind_stats_apply(
+            OLD.data_partition_id, OLD.kind, OLD.kind_group, -1,
+            -osdu_record_is_deleted(OLD.osdu_deleted, OLD.data),
+            -osdu_record_bytes(OLD.legal, OLD.acl, OLD.data), NULL);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM osdu_kind_stats_apply(
+            NEW.data_partition_id, NEW.kind, NEW.kind_group, 1,
+            osdu_record_is_deleted(NEW.osdu_deleted, NEW.data),
+            osdu_record_bytes(NEW.legal, NEW.acl, NEW.data), NEW.modify_time);
+    END IF;
+    RETURN NULL;
+END $$;
+
+LOCK TABLE records IN SHARE MODE;
+
+UPDATE kind_stats k
+SET deleted_count = d.deleted_count
+FROM (
+    SELECT data_partition_id, kind, SUM(osdu_record_is_deleted(osdu_deleted, data)) AS deleted_count
+    FROM records
+    GROUP BY data_partition_id, kind
+) d
+WHERE k.data_partition_id = d.data_partition_id AND k.kind = d.kind;
+
+CREATE INDEX IF NOT EXISTS kind_stats_live_idx ON kind_stats (data_partition_id, kind)
+    WHERE record_count > deleted_count;
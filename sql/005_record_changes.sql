@@ -0,0 +1,16 @@
+-- Transactional outbox of record mutations, read by GET /api/storage/v2/changes.
+-- Rows are appended by services/change_feed.append_changes in the same
+-- transaction as the write, under an advisory lock so seq follows commit order.
+
+CREATE TABLE IF NOT EXISTS record_changes (
+    seq               BIGSERIAL PRIMARY KEY,
+    data_partition_id TEXT NOT NULL,
+    record_id         TEXT NOT NULL,
+    kind              TEXT,
+    operation         TEXT NOT NULL CHECK (operation IN ('create', 'update', 'delete')),
+    version           INTEGER,
+    changed_at        TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS record_changes_tenant_seq_idx ON record_changes (data_partition_id, seq);
+CREATE INDEX IF NOT EXISTS record_changes_changed_at_idx ON record_changes (changed_at);
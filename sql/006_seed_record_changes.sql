@@ -0,0 +1,16 @@
+-- Seed the change feed with records that predate it, so replaying the feed from
+-- sequence 0 (search_service/indexer.py --since 0) reindexes every record.
+-- Takes the change-feed append lock (services/change_feed.CHANGE_FEED_LOCK_KEY)
+-- so seeded sequence numbers stay in commit order with concurrent writes.
+SELECT pg_advisory_xact_lock(7302146001);
+
+INSERT INTO record_changes (data_partition_id, record_id, kind, operation, version, changed_at)
+SELECT r.data_partition_id, r.id, r.kind,
+       CASE WHEN osdu_record_is_deleted(r.osdu_deleted, r.data) = 1 THEN 'delete' ELSE 'create' END,
+       r.version, COALESCE(r.modify_time, now() AT TIME ZONE 'utc')
+FROM records r
+WHERE NOT EXISTS (
+    SELECT 1 FROM record_changes c
+    WHERE c.data_partition_id = r.data_partition_id AND c.record_id = r.id
+)
+ORDER BY r.data_partition_id, r.modify_time NULLS FIRST, r.id;
@@ -0,0 +1,25 @@
+-- Spatial index over record geometries, read by POST /api/storage/v2/query/spatial.
+-- One row per geometry with its WGS84 extent (lon/lat box; a point is a zero-size
+-- box). Rows are written by services/spatial_service.sync_locations in the same
+-- transaction as the record write, and removed when the record is deleted.
+-- Uses only built-in geometric types, so no PostGIS is needed.
+--
+-- Existing records are indexed by running rebuild_record_locations.py once.
+
+CREATE TABLE IF NOT EXISTS record_locations (
+    data_partition_id TEXT NOT NULL,
+    record_id         TEXT NOT NULL,
+    kind              TEXT NOT NULL,
+    extent            BOX NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS record_locations_extent_idx ON record_locations USING gist (extent);
+CREATE INDEX IF NOT EXISTS record_locations_record_idx ON record_locations (data_partition_id, record_id);
+
+-- Great-circle distance in metres between two lon/lat positions (haversine, mean Earth radius)
+CREATE OR REPLACE FUNCTION osdu_haversine_m(p_lon1 FLOAT8, p_lat1 FLOAT8, p_lon2 FLOAT8, p_lat2 FLOAT8) RETURNS FLOAT8
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT 2 * 6371008.8 * asin(sqrt(least(1.0,
+        sin(radians(p_lat2 - p_lat1) / 2) ^ 2
+        + cos(radians(p_lat1)) * cos(radians(p_lat2)) * sin(radians(p_lon2 - p_lon1) / 2) ^ 2)))
+$$;
@@ -0,0 +1,5 @@
+-- Nearest-neighbour ordering for POST /api/storage/v2/query/nearest:
+-- ORDER BY point(extent) <-> point(lon, lat) walks this index in distance order
+-- (GiST point_ops supports KNN on every supported Postgres version).
+
+CREATE INDEX IF NOT EXISTS record_locations_center_idx ON record_locations USING gist (point(extent));
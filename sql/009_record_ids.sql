@@ -0,0 +1,59 @@
+-- One row per (data_partition_id, id), kept by an AFTER ROW trigger on records.
+--
+-- The partitioned records table (002) can only have unique keys that include
+-- the partition keys, so its primary key is (data_partition_id, kind_group, id)
+-- and no longer stops the same id from being stored twice in one tenant under
+-- kinds of different groups. That can happen when two workers PUT a new id
+-- concurrently (record_service checks existence, then inserts). The primary
+-- key here restores the guarantee: the second insert fails with a unique
+-- violation in the trigger and that record is rejected. The cost is one extra
+-- btree insert per created record.
+
+CREATE TABLE IF NOT EXISTS record_ids (
+    data_partition_id TEXT NOT NULL,
+    id                TEXT NOT NULL,
+    PRIMARY KEY (data_partition_id, id)
+);
+
+-- Updates that cross a partition boundary fire AFTER DELETE + AFTER INSERT
+-- instead of AFTER UPDATE, which keeps the row; same-partition updates only
+-- matter if they change the id.
+CREATE OR REPLACE FUNCTION osdu_record_ids_trigger() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.data_partition_id = NEW.data_partition_id AND OLD.id = NEW.id THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM record_ids WHERE data_partition_id = OLD.data_partition_id AND id = OLD.id;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        INSERT INTO record_ids (data_partition_id, id) VALUES (NEW.data_partition_id, NEW.id);
+    END IF;
+    RETURN NULL;
+END $$;
+
+-- Backfill under a SHARE lock so no write slips between the snapshot and the trigger
+LOCK TABLE records IN SHARE MODE;
+
+DO $$
+DECLARE
+    v_duplicates BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO v_duplicates
+    FROM (SELECT 1 FROM records GROUP BY data_partition_id, id HAVING COUNT(*) > 1) d;
+    IF v_duplicates > 0 THEN
+        RAISE EXCEPTION '% record id(s) are stored more than once within a tenant; resolve them before applying 009', v_duplicates
+            USING HINT = 'SELECT data_partition_id, id, array_agg(kind) FROM records GROUP BY 1, 2 HAVING COUNT(*) > 1';
+    END IF;
+END $$;
+
+DROP TRIGGER IF EXISTS records_record_ids ON records;
+CREATE TRIGGER records_record_ids
+    AFTER INSERT OR UPDATE OF data_partition_id, id OR DELETE ON records
+    FOR EACH ROW EXECUTE FUNCTION osdu_record_ids_trigger();
+
+TRUNCATE record_ids;
+INSERT INTO record_ids (data_partition_id, id)
+SELECT data_partition_id, id FROM records;
@@ -1,16 +1,19 @@
+-- Counts come from kind_stats (one row per tenant and kind), so this no longer
+-- scans records. Only the final listing touches records, and only for the
+-- unmatched kinds via the (data_partition_id, kind) index.
 WITH unmatched AS (
-    SELECT r.id, r.kind
-    FROM records r
-    LEFT JOIN schema_registry s ON r.kind = s.kind
-    WHERE s.kind IS NULL
+    SELECT k.data_partition_id, k.kind, k.record_count
+    FROM kind_stats k
+    LEFT JOIN schema_registry s ON k.kind = s.kind
+    WHERE s.kind IS NULL AND k.record_count > 0
 ),
 matched AS (
-    SELECT COUNT(*) AS matched_count
-    FROM records r
-    WHERE r.kind IN (SELECT kind FROM schema_registry)
+    SELECT COALESCE(SUM(k.record_count), 0) AS matched_count
+    FROM kind_stats k
+    WHERE k.kind IN (SELECT kind FROM schema_registry)
 ),
 unmatched_count AS (
-    SELECT COUNT(*) AS unmatched_count FROM unmatched
+    SELECT COALESCE(SUM(record_count), 0) AS unmatched_count FROM unmatched
 )
 
 SELECT
@@ -18,11 +21,16 @@ SELECT
     u.unmatched_count
 FROM matched m, unmatched_count u;
 
--- List unmatched records
-SELECT id, kind FROM (
-    SELECT r.id, r.kind
-    FROM records r
-    LEFT JOIN schema_registry s ON r.kind = s.kind
-    WHERE s.kind IS NULL
-) AS unmatched_records;
+-- List unmatched kinds with their record counts
+SELECT k.data_partition_id, k.kind, k.record_count
+FROM kind_stats k
+LEFT JOIN schema_registry s ON k.kind = s.kind
+WHERE s.kind IS NULL AND k.record_count > 0
+ORDER BY k.data_partition_id, k.kind;
 
+-- List unmatched records
+SELECT r.id, r.kind
+FROM kind_stats k
+JOIN records r ON r.data_partition_id = k.data_partition_id AND r.kind = k.kind
+LEFT JOIN schema_registry s ON k.kind = s.kind
+WHERE s.kind IS NULL AND k.record_count > 0;
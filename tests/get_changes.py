@@ -0,0 +1,20 @@
+# test_changes.py
+import requests
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "opendes"}
+
+# Page through the whole feed
+since = 0
+while True:
+    resp = requests.get(f"{BASE}/changes", params={"since": since, "limit": 500}, headers=HEADERS)
+    page = resp.json()
+    for change in page["changes"]:
+        print(change["sequence"], change["operation"], change["id"], change["version"])
+    since = page["nextSince"]
+    if not page["hasMore"]:
+        break
+
+# Long poll: returns as soon as a new change commits, or empty after 10s
+resp = requests.get(f"{BASE}/changes", params={"since": since, "wait": 10}, headers=HEADERS)
+print(resp.status_code, resp.json())
@@ -0,0 +1,18 @@
+# test_metrics.py
+# Hits a record route, then checks that /metrics reports it by route template,
+# along with database query timings.
+import requests
+
+ROOT = "http://127.0.0.1:5000"
+BASE = f"{ROOT}/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "opendes"}
+
+requests.get(f"{BASE}/records/opendes:well--metrics-probe", headers=HEADERS)
+
+resp = requests.get(f"{ROOT}/metrics")
+print(resp.status_code, resp.headers.get("content-type"))
+text = resp.text
+print("✅ Route latency" if 'route="/api/storage/v2/records/{record_id}"' in text else "❌ Route latency")
+print("✅ DB timings" if 'osdu_db_query_duration_seconds_count{operation="SELECT"}' in text else "❌ DB timings")
+print("\n".join(line for line in text.splitlines() if line.startswith("osdu_records_")))
+print("✅ Counter metadata" if "# TYPE osdu_db_query_errors_total counter" in text else "❌ Counter metadata")
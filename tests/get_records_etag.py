@@ -0,0 +1,14 @@
+# test_etag.py
+import requests
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "opendes"}
+
+record_id = "osdu:unit--Meter:1"
+resp = requests.get(f"{BASE}/records/{record_id}", headers=HEADERS)
+etag = resp.headers.get("ETag")
+print(resp.status_code, etag)
+
+# Unchanged record → 304 with an empty body
+resp = requests.get(f"{BASE}/records/{record_id}", headers={**HEADERS, "If-None-Match": etag})
+print(resp.status_code, resp.headers.get("ETag"), repr(resp.text))
@@ -0,0 +1,14 @@
+# test_kind_stats.py
+import requests
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "opendes"}
+
+resp = requests.get(f"{BASE}/records/kinds/stats", headers=HEADERS)
+print(resp.status_code)
+for row in resp.json():
+    print(row["kind"], row["recordCount"], row["averageBytes"], row["lastModified"])
+
+# One kind family only
+resp = requests.get(f"{BASE}/records/kinds/stats", params={"group": "reference-data"}, headers=HEADERS)
+print(resp.status_code, len(resp.json()))
@@ -0,0 +1,12 @@
+# test_kinds.py
+import requests
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+
+# Across all data partitions (what the kind pickers call)
+resp = requests.get(f"{BASE}/records/kinds")
+print(resp.status_code, resp.json())
+
+# One data partition
+resp = requests.get(f"{BASE}/records/kinds", headers={"data-partition-id": "opendes"})
+print(resp.status_code, resp.json())
@@ -0,0 +1,16 @@
+# test_tenant_isolation.py
+import requests
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+OPENDES = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "opendes"}
+OTHER = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "tenant-b"}
+
+record_id = "osdu:unit--Meter:1"
+
+# Visible in its own data partition
+resp = requests.get(f"{BASE}/records", params={"ids": record_id}, headers=OPENDES)
+print(resp.status_code, resp.json())
+
+# Another data partition only sees it as missing
+resp = requests.get(f"{BASE}/records", params={"ids": record_id}, headers=OTHER)
+print(resp.status_code, resp.json())
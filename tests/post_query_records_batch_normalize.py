@@ -0,0 +1,74 @@
+# test_normalize.py
+# Loads two UnitOfMeasure reference records and a record with measured values,
+# then asks POST /query/records:batch to normalize them to SI.
+import requests, json
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "osdu", "Content-Type": "application/json"}
+ACL = {"owners": ["data.default.owners@osdu"], "viewers": ["data.default.viewers@osdu"]}
+LEGAL = {"legaltags": ["osdu-public-usa-dataset-1"], "otherRelevantDataCountries": ["US"], "status": "compliant"}
+
+
+def uom(code, b):
+    reference = {"abcd": {"a": 0.0, "b": b, "c": 1.0, "d": 0.0}, "symbol": code,
+                 "baseMeasurement": {"ancestry": "L", "type": "UM"}, "type": "UAD"}
+    return {"id": f"osdu:reference-data--UnitOfMeasure:{code}", "kind": "osdu:wks:reference-data--UnitOfMeasure:1.0.0",
+            "acl": ACL, "legal": LEGAL,
+            "data": {"Code": code, "Name": code, "UnitDimensionCode": "L", "PersistableReference": json.dumps(reference)}}
+
+
+def uom_scale_offset(code, scale, offset):
+    # base = scale * (x - offset), e.g. degC: scale 1, offset -273.15
+    reference = {"scaleOffset": {"scale": scale, "offset": offset}, "symbol": code,
+                 "baseMeasurement": {"ancestry": "T", "type": "UM"}, "type": "USO"}
+    return {"id": f"osdu:reference-data--UnitOfMeasure:{code}", "kind": "osdu:wks:reference-data--UnitOfMeasure:1.0.0",
+            "acl": ACL, "legal": LEGAL,
+            "data": {"Code": code, "Name": code, "UnitDimensionCode": "T", "PersistableReference": json.dumps(reference)}}
+
+
+records = [uom("m", 1.0), uom("ft", 0.3048), uom_scale_offset("K", 1.0, 0.0), uom_scale_offset("degC", 1.0, -273.15)]
+resp = requests.post(f"{BASE}/records:batch", headers=HEADERS, data=json.dumps({"records": records}))
+print(resp.status_code, resp.json())
+
+well = {
+    "id": "osdu:well--normalize-001",
+    "kind": "osdu:wks:master-data--Well:1.4.0",
+    "acl": ACL,
+    "legal": LEGAL,
+    "data": {"Name": "Normalize Well", "TotalDepth": {"value": 10000, "uom": "ft"},
+             "Elevation": {"Value": 120.5, "Unit": "ft"},
+             "BottomHoleTemperature": {"value": 100, "uom": "degC"}}
+}
+resp = requests.put(f"{BASE}/records", headers=HEADERS, data=json.dumps([well]))
+print(resp.status_code, resp.json())
+
+resp = requests.post(f"{BASE}/query/records:batch",
+                     headers={**HEADERS, "frame-of-reference": "units=SI;crs=wgs84;elevation=msl;azimuth=true north;dates=utc;"},
+                     data=json.dumps({"recordIds": [well["id"], "osdu:well--missing"]}))
+body = resp.json()
+print(resp.status_code, json.dumps(body, indent=2))
+data = body["records"][0]["data"] if body.get("records") else {}
+print("✅ TotalDepth in m" if data.get("TotalDepth") == {"value": 3048.0, "uom": "m"} else "❌ TotalDepth", data.get("TotalDepth"))
+temperature = data.get("BottomHoleTemperature") or {}
+print("✅ BottomHoleTemperature in K" if temperature.get("uom") == "K" and round(temperature.get("value", 0), 6) == 373.15
+      else "❌ BottomHoleTemperature", temperature)
+print("✅ Status" if body.get("conversionStatuses", [{}])[0].get("status") == "SUCCESS" else "❌ Status",
+      body.get("conversionStatuses"))
+
+# Geometries: a Web Mercator point normalized to WGS84 (crs=, services/crs.py)
+well["data"]["SurfaceLocation"] = {"type": "Point", "coordinates": [1113194.9079327357, 1118889.9748579594],
+                                   "crs": {"type": "name", "properties": {"name": "EPSG:3857"}}}
+resp = requests.put(f"{BASE}/records", headers=HEADERS, data=json.dumps([well]))
+resp = requests.post(f"{BASE}/query/records:batch", headers={**HEADERS, "frame-of-reference": "crs=wgs84;"},
+                     data=json.dumps({"recordIds": [well["id"]]}))
+location = resp.json()["records"][0]["data"]["SurfaceLocation"]
+print(resp.status_code, location)
+print("✅ SurfaceLocation in WGS84" if [round(c, 6) for c in location["coordinates"]] == [10.0, 10.0] else "❌ SurfaceLocation")
+
+# Malformed and unsupported entries are ignored; a units/crs entry without a value is rejected
+resp = requests.post(f"{BASE}/query/records:batch", headers={**HEADERS, "frame-of-reference": "crs=wgs84;msl;vertical=x;"},
+                     data=json.dumps({"recordIds": [well["id"]]}))
+print("✅ Lenient frame-of-reference" if resp.status_code == 200 else "❌ Lenient frame-of-reference", resp.status_code)
+resp = requests.post(f"{BASE}/query/records:batch", headers={**HEADERS, "frame-of-reference": "units=;"},
+                     data=json.dumps({"recordIds": [well["id"]]}))
+print("✅ Empty units rejected" if resp.status_code == 400 else "❌ Empty units", resp.status_code)
@@ -0,0 +1,61 @@
+# test_spatial.py
+# Ingests three wells with surface locations, patches one to move it, then runs
+# bounding-box, polygon and radius queries against POST /query/spatial.
+import requests, json
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "osdu", "Content-Type": "application/json"}
+ACL = {"owners": ["data.default.owners@osdu"], "viewers": ["data.default.viewers@osdu"]}
+LEGAL = {"legaltags": ["osdu-public-usa-dataset-1"], "otherRelevantDataCountries": ["US"], "status": "compliant"}
+KIND = "osdu:wks:master-data--Well:1.4.0"
+
+
+def well(suffix, lon, lat):
+    return {"id": f"osdu:well--spatial-{suffix}", "kind": KIND, "acl": ACL, "legal": LEGAL,
+            "data": {"FacilityName": f"Spatial {suffix}",
+                     "SpatialLocation": {"Wgs84Coordinates": {"type": "FeatureCollection", "features": [
+                         {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}}]}}}}
+
+
+def query(spatial_filter, **extra):
+    resp = requests.post(f"{BASE}/query/spatial", headers=HEADERS,
+                         data=json.dumps({"kind": KIND, "spatialFilter": spatial_filter, **extra}))
+    print(resp.status_code, resp.json())
+    return resp.json()
+
+
+wells = [well("oslo", 10.75, 59.91), well("bergen", 5.32, 60.39), well("houston", -95.37, 29.76)]
+resp = requests.put(f"{BASE}/records", headers=HEADERS, data=json.dumps(wells))
+print(resp.status_code, resp.json())
+
+norway = {"byBoundingBox": {"topLeft": {"latitude": 72.0, "longitude": 4.0},
+                            "bottomRight": {"latitude": 57.0, "longitude": 32.0}}}
+ids = set(query(norway)["recordIds"])
+print("✅ Bounding box" if ids >= {wells[0]["id"], wells[1]["id"]} and wells[2]["id"] not in ids else "❌ Bounding box")
+
+triangle = {"byGeoPolygon": {"points": [{"latitude": 59.0, "longitude": 10.0}, {"latitude": 61.0, "longitude": 10.0},
+                                        {"latitude": 59.0, "longitude": 12.0}]}}
+ids = set(query(triangle)["recordIds"])
+print("✅ Polygon" if wells[0]["id"] in ids and wells[1]["id"] not in ids else "❌ Polygon")
+
+near_oslo = {"byDistance": {"point": {"latitude": 59.95, "longitude": 10.7}, "distance": 10000}}
+body = query(near_oslo, returnedFields=["data.FacilityName"])
+print("✅ Radius + projection" if body.get("results") == [{"id": wells[0]["id"], "data": {"FacilityName": "Spatial oslo"}}]
+      else "❌ Radius + projection")
+
+# Patch moves Oslo to Houston; the index follows the write
+moved = {"SpatialLocation": wells[2]["data"]["SpatialLocation"]}
+resp = requests.patch(f"{BASE}/records/{wells[0]['id']}", headers=HEADERS, data=json.dumps({"data": moved}))
+print(resp.status_code, resp.json())
+print("✅ Patch re-indexed" if wells[0]["id"] not in query(near_oslo)["recordIds"] else "❌ Patch re-indexed")
+
+resp = requests.post(f"{BASE}/query/spatial", headers=HEADERS, data=json.dumps({"spatialFilter": {"byDistance": {}}}))
+print("✅ Invalid filter -> 400" if resp.status_code == 400 else "❌ Invalid filter", resp.status_code)
+
+# k nearest with ellipsoidal distances (POST /query/nearest)
+resp = requests.post(f"{BASE}/query/nearest", headers=HEADERS,
+                     data=json.dumps({"kind": KIND, "point": {"latitude": 60.39, "longitude": 5.33}, "k": 2}))
+body = resp.json()
+print(resp.status_code, body)
+first = body["results"][0] if body.get("results") else {}
+print("✅ Nearest" if first.get("id") == wells[1]["id"] and first.get("distance", 1e9) < 1000 else "❌ Nearest")
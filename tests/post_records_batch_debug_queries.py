@@ -0,0 +1,23 @@
+# test_debug_queries.py
+# Start the app with OSDU_QUERY_DEBUG=header. Ingests a small batch with
+# X-Debug-Queries: 1 and prints the per-request query summary headers;
+# records:batch issues a few statements per record, which shows up as N+1.
+import requests, json
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "osdu",
+           "Content-Type": "application/json", "X-Debug-Queries": "1"}
+ACL = {"owners": ["data.default.owners@osdu"], "viewers": ["data.default.viewers@osdu"]}
+LEGAL = {"legaltags": ["osdu-public-usa-dataset-1"], "otherRelevantDataCountries": ["US"], "status": "compliant"}
+
+records = [{"id": f"osdu:well--debug-queries-{i}", "kind": "osdu:wks:master-data--Well:1.4.0",
+            "acl": ACL, "legal": LEGAL, "data": {"FacilityName": f"Debug {i}"}} for i in range(15)]
+resp = requests.post(f"{BASE}/records:batch", headers=HEADERS, data=json.dumps({"records": records}))
+print(resp.status_code)
+for name in ("X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Slow-Queries", "X-DB-N-Plus-One"):
+    print(f"{name}: {resp.headers.get(name)}")
+print("✅ Query count header" if resp.headers.get("X-DB-Query-Count") else "❌ Query count header (is OSDU_QUERY_DEBUG=header set?)")
+print("✅ N+1 flagged" if resp.headers.get("X-DB-N-Plus-One") else "❌ N+1 flagged")
+
+resp = requests.get(f"{BASE}/records/{records[0]['id']}", headers={k: v for k, v in HEADERS.items() if k != "X-Debug-Queries"})
+print("✅ No headers without the flag" if "X-DB-Query-Count" not in resp.headers else "❌ Headers leaked")
@@ -0,0 +1,34 @@
+# test_profile.py
+# Needs the server started with OSDU_ADMIN_TOKEN set (export OSDU_ADMIN_TOKEN=dev-admin).
+# Profiles one records:batch call with X-Profile: 1 and prints its cProfile stats,
+# then samples the process for a few seconds and prints the hottest collapsed stacks.
+import os
+import time
+import requests
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+ADMIN = {"X-Admin-Token": os.getenv("OSDU_ADMIN_TOKEN", "dev-admin")}
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "osdu",
+           "frame-of-reference": "units=SI;crs=wgs84;", **ADMIN}
+
+payload = {"recordIds": ["osdu:well--normalize-001"]}
+
+resp = requests.post(f"{BASE}/query/records:batch", json=payload, headers={**HEADERS, "X-Profile": "1"})
+profile_id = resp.headers.get("x-profile-id")
+print(resp.status_code, "✅ Profiled" if profile_id else "❌ No X-Profile-Id header")
+if profile_id:
+    stats = requests.get(f"{BASE}/admin/profiler/requests/{profile_id}", params={"limit": 15}, headers=ADMIN)
+    print(stats.text)
+
+resp = requests.post(f"{BASE}/admin/profiler/start", json={"seconds": 3, "intervalMs": 5}, headers=ADMIN)
+print(resp.status_code, resp.json())
+for _ in range(20):
+    requests.post(f"{BASE}/query/records:batch", json=payload, headers=HEADERS)
+time.sleep(3.5)
+print(requests.get(f"{BASE}/admin/profiler", headers=ADMIN).json())
+collapsed = requests.get(f"{BASE}/admin/profiler/collapsed", headers=ADMIN).text
+print("✅ Collapsed stacks" if collapsed else "❌ Empty profile")
+print("\n".join(collapsed.splitlines()[:5]))
+
+resp = requests.get(f"{BASE}/admin/profiler", headers={"X-Admin-Token": "wrong"})
+print("✅ Guarded" if resp.status_code == 403 else f"❌ Guard returned {resp.status_code}")
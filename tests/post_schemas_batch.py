@@ -0,0 +1,28 @@
+# test_schemas_batch.py
+import requests, json
+
+BASE = "http://127.0.0.1:5000/api/schema-service/v1"
+
+schemas = [
+    {
+        "id": "osdu:wks:test--BatchProbe:1.0.0",
+        "kind": "osdu:wks:test--BatchProbe:1.0.0",
+        "status": "PUBLISHED",
+        "schema_definition": {"type": "object", "properties": {"data": {"type": "object"}}}
+    },
+    {
+        "id": "bad-kind",
+        "kind": "not-a-kind",
+        "status": "PUBLISHED",
+        "schema_definition": {}
+    }
+]
+
+# JSON array
+resp = requests.post(f"{BASE}/schemas:batch", json=schemas)
+print(resp.status_code, resp.json())
+
+# NDJSON stream
+body = "\n".join(json.dumps(s) for s in schemas)
+resp = requests.post(f"{BASE}/schemas:batch", data=body, headers={"Content-Type": "application/x-ndjson"})
+print(resp.status_code, resp.json())
@@ -0,0 +1,22 @@
+# test_trace.py
+# Needs the server started with OSDU_TRACING=file (spans go to logs/traces.jsonl).
+# Ingests one record, then prints the span tree of that request from the trace
+# file using the X-Trace-Id response header.
+import json
+import subprocess
+import sys
+import requests
+
+BASE = "http://127.0.0.1:5000/api/storage/v2"
+HEADERS = {"Authorization": "Bearer dev-placeholder", "data-partition-id": "osdu", "Content-Type": "application/json"}
+ACL = {"owners": ["data.default.owners@osdu"], "viewers": ["data.default.viewers@osdu"]}
+LEGAL = {"legaltags": ["osdu-public-usa-dataset-1"], "otherRelevantDataCountries": ["US"], "status": "compliant"}
+
+well = {"id": "osdu:well--trace-001", "kind": "osdu:wks:master-data--Well:1.4.0", "acl": ACL, "legal": LEGAL,
+        "data": {"Name": "Trace Well"}}
+resp = requests.put(f"{BASE}/records", headers=HEADERS, data=json.dumps([well]))
+trace_id = resp.headers.get("x-trace-id")
+print(resp.status_code, "✅ X-Trace-Id" if trace_id else "❌ No X-Trace-Id (is OSDU_TRACING set?)")
+
+if trace_id:
+    subprocess.run([sys.executable, "trace_report.py", "logs/traces.jsonl", "--trace", trace_id])
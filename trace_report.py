@@ -0,0 +1,95 @@
+# ------------------------------------------------------------------------------
+# trace_report.py
+#
+# Per-stage latency breakdown of a span file written with OSDU_TRACING=file
+# (services/tracing.py). Prints, per span name, how often it ran and its total,
+# self (excluding child spans), p50, p95 and max time, most self time first.
+# With --trace, prints that trace as an indented tree instead.
+#
+#   python trace_report.py [logs/traces.jsonl] [--name "PUT /api/storage/v2/records"] [--trace <traceId>]
+# ------------------------------------------------------------------------------
+import argparse
+import json
+from collections import defaultdict
+
+def load_spans(path):
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def self_times(spans):
+    """
+    Duration of each span minus the durations of its direct children, in ms.
+    """
+    child_ms = defaultdict(float)
+    for span in spans:
+        if span["parentSpanId"]:
+            child_ms[(span["traceId"], span["parentSpanId"])] += span["durationMs"]
+    return {span["spanId"]: max(0.0, span["durationMs"] - child_ms[(span["traceId"], span["spanId"])])
+            for span in spans}
+
+def print_breakdown(spans, root_name=None):
+    if root_name:
+        traces = {span["traceId"] for span in spans if span["name"] == root_name}
+        spans = [span for span in spans if span["traceId"] in traces]
+    own = self_times(spans)
+    stages = defaultdict(list)
+    for span in spans:
+        stages[span["name"]].append(span)
+
+    rows = []
+    for name, group in stages.items():
+        durations = [span["durationMs"] for span in group]
+        rows.append((name, len(group), sum(durations), sum(own[span["spanId"]] for span in group),
+                     percentile(durations, 0.5), percentile(durations, 0.95), max(durations)))
+    rows.sort(key=lambda row: row[3], reverse=True)
+
+    print(f"{'stage':<60} {'count':>7} {'total ms':>11} {'self ms':>11} {'p50':>9} {'p95':>9} {'max':>9}")
+    for name, count, total, self_ms, p50, p95, worst in rows:
+        print(f"{name[:60]:<60} {count:>7} {total:>11.1f} {self_ms:>11.1f} {p50:>9.2f} {p95:>9.2f} {worst:>9.2f}")
+
+def print_trace(spans, trace_id):
+    spans = sorted((span for span in spans if span["traceId"] == trace_id), key=lambda s: s["startTimeUnixNano"])
+    if not spans:
+        print(f"❌ No spans for trace {trace_id}")
+        return
+    ids = {span["spanId"] for span in spans}
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parentSpanId"] if span["parentSpanId"] in ids else None].append(span)
+
+    def show(span, depth):
+        attributes = ", ".join(f"{k}={v}" for k, v in span["attributes"].items() if k != "db.query.text")
+        error = " ❌ " + span["status"].get("message", "") if span["status"]["code"] == "STATUS_CODE_ERROR" else ""
+        print(f"{'  ' * depth}{span['name']}  {span['durationMs']:.2f} ms  {attributes}{error}")
+        if "db.query.text" in span["attributes"]:
+            print(f"{'  ' * (depth + 1)}{span['attributes']['db.query.text'][:120]}")
+        for child in children[span["spanId"]]:
+            show(child, depth + 1)
+
+    for root in children[None]:
+        show(root, 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency breakdown of a trace file")
+    parser.add_argument("path", nargs="?", default="logs/traces.jsonl")
+    parser.add_argument("--name", help="only traces containing a span with this name, e.g. 'PUT /api/storage/v2/records'")
+    parser.add_argument("--trace", help="print one trace (X-Trace-Id) as a tree")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if args.trace:
+        print_trace(spans, args.trace)
+    else:
+        print_breakdown(spans, args.name)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,74 @@
+"""
+Standalone, multiprocess preflight validation of reference-value manifests.
+
+Runs without the HTTP app: schemas for the kinds listed in IngestionSequence.json
+are fetched from schema_registry in one query, each worker compiles a kind's
+validator once and reuses it for every record of that kind, and errors are
+streamed into a single buffered text log plus a JSON report.
+
+Exit status: 0 when every manifest passes, 1 when any record or manifest fails.
+"""
+import argparse
 import json
+import multiprocessing
 import os
-from services.schema_service import validate_record, resolve_schema
-from app import create_app  # assuming your Flask app is defined in app.py
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from jsonschema import ValidationError
+from services.schema_service import (
+    build_validator,
+    check_instance,
+    get_schemas_by_kinds,
+    resolve_schema,
+)
 
 
 SEQ_FILE = r"E:\dataprocessing\osdu_github_repos\osdu-data-data-definitions\ReferenceValues\Manifests\reference-data\IngestionSequence.json"
 ROOT_DIR = os.path.dirname(SEQ_FILE)
 LOG_FILE = "manifest_validation_errors.log"
+REPORT_FILE = "manifest_validation_report.json"
+MAX_WORKERS = os.cpu_count() or 4
+
+REQUIRED_FIELDS = ["id", "kind", "legal", "acl", "data"]
+
+# -------------------- Worker state --------------------
+
+_schemas = {}
+_validators = {}
+
+def _init_worker(schemas):
+    global _schemas
+    _schemas = schemas
+
+def _validator_for(kind: str):
+    """
+    Returns the compiled validator for a kind, building it at most once per
+    worker. Resolution failures are cached too so they are reported per record
+    without retrying the lookup.
+    """
+    if kind not in _validators:
+        try:
+            schema = _schemas.get(kind)
+            if schema is None:
+                schema = resolve_schema(kind)
+            _validators[kind] = build_validator(schema)
+        except Exception as e:
+            _validators[kind] = RuntimeError(f"Schema resolution failed for kind {kind}: {e}")
+    validator = _validators[kind]
+    if isinstance(validator, Exception):
+        raise validator
+    return validator
 
-def normalize_path(file_name: str) -> str:
+# -------------------- Manifest handling --------------------
+
+def normalize_path(file_name: str, root_dir: str = ROOT_DIR) -> str:
     prefix = "ReferenceValues/Manifests/reference-data/"
     if file_name.startswith(prefix):
         file_name = file_name[len(prefix):]
-    return os.path.join(ROOT_DIR, file_name)
+    return os.path.join(root_dir, file_name)
 
 def load_payload(manifest_path: str):
     with open(manifest_path, "r", encoding="utf-8") as mf:
@@ -21,82 +77,140 @@ def load_payload(manifest_path: str):
     if isinstance(manifest, dict):
         if "records" in manifest:
             return manifest["records"]
-        else:
-            return [manifest]
+        if "ReferenceData" in manifest:
+            return manifest["ReferenceData"]
+        return [manifest]
     elif isinstance(manifest, list):
         return manifest
     else:
         raise ValueError(f"Unexpected manifest format in {manifest_path}")
 
-def validate_manifest(file_path: str, records: list, manifest_key: str):
-    errors = []
+def validate_manifest(task: dict) -> dict:
+    """
+    Validates every record of one manifest. Runs inside a worker process.
+    """
+    result = {
+        "key": task["key"],
+        "kind": task["kind"],
+        "file": task["path"],
+        "records": 0,
+        "status": "passed",
+        "errors": []
+    }
+
+    if not os.path.exists(task["path"]):
+        result.update({"status": "missing", "errors": [f"Missing file: {task['path']}"]})
+        return result
+
+    try:
+        records = load_payload(task["path"])
+    except Exception as e:
+        result.update({"status": "unreadable", "errors": [f"Failed to load manifest: {e}"]})
+        return result
+
+    result["records"] = len(records)
+    if not records:
+        result["status"] = "empty"
+        return result
+
     for idx, record in enumerate(records, start=1):
         record_id = record.get("id", "<missing>")
-        kind = record.get("kind", "<missing>")
         try:
-            print(f"🔍 Resolving schema for kind: {kind}")
-            schema = resolve_schema(kind)
-            print(f"✅ Schema resolved for kind: {kind}")
-            validate_record(record)
+            missing = [field for field in REQUIRED_FIELDS if field not in record]
+            if missing:
+                raise ValueError(f"Missing required field: {missing[0]}")
+            check_instance(_validator_for(record["kind"]), record["data"])
+        except ValidationError as ve:
+            result["errors"].append(f"Record {idx} (ID: {record_id}) in {task['key']}: Schema validation failed: {ve.message}")
         except Exception as e:
-            error_msg = f"Record {idx} (ID: {record_id}) in {manifest_key}: {e}"
-            errors.append(error_msg)
-            with open(LOG_FILE, "a", encoding="utf-8") as log:
-                log.write(error_msg + "\n")
-    return errors
-
-def main():
-    with open(SEQ_FILE, "r", encoding="utf-8") as f:
+            result["errors"].append(f"Record {idx} (ID: {record_id}) in {task['key']}: {e}")
+
+    if result["errors"]:
+        result["status"] = "failed"
+    return result
+
+# -------------------- Main --------------------
+
+def prefetch_schemas(kinds):
+    """
+    Fetches every distinct kind's schema once in the parent process. Kinds that
+    are not registered are resolved lazily by the workers.
+    """
+    try:
+        return get_schemas_by_kinds(sorted(kinds))
+    except Exception as e:
+        print(f"⚠️ Could not prefetch schemas ({e}); workers will resolve them individually")
+        return {}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Preflight validation of OSDU reference-value manifests")
+    parser.add_argument("--sequence", default=SEQ_FILE, help="Path to IngestionSequence.json")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Number of worker processes")
+    parser.add_argument("--log", default=LOG_FILE, help="Text error log")
+    parser.add_argument("--report", default=REPORT_FILE, help="JSON report")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    started = time.perf_counter()
+
+    with open(args.sequence, "r", encoding="utf-8") as f:
         sequence = json.load(f)
 
-    total = len(sequence)
-    total_errors = 0
-    skipped_manifests = 0
-
-    print(f"\n🔍 Preflight validation of {total} manifests...\n")
-
-    for idx, entry in enumerate(sequence, start=1):
-        manifest_path = normalize_path(entry["FileName"])
-        manifest_key = entry["Key"]
-        print(f"[{idx}/{total}] Checking {manifest_key} ({entry['kind']})")
-
-        if not os.path.exists(manifest_path):
-            print(f"❌ Missing file: {manifest_path}")
-            total_errors += 1
-            skipped_manifests += 1
-            continue
-
-        try:
-            records = load_payload(manifest_path)
-        except Exception as e:
-            print(f"❌ Failed to load manifest: {e}")
-            total_errors += 1
-            skipped_manifests += 1
-            continue
-
-        if not records:
-            print("⚠️ Empty payload.")
-            continue
-
-        errors = validate_manifest(manifest_path, records, manifest_key)
-        if errors:
-            print(f"❌ {len(errors)} validation error(s):")
-            for err in errors:
-                print("  - " + err)
-            total_errors += len(errors)
-            skipped_manifests += 1
-        else:
-            print(f"✅ All {len(records)} record(s) passed validation.")
+    root_dir = os.path.dirname(args.sequence)
+    tasks = [
+        {"key": entry["Key"], "kind": entry["kind"], "path": normalize_path(entry["FileName"], root_dir)}
+        for entry in sequence
+    ]
+    total = len(tasks)
+    schemas = prefetch_schemas({t["kind"] for t in tasks})
+
+    print(f"\n🔍 Preflight validation of {total} manifests ({len(schemas)} schema(s) prefetched, {args.workers} worker(s))...\n")
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with open(args.log, "w", encoding="utf-8", buffering=1024 * 1024) as log, \
+            ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                                initializer=_init_worker, initargs=(schemas,)) as pool:
+        futures = [pool.submit(validate_manifest, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            marker = "✅" if result["status"] in ("passed", "empty") else "❌"
+            print(f"[{done}/{total}] {marker} {result['key']} ({result['kind']}): "
+                  f"{result['records']} record(s), {len(result['errors'])} error(s)")
+            for err in result["errors"]:
+                log.write(err + "\n")
+
+    results.sort(key=lambda r: r["key"])
+    total_errors = sum(len(r["errors"]) for r in results)
+    failed_manifests = [r for r in results if r["status"] in ("failed", "missing", "unreadable")]
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "generated": datetime.now().isoformat(),
+        "sequenceFile": args.sequence,
+        "manifests": total,
+        "records": sum(r["records"] for r in results),
+        "failedManifests": len(failed_manifests),
+        "errors": total_errors,
+        "elapsedSeconds": round(elapsed, 3),
+        "results": results
+    }
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
 
     print("\n================ VALIDATION SUMMARY ================")
     print(f"Total manifests checked: {total}")
+    print(f"Total records checked: {report['records']}")
     print(f"Total validation errors: {total_errors}")
-    print(f"Manifests skipped due to errors: {skipped_manifests}")
-    print(f"Error log written to: {LOG_FILE}")
+    print(f"Manifests with errors: {len(failed_manifests)}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    print(f"Error log written to: {args.log}")
+    print(f"JSON report written to: {args.report}")
     print("====================================================")
 
-if __name__ == "__main__":
-    app = create_app()
-    with app.app_context():
-        main()
+    return 1 if failed_manifests else 0
 
+if __name__ == "__main__":
+    sys.exit(main())